@@ -1,28 +1,49 @@
-import typer
+import json
+import sys
 import shlex
 from pathlib import Path
-from prompt_toolkit import PromptSession
-from prompt_toolkit.completion import Completer, Completion
-from rich.console import Console
+from typing import List
+from subsystems.local.output_manager import ERROR_LEVEL, get_console
 from datetime import datetime
-from subsystems.auth import auth
-from subsystems.invitation import invitation
-from subsystems.local import context_manager
-from subsystems.local.context_manager import user_data
+from subsystems.local import (context_manager, file_index_manager, job_manager, metrics_manager,
+                               operation_queue_manager, profile_manager)
+from subsystems.local.config_manager import get_setting
+from subsystems.local.lazy_loader import lazy_import
+from subsystems.local.listing_manager import parse_listing_options
 from subsystems.local.token_manager import load_token
 from subsystems.local.working_directory_manager import load_working_directory, save_working_directory
-from subsystems.versioning import repository, resource, branch, version
-from subsystems.versioning.resource import show_version_tree
 
 # -------- CONFIGURATION --------
-console = Console()
-
-app = typer.Typer(help="Dddit CLI [v0.0.1]")
+console = get_console()
+
+# Subsystems are loaded by the first command that uses them, so the prompt shows up without waiting for
+# requests, typer and the other dependencies they pull in
+auth = lazy_import("subsystems.auth.auth")
+cache = lazy_import("subsystems.cache.cache")
+invitation = lazy_import("subsystems.invitation.invitation")
+repository = lazy_import("subsystems.versioning.repository")
+resource = lazy_import("subsystems.versioning.resource")
+branch = lazy_import("subsystems.versioning.branch")
+version = lazy_import("subsystems.versioning.version")
+batch = lazy_import("subsystems.versioning.batch")
+sync = lazy_import("subsystems.sync.sync")
+http_client = lazy_import("subsystems.network.http_client")
 
 CONTEXT_STRING = "~"
 
 WORKING_DIRECTORY = load_working_directory()
 
+# Transfers run as background jobs in the REPL, scripted runs keep them in the foreground to report their result
+BACKGROUND_TRANSFERS = False
+
+EXIT_SUCCESS = 0
+EXIT_FAILURE = 1
+EXIT_USAGE_ERROR = 2
+
+# Commands that do not need the repositories of the logged user in the local context
+CONTEXT_FREE_COMMANDS = ("signup", "login", "logout", "cwd", "show", "cache", "jobs", "wait", "cancel", "stats", "profile",
+                         "exit", "quit")
+
 # -------- PRINT PARAMETERS ERROR FUNCTION --------
 
 def print_parameters_error():
@@ -49,9 +70,8 @@ def remove_last_context_point():
 
 def check_version_name(version_name: str):
     global WORKING_DIRECTORY
-    base_path = Path(WORKING_DIRECTORY)
 
-    matches = list(base_path.rglob(version_name))
+    matches = file_index_manager.find_paths(Path(WORKING_DIRECTORY), version_name)
 
     if not matches:
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -83,351 +103,731 @@ def check_version_name(version_name: str):
         console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {target} is neither a file nor a directory")
         return None
 
+# -------- TRANSFER JOB FUNCTIONS --------
+
+def run_transfer(description: str, function, *args) -> bool:
+    # The description also identifies the job, so the same version is never transferred twice at once
+    if not BACKGROUND_TRANSFERS:
+        return function(*args) is not False
+
+    return job_manager.start_job(description, description, lambda: function(*args),
+                                 on_finish=lambda job: context_manager.persist_context()) is not None
+
+def parse_job_ids(parts: List[str]) -> List[int] | None:
+    try:
+        return [int(part) for part in parts[1:]]
+    except ValueError:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Job ids must be numbers")
+        return None
+
+# -------- OFFLINE MANAGEMENT FUNCTIONS --------
+
+def create_context(token) -> bool:
+    # Without a cached context and without the server, the CLI starts anyway so logins and cached commands work
+    try:
+        return context_manager.create_context(token)
+    except Exception as e:
+        if not http_client.is_connection_error(e):
+            raise
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Server unreachable, local context could not be initialized")
+        return False
+
+def parse_operation_id(parts: List[str]) -> int | None:
+    try:
+        return int(parts[2].lstrip("#"))
+    except ValueError:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Operation ids must be numbers")
+        return None
+
+def parse_tree_arguments(parts: List[str]) -> tuple[List[str], int | None] | None:
+    # Branch names to expand and the --versions count, the listing options are read by parse_listing_options
+    branch_names = []
+    recent_versions = None
+
+    index = 1
+    while index < len(parts):
+        part = parts[index].lower()
+
+        if part in ("--limit", "--offset"):
+            index += 1
+        elif part == "--versions":
+            value = parts[index + 1] if index + 1 < len(parts) else ""
+            if not value.isdigit():
+                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                console.print(f"[white]{now}[/white] [[red]ERROR[/red]] --versions needs a number, not {value or 'nothing'}")
+                return None
+
+            recent_versions = int(value)
+            index += 1
+        elif part != "--json":
+            branch_names.append(parts[index])
+
+        index += 1
+
+    return branch_names, recent_versions
+
 # -------- AUTO COMPLETION MANAGEMENT CLASS --------
 
-class CDCompleter(Completer):
-    def get_completions(self, document, complete_event):
-        text = document.text_before_cursor
-
-        if not text.lower().startswith("cd "):
-            return
-
-        parts = text.split()
-        prefix = parts[-1] if len(parts) > 1 else ""
-
-        level = CONTEXT_STRING.count("\\")
-        options = []
-        if level == 1:
-            options = [r['name'] for r in user_data["repositories"]]
-        elif level == 2:
-            parts_ctx = CONTEXT_STRING.split("\\")
-            options = context_manager.list_resources(parts_ctx[-1])
-        elif level == 3:
-            parts_ctx = CONTEXT_STRING.split("\\")
-            options = context_manager.list_branches(parts_ctx[-2], parts_ctx[-1])
-        elif level == 4:
-            parts_ctx = CONTEXT_STRING.split("\\")
-            options = context_manager.list_versions(parts_ctx[-3], parts_ctx[-2], parts_ctx[-1])
-
-        for opt in options:
-            if prefix == "" or opt.startswith(prefix):
-                start_pos = -len(prefix) if prefix else 0
-                yield Completion(opt, start_position=start_pos)
+def create_completer():
+    from prompt_toolkit.completion import Completer, Completion
+
+    class CDCompleter(Completer):
+        def get_completions(self, document, complete_event):
+            text = document.text_before_cursor
+
+            if not text.lower().startswith("cd "):
+                return
+
+            parts = text.split()
+            prefix = parts[-1] if len(parts) > 1 else ""
+
+            level = CONTEXT_STRING.count("\\")
+            options = []
+            with profile_manager.profile_completion():
+                if level == 1:
+                    options = context_manager.list_repository_names()
+                elif level == 2:
+                    parts_ctx = CONTEXT_STRING.split("\\")
+                    options = context_manager.list_resources(parts_ctx[-1])
+                elif level == 3:
+                    parts_ctx = CONTEXT_STRING.split("\\")
+                    options = context_manager.list_branches(parts_ctx[-2], parts_ctx[-1])
+                elif level == 4:
+                    parts_ctx = CONTEXT_STRING.split("\\")
+                    options = context_manager.list_versions(parts_ctx[-3], parts_ctx[-2], parts_ctx[-1])
+
+            for opt in options:
+                if prefix == "" or opt.startswith(prefix):
+                    start_pos = -len(prefix) if prefix else 0
+                    yield Completion(opt, start_position=start_pos)
+
+    return CDCompleter()
 
 # -------- CLI --------
 
 def repl():
     global CONTEXT_STRING
     global WORKING_DIRECTORY
+    global BACKGROUND_TRANSFERS
 
     console.print("[white]Dddit CLI v1.0.1 (c) Angelo Antonio Prisco[/white]\n")
-    context_manager.create_context(load_token())
+
+    token = load_token()
+    if context_manager.load_cached_context(token):
+        context_manager.revalidate_context_in_background()
+    else:
+        create_context(token)
+
+    file_index_manager.refresh_index_in_background(Path(WORKING_DIRECTORY))
+
+    BACKGROUND_TRANSFERS = get_setting("background_transfers")
 
     if context_manager.user_data["username"] is None:
         CONTEXT_STRING = "~"
     else:
         CONTEXT_STRING = CONTEXT_STRING + "\\" + context_manager.user_data.get("username")
 
-    session = PromptSession(completer=CDCompleter())
+        # Operations queued by an earlier session are replayed as soon as the server answers
+        if operation_queue_manager.load_operations(context_manager.user_data["username"]):
+            sync.start_sync_in_background()
+
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.patch_stdout import patch_stdout
+
+    session = PromptSession(completer=create_completer())
+
+    with patch_stdout(raw=True):
+        repl_loop(session)
+
+    # Pooled connections are closed before the process ends, instead of being dropped with it
+    http_client.close_session()
 
+def repl_loop(session):
     while True:
-        cmd = session.prompt(f"{CONTEXT_STRING} $ ").strip()
-        if not cmd:
+        context_manager.persist_context()
+
+        try:
+            cmd = session.prompt(f"{CONTEXT_STRING} $ ").strip()
+        except KeyboardInterrupt:
+            # Ctrl-C at the prompt only clears the line
             continue
+        except EOFError:
+            cmd = "exit"
 
-        if cmd.lower() in ("exit", "quit"):
-            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            console.print(f"[white]{now}[/white] [[green]SUCCESS[/green] Successfully exited")
+        if not execute_command(cmd):
             break
 
-        parts = shlex.split(cmd, posix=False)
-        command = parts[0].lower()
+def execute_command(cmd: str) -> bool:
+    # Runs one REPL command line, returns False once the user asked to exit
+    if not cmd:
+        return True
+
+    if cmd.lower() in ("exit", "quit"):
+        if job_manager.running_jobs():
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {len(job_manager.running_jobs())} jobs are still running, "
+                          f"wait for them or cancel them before exiting")
+            return True
 
-        try:
-            # -------- CHANGE DIRECTORY COMMAND --------
-            if command == "cd":
-                if len(parts) < 2:
-                    print_parameters_error()
-                    continue
-
-                step = parts[1]
-
-                if CONTEXT_STRING.count("\\") == 0:
-                    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Current context is empty")
-                    continue
-
-                if step == "..":
-                    if CONTEXT_STRING.count("\\") == 1:
-                        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Use logout command to clear context")
-                        continue
-
-                    remove_last_context_point()
-                    console.print()
-
-                elif CONTEXT_STRING.count("\\") == 1:
-                    repositories = [r['name'] for r in user_data["repositories"]]
-                    if step not in repositories:
-                        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {step} does not exist in current context point")
-                        continue
-                    else:
-                        add_context_point(step)
-                        console.print()
-
-                elif CONTEXT_STRING.count("\\") == 2:
-                    parts = CONTEXT_STRING.split("\\")
-                    resources = context_manager.list_resources(parts[-1])
-                    if step not in resources:
-                        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {step} does not exist in current context point")
-                        continue
-                    else:
-                        add_context_point(step)
-                        console.print()
-
-                elif CONTEXT_STRING.count("\\") == 3:
-                    parts = CONTEXT_STRING.split("\\")
-                    branches = context_manager.list_branches(parts[-2], parts[-1])
-                    if step not in branches:
-                        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {step} does not exist in current context point")
-                        continue
-                    else:
-                        add_context_point(step)
-                        console.print()
-
-                elif CONTEXT_STRING.count("\\") == 4:
-                    parts = CONTEXT_STRING.split("\\")
-                    versions = context_manager.list_versions(parts[-3], parts[-2], parts[-1])
-                    if step not in versions:
-                        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {step} does not exist in current context point")
-                        continue
-                    else:
-                        add_context_point(step)
-                        console.print()
-
-                elif CONTEXT_STRING.count("\\") == 5:
-                    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Cannot select additional items after a version has been selected")
-                    continue
-
-            # -------- DIRECTORY COMMANDS --------
-            elif command == "cwd":
-                if len(parts) < 2:
-                    print_parameters_error()
-                    continue
-
-                path = parts[1].strip()
-
-                if len(path) == 2 and path[1] == ":":
-                    path += "\\"
-
-                p = Path(path)
-
-                if p.exists() and p.is_dir():
-                    WORKING_DIRECTORY = p.resolve()
-                    save_working_directory(str(WORKING_DIRECTORY))
-                    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    console.print(
-                        f"[white]{now}[/white] [[green]SUCCESS[/green]] Working directory set to {WORKING_DIRECTORY}")
-                else:
-                    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Invalid path to use as working directory")
-
-            elif command == "show":
-                if len(parts) < 2:
-                    print_parameters_error()
-                    continue
-
-                subcommand = parts[1]
-                if subcommand == "cwd":
-                    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] Current working directory is {WORKING_DIRECTORY}")
-                else:
-                    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {subcommand} is not a subcommand for {command} command")
-
-            # -------- AUTH COMMANDS --------
-            elif command == "signup":
-                if len(parts) < 2:
-                    print_parameters_error()
-                    continue
-
-                username = parts[1]
-                if auth.signup(username):
-                    add_context_point(username)
-
-            elif command == "login":
-                if len(parts) < 2:
-                    print_parameters_error()
-                    continue
-
-                username = parts[1]
-                if auth.login(username):
-                    add_context_point(username)
-
-            elif command == "logout":
-                if auth.logout():
-                    reset_context_string()
-
-            # -------- INVITATION COMMANDS --------
-            elif command == "invite":
-                if len(parts) < 3:
-                    print_parameters_error()
-                    continue
-
-                username = parts[1]
-                repository_name = parts[2]
-                invitation.send_invitation(username, repository_name)
-
-            elif command == "pending":
-                if len(parts) < 1:
-                    print_parameters_error()
-                    continue
-
-                invitation.list_pending_invitations()
-
-            elif command == "accept":
-                if len(parts) < 3:
-                    print_parameters_error()
-                    continue
-
-                username = parts[1]
-                repository_name = parts[2]
-                invitation.accept_invitation(username, repository_name)
-
-            # -------- REPO COMMANDS --------
-            elif command == "init" and CONTEXT_STRING.count("\\") == 1:
-                if len(parts) < 2:
-                    print_parameters_error()
-                    continue
-
-                repository_name = parts[1]
-                repository.init(repository_name)
-
-            elif command == "ls" and CONTEXT_STRING.count("\\") == 1:
-                owned = "--o" in parts
-                contrib = "--c" in parts
-                repository.list_repos(o=owned, c=contrib)
-
-            # -------- RESOURCE COMMANDS --------
-            elif command == "init" and CONTEXT_STRING.count("\\") == 2:
-                if len(parts) < 2:
-                    print_parameters_error()
-                    continue
-
-                repository_name = CONTEXT_STRING.split("\\")[-1]
-                resource_name = parts[1]
-
-                resource.init(repository_name, resource_name)
-
-            elif command == "ls" and CONTEXT_STRING.count("\\") == 2:
-                repository_name = CONTEXT_STRING.split("\\")[-1]
-
-                resource.list_resources(repository_name)
-
-            elif command == "tree" and CONTEXT_STRING.count("\\") == 3:
-                repository_name = CONTEXT_STRING.split("\\")[-2]
-                resource_name = CONTEXT_STRING.split("\\")[-1]
-
-                show_version_tree(repository_name, resource_name)
-
-            # -------- BRANCH COMMANDS --------
-            elif command == "init" and CONTEXT_STRING.count("\\") == 3:
-                repository_name = CONTEXT_STRING.split("\\")[-2]
-                resource_name = CONTEXT_STRING.split("\\")[-1]
-                branch_name = parts[1]
-
-                branch.init(repository_name, resource_name, branch_name)
-
-            elif command == "ls" and CONTEXT_STRING.count("\\") == 3:
-                repository_name = CONTEXT_STRING.split("\\")[-2]
-                resource_name = CONTEXT_STRING.split("\\")[-1]
-
-                branch.list_branches(repository_name, resource_name)
-
-            # -------- VERSION COMMANDS --------
-            elif command == "push" and CONTEXT_STRING.count("\\") == 4:
-                comment_option = "--m" in parts
-
-                if comment_option and len(parts) < 4:
-                    print_parameters_error()
-                    continue
-
-                elif comment_option and len(parts) > 4:
-                    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    console.print(f"[white]{now}[/white] [[red]ERROR[/red]] More parameters than expected")
-                    continue
-
-                elif not comment_option and len(parts) > 2:
-                    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    console.print(f"[white]{now}[/white] [[red]ERROR[/red]] More parameters than expected")
-                    continue
-
-                elif len(parts) < 2:
-                    print_parameters_error()
-                    continue
-
-                repository_name = CONTEXT_STRING.split("\\")[-3]
-                resource_name = CONTEXT_STRING.split("\\")[-2]
-                branch_name = CONTEXT_STRING.split("\\")[-1]
-
-                if len(parts) == 2:
-                    version_name = parts[1]
-                    result_checking = check_version_name(version_name)
-                    if result_checking is None:
-                        continue
-
-                    if result_checking:
-                        version.push(repository_name, resource_name, branch_name, version_name, comment_option, "", True, WORKING_DIRECTORY)
-                    else:
-                        version.push(repository_name, resource_name, branch_name, version_name, comment_option, "", False, WORKING_DIRECTORY)
-                elif len(parts) == 4:
-                    version_name = parts[1]
-                    comment = parts[3].replace("\"", "")
-                    result_checking = check_version_name(version_name)
-                    if result_checking is None:
-                        continue
-
-                    if result_checking:
-                        version.push(repository_name, resource_name, branch_name, version_name, comment_option, comment,True, WORKING_DIRECTORY)
-                    else:
-                        version.push(repository_name, resource_name, branch_name, version_name, comment_option, comment,False, WORKING_DIRECTORY)
-
-            elif command == "ls" and CONTEXT_STRING.count("\\") == 4:
-                repository_name = CONTEXT_STRING.split("\\")[-3]
-                resource_name = CONTEXT_STRING.split("\\")[-2]
-                branch_name = CONTEXT_STRING.split("\\")[-1]
-
-                version.list_versions(repository_name, resource_name, branch_name)
+        username = context_manager.user_data["username"]
+        if username is not None and operation_queue_manager.load_operations(username):
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Queued operations are kept and replayed "
+                          f"by the next session, or with the sync command")
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[green]SUCCESS[/green] Successfully exited")
+        return False
+
+    parts = shlex.split(cmd, posix=False)
+    command = parts[0].lower()
+
+    try:
+        with job_manager.foreground_job(cmd), metrics_manager.span(f"command.{command}"), \
+                profile_manager.profile_command(cmd):
+            return dispatch_command(command, parts)
+    except KeyboardInterrupt:
+        # Only the running command is stopped, the REPL goes on with the next prompt
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Command {command} interrupted")
+    except job_manager.JobCancelledError as e:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {e}")
+    except Exception as e:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if http_client.is_connection_error(e):
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Server unreachable, {command} needs a connection. "
+                          f"Commands reading the local context keep working and changes are queued")
+        else:
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {type(e).__name__} - {e}")
+
+    return True
+
+def dispatch_command(command: str, parts: List[str]) -> bool:
+    global CONTEXT_STRING
+    global WORKING_DIRECTORY
+
+    # -------- CHANGE DIRECTORY COMMAND --------
+    if command == "cd":
+        if len(parts) < 2:
+            print_parameters_error()
+            return True
+
+        step = parts[1]
+
+        if CONTEXT_STRING.count("\\") == 0:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Current context is empty")
+            return True
 
-            elif command == "pull" and CONTEXT_STRING.count("\\") == 5:
-                repository_name = CONTEXT_STRING.split("\\")[-4]
-                resource_name = CONTEXT_STRING.split("\\")[-3]
-                branch_name = CONTEXT_STRING.split("\\")[-2]
-                version_name = CONTEXT_STRING.split("\\")[-1]
-
-                version.pull(repository_name, resource_name, branch_name, version_name, WORKING_DIRECTORY)
+        if step == "..":
+            if CONTEXT_STRING.count("\\") == 1:
+                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Use logout command to clear context")
+                return True
 
-            elif command == "metadata" and CONTEXT_STRING.count("\\") == 5:
-                repository_name = CONTEXT_STRING.split("\\")[-4]
-                resource_name = CONTEXT_STRING.split("\\")[-3]
-                branch_name = CONTEXT_STRING.split("\\")[-2]
-                version_name = CONTEXT_STRING.split("\\")[-1]
+            remove_last_context_point()
+            console.print()
 
-                version.show_version_metadata(repository_name, resource_name, branch_name, version_name)
+        elif CONTEXT_STRING.count("\\") == 1:
+            if not context_manager.has_repository(step):
+                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {step} does not exist in current context point")
+                return True
+            else:
+                add_context_point(step)
+                console.print()
 
-            # -------- ERROR MANAGEMENT --------
+        elif CONTEXT_STRING.count("\\") == 2:
+            parts = CONTEXT_STRING.split("\\")
+            if not context_manager.has_resource(parts[-1], step):
+                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {step} does not exist in current context point")
+                return True
             else:
+                add_context_point(step)
+                console.print()
+
+        elif CONTEXT_STRING.count("\\") == 3:
+            parts = CONTEXT_STRING.split("\\")
+            if not context_manager.has_branch(parts[-2], parts[-1], step):
                 now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Command {command} not found")
+                console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {step} does not exist in current context point")
+                return True
+            else:
+                add_context_point(step)
+                console.print()
+
+        elif CONTEXT_STRING.count("\\") == 4:
+            parts = CONTEXT_STRING.split("\\")
+            if not context_manager.has_version(parts[-3], parts[-2], parts[-1], step):
+                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {step} does not exist in current context point")
+                return True
+            else:
+                add_context_point(step)
+                console.print()
 
-        except Exception as e:
+        elif CONTEXT_STRING.count("\\") == 5:
             now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {e}")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Cannot select additional items after a version has been selected")
+            return True
+
+    # -------- DIRECTORY COMMANDS --------
+    elif command == "cwd":
+        if len(parts) < 2:
+            print_parameters_error()
+            return True
+
+        path = parts[1].strip()
+
+        if len(path) == 2 and path[1] == ":":
+            path += "\\"
+
+        p = Path(path)
+
+        if p.exists() and p.is_dir():
+            if p.resolve() != Path(WORKING_DIRECTORY):
+                WORKING_DIRECTORY = p.resolve()
+                save_working_directory(str(WORKING_DIRECTORY))
+                file_index_manager.refresh_index_in_background(WORKING_DIRECTORY)
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(
+                f"[white]{now}[/white] [[green]SUCCESS[/green]] Working directory set to {WORKING_DIRECTORY}")
+        else:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Invalid path to use as working directory")
+
+    elif command == "show":
+        if len(parts) < 2:
+            print_parameters_error()
+            return True
+
+        subcommand = parts[1]
+        if subcommand == "cwd":
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] Current working directory is {WORKING_DIRECTORY}")
+        else:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {subcommand} is not a subcommand for {command} command")
+
+    elif command == "refresh":
+        if CONTEXT_STRING.count("\\") == 0:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Current context is empty")
+            return True
+
+        context_manager.refresh_context(load_token())
+
+        reset_context_string()
+        if context_manager.user_data["username"] is not None:
+            add_context_point(context_manager.user_data["username"])
+
+    elif command == "cache":
+        if len(parts) < 2:
+            print_parameters_error()
+            return True
+
+        subcommand = parts[1]
+        if subcommand == "stats":
+            cache.show_cache_stats()
+        elif subcommand == "gc":
+            cache.collect_cache_garbage()
+        else:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {subcommand} is not a subcommand for {command} command")
+
+    # -------- JOB COMMANDS --------
+    elif command == "jobs":
+        job_manager.show_jobs()
+
+    elif command == "wait":
+        job_ids = parse_job_ids(parts)
+        if job_ids is not None:
+            job_manager.wait_jobs(job_ids)
+
+    elif command == "cancel":
+        if len(parts) < 2:
+            print_parameters_error()
+            return True
+
+        job_ids = parse_job_ids(parts)
+        if job_ids is not None:
+            job_manager.cancel_jobs(job_ids)
+
+    # -------- STATISTICS COMMANDS --------
+    elif command == "stats":
+        if len(parts) < 2:
+            metrics_manager.show_stats()
+        elif parts[1] == "reset":
+            metrics_manager.clear_stats()
+        elif parts[1] == "trace":
+            if len(parts) < 3:
+                print_parameters_error()
+                return True
+
+            metrics_manager.set_trace(parts[2])
+        else:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {parts[1]} is not a subcommand for {command} command")
+
+    elif command == "profile":
+        if len(parts) < 2:
+            profile_manager.show_profiling()
+        else:
+            profile_manager.set_profiling(parts[1])
+
+    # -------- OFFLINE QUEUE COMMANDS --------
+    elif command == "queue":
+        if len(parts) < 2:
+            sync.show_queue()
+        elif parts[1] == "drop":
+            if len(parts) < 3:
+                print_parameters_error()
+                return True
+
+            operation_id = parse_operation_id(parts)
+            if operation_id is not None:
+                sync.drop_operation(operation_id)
+        else:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {parts[1]} is not a subcommand for {command} command")
+
+    elif command == "sync":
+        sync.sync_queue()
+
+    # -------- AUTH COMMANDS --------
+    elif command == "signup":
+        if len(parts) < 2:
+            print_parameters_error()
+            return True
+
+        username = parts[1]
+        if auth.signup(username):
+            add_context_point(username)
+
+    elif command == "login":
+        if len(parts) < 2:
+            print_parameters_error()
+            return True
+
+        username = parts[1]
+        if auth.login(username):
+            add_context_point(username)
+
+    elif command == "logout":
+        if auth.logout():
+            reset_context_string()
+
+    # -------- INVITATION COMMANDS --------
+    elif command == "invite":
+        if len(parts) < 3:
+            print_parameters_error()
+            return True
+
+        username = parts[1]
+        repository_name = parts[2]
+        sync.run_or_queue("invite", {"username": username, "repositoryName": repository_name})
+
+    elif command == "pending":
+        if len(parts) < 1:
+            print_parameters_error()
+            return True
+
+        options = parse_listing_options(parts)
+        if options is not None:
+            invitation.list_pending_invitations(options.limit, options.offset, options.json_output)
+
+    elif command == "accept":
+        if len(parts) < 3:
+            print_parameters_error()
+            return True
+
+        username = parts[1]
+        repository_name = parts[2]
+        sync.run_or_queue("accept", {"username": username, "repositoryName": repository_name})
+
+    # -------- REPO COMMANDS --------
+    elif command == "init" and CONTEXT_STRING.count("\\") == 1:
+        if len(parts) < 2:
+            print_parameters_error()
+            return True
+
+        repository_name = parts[1]
+        sync.run_or_queue("init_repository", {"repositoryName": repository_name})
+
+    elif command == "ls" and CONTEXT_STRING.count("\\") == 1:
+        owned = "--o" in parts
+        contrib = "--c" in parts
+
+        options = parse_listing_options(parts)
+        if options is not None:
+            repository.list_repos(owned, contrib, options.limit, options.offset, options.json_output)
+
+    # -------- RESOURCE COMMANDS --------
+    elif command == "init" and CONTEXT_STRING.count("\\") == 2:
+        if len(parts) < 2:
+            print_parameters_error()
+            return True
+
+        repository_name = CONTEXT_STRING.split("\\")[-1]
+        resource_name = parts[1]
+
+        sync.run_or_queue("init_resource", {"repositoryName": repository_name, "resourceName": resource_name})
+
+    elif command == "ls" and CONTEXT_STRING.count("\\") == 2:
+        repository_name = CONTEXT_STRING.split("\\")[-1]
+
+        options = parse_listing_options(parts)
+        if options is not None:
+            resource.list_resources(repository_name, options.limit, options.offset, options.json_output)
+
+    elif command == "tree" and CONTEXT_STRING.count("\\") == 3:
+        repository_name = CONTEXT_STRING.split("\\")[-2]
+        resource_name = CONTEXT_STRING.split("\\")[-1]
+
+        options = parse_listing_options(parts)
+        arguments = parse_tree_arguments(parts) if options is not None else None
+        if arguments is not None:
+            branch_names, recent_versions = arguments
+            resource.show_version_tree(repository_name, resource_name, branch_names, recent_versions, options.limit,
+                                       options.offset, options.json_output)
+
+    # -------- BRANCH COMMANDS --------
+    elif command == "init" and CONTEXT_STRING.count("\\") == 3:
+        repository_name = CONTEXT_STRING.split("\\")[-2]
+        resource_name = CONTEXT_STRING.split("\\")[-1]
+        branch_name = parts[1]
+
+        sync.run_or_queue("init_branch", {"repositoryName": repository_name, "resourceName": resource_name,
+                                          "branchName": branch_name})
+
+    elif command == "ls" and CONTEXT_STRING.count("\\") == 3:
+        repository_name = CONTEXT_STRING.split("\\")[-2]
+        resource_name = CONTEXT_STRING.split("\\")[-1]
+
+        options = parse_listing_options(parts)
+        if options is not None:
+            branch.list_branches(repository_name, resource_name, options.limit, options.offset, options.json_output)
+
+    # -------- VERSION COMMANDS --------
+    elif command == "push" and CONTEXT_STRING.count("\\") == 4:
+        comment_option = "--m" in parts
+
+        if comment_option and len(parts) < 4:
+            print_parameters_error()
+            return True
+
+        elif comment_option and len(parts) > 4:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] More parameters than expected")
+            return True
+
+        elif not comment_option and len(parts) > 2:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] More parameters than expected")
+            return True
+
+        elif len(parts) < 2:
+            print_parameters_error()
+            return True
+
+        repository_name = CONTEXT_STRING.split("\\")[-3]
+        resource_name = CONTEXT_STRING.split("\\")[-2]
+        branch_name = CONTEXT_STRING.split("\\")[-1]
+
+        version_name = parts[1]
+        comment = parts[3].replace("\"", "") if len(parts) == 4 else ""
+
+        # A single walk of the working directory per push, both lookups below only read the index
+        file_index_manager.refresh_index(Path(WORKING_DIRECTORY))
+        result_checking = check_version_name(version_name)
+        if result_checking is None:
+            return True
+
+        # The path is resolved now, a push queued while offline replays the same file whatever the index holds later
+        version_path = file_index_manager.find_paths(Path(WORKING_DIRECTORY), version_name)[0].resolve()
+
+        arguments = {"repositoryName": repository_name, "resourceName": resource_name, "branchName": branch_name,
+                     "path": str(version_path), "comment": comment if comment_option else " ", "isMesh": result_checking}
+        run_transfer(f"push {version_name} to {repository_name}/{resource_name}/{branch_name}",
+                     lambda: sync.run_or_queue("push", arguments) != sync.REJECTED)
+
+    elif command == "batch":
+        if CONTEXT_STRING.count("\\") == 0:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Current context is empty")
+            return True
+
+        glob_option = "--glob" in parts
+        comment_option = "--m" in parts
+
+        if len(parts) < 2 or (glob_option and len(parts) < 3) or (comment_option and len(parts) < 5):
+            print_parameters_error()
+            return True
+
+        if not glob_option:
+            if len(parts) > 2:
+                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                console.print(f"[white]{now}[/white] [[red]ERROR[/red]] More parameters than expected")
+                return True
+
+            manifest_path = parts[1].replace("\"", "")
+            run_transfer(f"batch {manifest_path}", batch.push_manifest, Path(manifest_path), Path(WORKING_DIRECTORY))
+
+        elif CONTEXT_STRING.count("\\") != 4:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Select a branch before pushing with --glob")
+
+        else:
+            repository_name = CONTEXT_STRING.split("\\")[-3]
+            resource_name = CONTEXT_STRING.split("\\")[-2]
+            branch_name = CONTEXT_STRING.split("\\")[-1]
+            pattern = parts[2].replace("\"", "")
+            comment = parts[4].replace("\"", "") if comment_option else " "
+
+            run_transfer(f"batch {pattern} to {repository_name}/{resource_name}/{branch_name}", batch.push_glob,
+                         repository_name, resource_name, branch_name, pattern, comment, Path(WORKING_DIRECTORY))
+
+    elif command == "ls" and CONTEXT_STRING.count("\\") == 4:
+        repository_name = CONTEXT_STRING.split("\\")[-3]
+        resource_name = CONTEXT_STRING.split("\\")[-2]
+        branch_name = CONTEXT_STRING.split("\\")[-1]
+
+        options = parse_listing_options(parts)
+        if options is not None:
+            version.list_versions(repository_name, resource_name, branch_name, options.limit, options.offset,
+                                  options.json_output)
+
+    elif command == "pull" and CONTEXT_STRING.count("\\") == 5:
+        repository_name = CONTEXT_STRING.split("\\")[-4]
+        resource_name = CONTEXT_STRING.split("\\")[-3]
+        branch_name = CONTEXT_STRING.split("\\")[-2]
+        version_name = CONTEXT_STRING.split("\\")[-1]
+
+        run_transfer(f"pull {repository_name}/{resource_name}/{branch_name}/{version_name}", version.pull,
+                     repository_name, resource_name, branch_name, version_name, WORKING_DIRECTORY)
+
+    elif command == "metadata" and CONTEXT_STRING.count("\\") == 5:
+        repository_name = CONTEXT_STRING.split("\\")[-4]
+        resource_name = CONTEXT_STRING.split("\\")[-3]
+        branch_name = CONTEXT_STRING.split("\\")[-2]
+        version_name = CONTEXT_STRING.split("\\")[-1]
+
+        version.show_version_metadata(repository_name, resource_name, branch_name, version_name)
+
+    # -------- ERROR MANAGEMENT --------
+    else:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Command {command} not found")
+
+    return True
+
+
+# -------- NON-INTERACTIVE MODE --------
+
+def create_app():
+    # typer is only needed to parse the arguments of scripted runs, the REPL starts without it
+    import typer
+
+    app = typer.Typer(help="Dddit CLI [v0.0.1]")
+
+    @app.command()
+    def run(
+            commands: List[str] = typer.Option([], "--command", "-c", help="REPL command to run, can be repeated"),
+            script: Path = typer.Option(None, "--file", "-f", help="File with one REPL command per line"),
+            start_context: str = typer.Option(None, "--context", help="Context to start from, as repository/resource/branch/version"),
+            json_output: bool = typer.Option(False, "--json", help="Print one JSON object per command instead of log lines"),
+            keep_going: bool = typer.Option(False, "--keep-going", help="Keep running the next commands after a failure")
+    ):
+        raise typer.Exit(run_commands(commands, script, start_context, json_output, keep_going))
+
+    return app
+
+def run_commands(commands: List[str], script: Path | None, start_context: str | None, json_output: bool,
+                 keep_going: bool) -> int:
+    # Runs REPL commands without the prompt, banner or background revalidation. The local context is loaded
+    # from its cache, or built, only when the first command that needs it runs. Exit code is 0 when every
+    # command succeeded, 1 when one failed and 2 for usage errors.
+    if script is not None:
+        try:
+            lines = script.read_text(encoding="utf-8").splitlines()
+        except OSError as e:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Cannot read script {script} - {e}")
+            return EXIT_USAGE_ERROR
+
+        commands = list(commands) + [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+
+    # Blank commands, such as -c "", are skipped like blank script lines
+    commands = [cmd for cmd in commands if cmd.strip()]
+
+    if start_context:
+        commands = [f"cd {step}" for step in start_context.strip("/").split("/")] + list(commands)
+
+    if not commands:
+        print_parameters_error()
+        return EXIT_USAGE_ERROR
+
+    context_loaded = False
+    exit_code = EXIT_SUCCESS
+
+    for cmd in commands:
+        command = cmd.split()[0].lower()
+
+        console.start_recording(echo=not json_output)
+
+        if not context_loaded and command not in CONTEXT_FREE_COMMANDS:
+            load_script_context()
+            context_loaded = True
+
+        keep_running = execute_command(cmd)
+        records = console.stop_recording()
+        succeeded = all(record["level"] != ERROR_LEVEL for record in records)
+
+        # A cached context may miss items created since it was saved, so a failed cd rebuilds it once and retries
+        if not succeeded and command == "cd" and context_loaded:
+            console.start_recording(echo=not json_output)
+            context_manager.refresh_context(load_token())
+            keep_running = execute_command(cmd)
+            records = console.stop_recording()
+            succeeded = all(record["level"] != ERROR_LEVEL for record in records)
+
+        context_loaded = context_loaded or command in ("signup", "login")
+
+        if json_output:
+            sys.stdout.write(json.dumps({"command": cmd, "context": CONTEXT_STRING, "ok": succeeded, "messages": records}) + "\n")
+            sys.stdout.flush()
+
+        if not succeeded:
+            exit_code = EXIT_FAILURE
+            if not keep_going:
+                break
+
+        if not keep_running:
+            break
+
+    context_manager.persist_context()
+    http_client.close_session()
+    return exit_code
+
+def load_script_context():
+    global CONTEXT_STRING
+
+    token = load_token()
+    if not context_manager.load_cached_context(token):
+        create_context(token)
+
+    reset_context_string()
+    if context_manager.user_data["username"] is not None:
+        add_context_point(context_manager.user_data["username"])
 
 if __name__ == "__main__":
-    repl()
+    if len(sys.argv) > 1:
+        create_app()()
+    else:
+        repl()
@@ -0,0 +1,290 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from fake_server import MEGABYTE, FakeDdditServer
+
+# -------- CONFIGURATION --------
+ROOT_PATH = Path(__file__).resolve().parent.parent
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+USERNAME = "bench"
+
+# Commands timed by the REPL scenario, run in this order from the user context point down to a version
+REPL_STEPS = [
+    ("ls repositories", "ls"),
+    ("cd repository", "cd repository_0"),
+    ("ls resources", "ls"),
+    ("cd resource", "cd resource_0"),
+    ("tree", "tree"),
+    ("ls branches", "ls"),
+    ("cd branch", "cd main"),
+    ("ls versions", "ls"),
+    ("cd version", "cd v1"),
+    ("metadata", "metadata")
+]
+
+# The client modules read HOME and the DDDIT_ settings when imported, so they are imported once main has set them
+sys.path.insert(0, str(ROOT_PATH))
+
+# -------- MEASUREMENT FUNCTIONS --------
+
+def timed(function, *args) -> float:
+    # Runs function with the client console muted, returns its duration in seconds. Anything the client
+    # reports as an error makes the benchmark fail, a broken scenario must not pass for a fast one.
+    from subsystems.local.output_manager import ERROR_LEVEL, get_console
+
+    console = get_console()
+    console.start_recording(echo=False)
+    try:
+        started_at = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - started_at
+    finally:
+        records = console.stop_recording()
+
+    errors = [record["message"] for record in records if record["level"] == ERROR_LEVEL]
+    if errors or result is False:
+        raise RuntimeError(f"{getattr(function, '__name__', function)} failed - {errors[:1] or 'returned False'}")
+
+    return elapsed
+
+def summarize(prefix: str, timings: list) -> dict:
+    ordered = sorted(timings)
+    return {
+        f"{prefix}_median_ms": round(statistics.median(ordered) * 1000, 2),
+        f"{prefix}_p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2)
+    }
+
+def start_session(server: FakeDdditServer, token: str):
+    from subsystems.local import context_manager
+    from subsystems.network import http_client
+
+    http_client.set_token(token)
+    context_manager.clear_context(remove_cache=True)
+    timed(context_manager.create_context, token)
+
+# -------- CONTEXT SCENARIO --------
+
+def benchmark_context(server: FakeDdditServer, repository_counts: list, resource_counts: list, runs: int) -> list:
+    # Cold initialisation against the number of repositories and resources, then the revalidation of the
+    # cached context that follows every start, where each list is answered 304
+    from subsystems.local import context_manager
+    from subsystems.network import http_client
+
+    results = []
+
+    for repository_count in repository_counts:
+        for resource_count in resource_counts:
+            server.reset()
+            token = server.seed(USERNAME, repository_count, resource_count, versions=3)
+            http_client.set_token(token)
+
+            cold_timings, revalidate_timings = [], []
+            cold_requests = revalidate_requests = 0
+
+            for _ in range(runs):
+                context_manager.clear_context(remove_cache=True)
+                requests_before = server.request_count
+                cold_timings.append(timed(context_manager.create_context, token))
+                cold_requests = server.request_count - requests_before
+
+                timed(context_manager.load_cached_context, token)
+                requests_before = server.request_count
+                revalidate_timings.append(timed(context_manager.revalidate_context))
+                revalidate_requests = server.request_count - requests_before
+
+            metrics = {**summarize("cold", cold_timings), "cold_requests": cold_requests,
+                       **summarize("revalidate", revalidate_timings), "revalidate_requests": revalidate_requests}
+            results.append(report("context", f"{repository_count} repositories x {resource_count} resources",
+                                  {"repositories": repository_count, "resources": resource_count}, metrics))
+
+    return results
+
+# -------- TRANSFER SCENARIO --------
+
+def benchmark_transfers(server: FakeDdditServer, work_path: Path, mesh_sizes: list, texture_count: int,
+                        texture_kb: int, runs: int) -> list:
+    # Push and pull throughput of mesh files and material folders. Pulls skip the local object store, so every
+    # byte comes from the server, and materials get new content every run, so no texture is deduplicated.
+    from subsystems.local import context_manager
+    from subsystems.versioning import version
+
+    server.reset()
+    start_session(server, server.seed(USERNAME, 1, 1, versions=0))
+
+    pull_path = work_path / "pulls"
+    pull_path.mkdir(exist_ok=True)
+
+    def push_and_pull(path: Path, is_mesh: bool, size: int) -> dict:
+        push_timings, pull_timings = [], []
+
+        for _ in range(runs):
+            if not is_mesh:
+                for texture in path.iterdir():
+                    texture.write_bytes(os.urandom(texture.stat().st_size))
+
+            push_timings.append(timed(version.push_version, "repository_0", "resource_0", "main", path, "Benchmark", is_mesh))
+            version_name = context_manager.list_versions("repository_0", "resource_0", "main")[-1]
+
+            os.environ["DDDIT_DELTA_PULLS"] = "false"
+            try:
+                pull_timings.append(timed(version.pull, "repository_0", "resource_0", "main", version_name, pull_path))
+            finally:
+                del os.environ["DDDIT_DELTA_PULLS"]
+            shutil.rmtree(pull_path / version_name)
+
+        metrics = {**summarize("push", push_timings), **summarize("pull", pull_timings),
+                   "push_mb_s": round(size / MEGABYTE / statistics.median(push_timings), 2),
+                   "pull_mb_s": round(size / MEGABYTE / statistics.median(pull_timings), 2)}
+        return metrics
+
+    results = []
+
+    for size_mb in mesh_sizes:
+        mesh_path = work_path / f"mesh_{size_mb}mb.fbx"
+        with open(mesh_path, "wb") as f:
+            for _ in range(size_mb):
+                f.write(os.urandom(MEGABYTE))
+
+        results.append(report("transfer", f"mesh {size_mb} MB", {"sizeMb": size_mb},
+                              push_and_pull(mesh_path, True, size_mb * MEGABYTE)))
+
+    material_path = work_path / f"material_{texture_count}x{texture_kb}kb"
+    material_path.mkdir()
+    for i in range(texture_count):
+        (material_path / f"texture_{i}.png").write_bytes(bytes(texture_kb * 1024))
+
+    results.append(report("transfer", f"material {texture_count} x {texture_kb} KB",
+                          {"textures": texture_count, "textureKb": texture_kb},
+                          push_and_pull(material_path, False, texture_count * texture_kb * 1024)))
+
+    return results
+
+# -------- REPL SCENARIO --------
+
+def benchmark_repl(server: FakeDdditServer, work_path: Path, repository_count: int, resource_count: int,
+                   version_count: int, runs: int) -> list:
+    # Latency of the commands a user types while browsing, from the line being entered to the output
+    import CLI
+
+    server.reset()
+    start_session(server, server.seed(USERNAME, repository_count, resource_count, versions=version_count))
+    CLI.WORKING_DIRECTORY = work_path
+
+    timings = {label: [] for label, _ in REPL_STEPS}
+
+    for _ in range(runs):
+        CLI.reset_context_string()
+        CLI.add_context_point(USERNAME)
+
+        for label, command in REPL_STEPS:
+            timings[label].append(timed(CLI.execute_command, command))
+
+    params = {"repositories": repository_count, "resources": resource_count, "versions": version_count}
+    return [report("repl", label, params, summarize("latency", timings[label])) for label, _ in REPL_STEPS]
+
+# -------- RESULT FUNCTIONS --------
+
+def report(scenario: str, name: str, params: dict, metrics: dict) -> dict:
+    print(f"{scenario:<9} {name:<40} " + ", ".join(f"{key} {value}" for key, value in metrics.items()))
+    return {"scenario": scenario, "name": name, "params": params, "metrics": metrics}
+
+def save_results(results: list, args: argparse.Namespace, output: Path | None) -> Path:
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"e2e_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+    run = {
+        "createdAt": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "arguments": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results
+    }
+
+    output.write_text(json.dumps(run, indent=2), encoding="utf-8")
+    return output
+
+def compare_results(results: list, baseline_path: Path):
+    # Times and request counts are better when lower, throughputs when higher
+    baseline = {(r["scenario"], r["name"]): r["metrics"] for r in json.loads(baseline_path.read_text(encoding="utf-8"))["results"]}
+
+    print(f"\nCompared with {baseline_path}")
+    for result in results:
+        previous = baseline.get((result["scenario"], result["name"]))
+        if previous is None:
+            continue
+
+        for key, value in result["metrics"].items():
+            if not previous.get(key):
+                continue
+
+            change = (value - previous[key]) / previous[key] * 100
+            better = change > 0 if key.endswith("_mb_s") else change < 0
+            verdict = "better" if better else "worse" if abs(change) >= 5 else "same"
+            print(f"{result['scenario']:<9} {result['name']:<40} {key:<22} {previous[key]:>10} -> {value:>10} "
+                  f"({change:+.1f}%, {verdict})")
+
+# -------- MAIN --------
+
+def parse_counts(value: str) -> list:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="End-to-end client benchmarks against an in-process fake server")
+    parser.add_argument("--scenarios", default="context,transfer,repl", help="Comma separated scenarios to run")
+    parser.add_argument("--runs", type=int, default=3, help="Repetitions of every measurement")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay the fake server adds before every answer")
+    parser.add_argument("--bandwidth-mb", type=float, default=0, help="MB/s shared by all transfers, 0 for no limit")
+    parser.add_argument("--repositories", type=parse_counts, default=[1, 10, 50], help="Repository counts for the context scenario")
+    parser.add_argument("--resources", type=parse_counts, default=[1, 10], help="Resources per repository for the context scenario")
+    parser.add_argument("--mesh-mb", type=parse_counts, default=[8, 64], help="Mesh sizes in MB for the transfer scenario")
+    parser.add_argument("--textures", type=int, default=16, help="Textures of the material in the transfer scenario")
+    parser.add_argument("--texture-kb", type=int, default=512, help="Size of every texture in KB")
+    parser.add_argument("--repl-versions", type=int, default=50, help="Versions per branch in the REPL scenario")
+    parser.add_argument("--set", action="append", default=[], metavar="SETTING=VALUE", help="Client setting for this run, can be repeated")
+    parser.add_argument("--output", type=Path, default=None, help="Result file, by default a new file in benchmarks/results")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier result file to compare this run with")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",")]
+
+    with tempfile.TemporaryDirectory() as home, \
+            FakeDdditServer(latency=args.latency_ms / 1000, bandwidth=args.bandwidth_mb * MEGABYTE or None) as server:
+        # The client keeps its AppData folder in the temporary home, the user's own cache and session stay untouched
+        os.environ["HOME"] = os.environ["USERPROFILE"] = home
+        os.environ["DDDIT_BASE_URL"] = server.base_url
+        for setting in args.set:
+            key, _, value = setting.partition("=")
+            os.environ[f"DDDIT_{key.strip().upper()}"] = value.strip()
+
+        work_path = Path(home) / "work"
+        work_path.mkdir()
+
+        results = []
+        if "context" in scenarios:
+            results += benchmark_context(server, args.repositories, args.resources, args.runs)
+        if "transfer" in scenarios:
+            results += benchmark_transfers(server, work_path, args.mesh_mb, args.textures, args.texture_kb, args.runs)
+        if "repl" in scenarios:
+            results += benchmark_repl(server, work_path, 20, 10, args.repl_versions, max(args.runs, 5))
+
+    output = save_results(results, args, args.output)
+    print(f"\nResults saved to {output}")
+
+    if args.compare is not None:
+        compare_results(results, args.compare)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,631 @@
+import argparse
+import base64
+import hashlib
+import json
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# -------- CONFIGURATION --------
+# Bodies are read and written in blocks of this size, so the bandwidth limit applies while they stream
+BLOCK_SIZE = 64 * 1024
+
+MEGABYTE = 1024 * 1024
+
+# Endpoints that can be called without a token
+PUBLIC_PATHS = ("/", "/auth/signup", "/auth/login")
+
+# -------- TOKEN FUNCTIONS --------
+
+def encode_segment(value: dict | bytes) -> str:
+    raw = value if isinstance(value, bytes) else json.dumps(value).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+def issue_token(username: str) -> str:
+    # The client only reads the subject of its token without checking the signature, so an unsigned one will do
+    return ".".join([encode_segment({"alg": "HS256", "typ": "JWT"}), encode_segment({"sub": username}),
+                     encode_segment(uuid.uuid4().bytes)])
+
+# -------- MULTIPART FUNCTIONS --------
+
+def parse_multipart(body: bytes, content_type: str) -> tuple[dict, list]:
+    # Returns the text fields and the (field name, file name, content) of every file part
+    boundary = content_type.split("boundary=")[1].strip().strip('"').encode("utf-8")
+    fields, files = {}, []
+
+    for part in body.split(b"--" + boundary)[1:]:
+        if part.startswith(b"--"):
+            break
+
+        head, _, content = part[2:].partition(b"\r\n\r\n")
+        content = content[:-2]
+        disposition = next(line for line in head.decode("utf-8").split("\r\n")
+                           if line.lower().startswith("content-disposition"))
+
+        name = disposition.split('name="')[1].split('"')[0]
+        if 'filename="' in disposition:
+            files.append((name, disposition.split('filename="')[1].split('"')[0], content))
+        else:
+            fields[name] = content.decode("utf-8")
+
+    return fields, files
+
+def build_multipart(message: str, files: list) -> tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    body = bytearray(f'--{boundary}\r\nContent-Disposition: form-data; name="message"\r\n\r\n{message}\r\n'.encode("utf-8"))
+
+    for file_name, content in files:
+        body += (f'--{boundary}\r\nContent-Disposition: form-data; name="files"; filename="{file_name}"\r\n'
+                 f'Content-Type: application/octet-stream\r\n\r\n').encode("utf-8")
+        body += content + b"\r\n"
+
+    body += f"--{boundary}--\r\n".encode("utf-8")
+    return bytes(body), f"multipart/form-data; boundary={boundary}"
+
+# -------- FAKE SERVER CLASS --------
+
+class FakeDdditServer:
+    # Stand-in for the Dddit server with the endpoints the client uses, kept in memory and served from a
+    # background thread. Every request waits latency seconds before its answer, and request and response
+    # bodies share one link limited to bandwidth bytes per second, so transfers behave like a remote server.
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, bandwidth: float | None = None):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.lock = threading.RLock()
+        self.link_lock = threading.Lock()
+        self.link_free_at = 0.0
+        self.request_count = 0
+        self.reset()
+
+        self.httpd = ThreadingHTTPServer((host, port), FakeRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self
+        self.thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeDdditServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="fake-dddit-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FakeDdditServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    # -------- STATE --------
+
+    def reset(self):
+        with self.lock:
+            self.users = {}
+            self.tokens = {}
+            # repository -> {"owner", "contributors", "resources": {resource: {branch: [versions]}}}
+            self.repositories = {}
+            # (repository, resource, branch, version) -> {"files": {file name: hash}, "username", "pushedAt", "comment"}
+            self.versions = {}
+            self.objects = {}
+            self.uploads = {}
+            self.invitations = []
+            self.replies = {}
+
+    def add_user(self, username: str, password: str = "password") -> str:
+        with self.lock:
+            self.users[username] = password
+            token = issue_token(username)
+            self.tokens[token] = username
+            return token
+
+    def seed(self, username: str, repositories: int, resources: int, branches: int = 1, versions: int = 1,
+             contributed: int = 0) -> str:
+        # Creates repository_<i> with resource_<j>, each holding branches main, branch_1... and versions v1...,
+        # the last contributed repositories belonging to another user. Returns a token of username.
+        token = self.add_user(username)
+
+        with self.lock:
+            for i in range(repositories):
+                owner = username if i < repositories - contributed else f"{username}_teammate"
+                repository = {"owner": owner, "contributors": {username}, "resources": {}}
+                self.repositories[f"repository_{i}"] = repository
+
+                for j in range(resources):
+                    branch_names = ["main"] + [f"branch_{k}" for k in range(1, branches)]
+                    repository["resources"][f"resource_{j}"] = {b: [f"v{n}" for n in range(1, versions + 1)]
+                                                                 for b in branch_names}
+
+                    for branch_name in branch_names:
+                        for n in range(1, versions + 1):
+                            self.versions[(f"repository_{i}", f"resource_{j}", branch_name, f"v{n}")] = {
+                                "files": {}, "username": owner, "pushedAt": datetime.now().isoformat(),
+                                "comment": "Seeded version"}
+
+        return token
+
+    def store_version(self, fields: dict, files: dict, username: str) -> tuple[dict, int]:
+        # Returns the answer to a push or commit, named like the real server does
+        key = (fields.get("repositoryName"), fields.get("resourceName"), fields.get("branchName"))
+
+        with self.lock:
+            branches = self.find_resource(key[0], key[1])
+            if branches is None or key[2] not in branches:
+                return {"error": "Branch not found"}, 404
+
+            version_name = f"v{len(branches[key[2]]) + 1}"
+            branches[key[2]].append(version_name)
+            self.versions[key + (version_name,)] = {"files": files, "username": username,
+                                                     "pushedAt": datetime.now().isoformat(),
+                                                     "comment": fields.get("comment") or ""}
+
+        return {"message": f"Version pushed successfully with generated name {version_name}"}, 200
+
+    def find_resource(self, repository_name: str, resource_name: str) -> dict | None:
+        repository = self.repositories.get(repository_name)
+        if repository is None:
+            return None
+        return repository["resources"].get(resource_name)
+
+    def visible_repositories(self, username: str) -> tuple[list, list]:
+        with self.lock:
+            owned = [name for name, r in self.repositories.items() if r["owner"] == username]
+            contributed = [name for name, r in self.repositories.items()
+                           if r["owner"] != username and username in r["contributors"]]
+            return owned, contributed
+
+    # -------- NETWORK CONDITIONS --------
+
+    def wait_latency(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def wait_bandwidth(self, size: int):
+        # Blocks reserve the shared link one after the other, so parallel transfers split the bandwidth
+        if not self.bandwidth:
+            return
+
+        with self.link_lock:
+            now = time.monotonic()
+            self.link_free_at = max(self.link_free_at, now) + size / self.bandwidth
+            delay = self.link_free_at - now
+
+        time.sleep(delay)
+
+# -------- REQUEST HANDLER CLASS --------
+
+class FakeRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Headers and body are written separately, with Nagle's algorithm every small answer would wait for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def fake(self) -> FakeDdditServer:
+        return self.server.fake
+
+    # -------- READING AND WRITING --------
+
+    def read_body(self) -> bytes:
+        remaining = int(self.headers.get("Content-Length") or 0)
+        body = bytearray()
+
+        while remaining > 0:
+            block = self.rfile.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            self.fake.wait_bandwidth(len(block))
+            body += block
+            remaining -= len(block)
+
+        return bytes(body)
+
+    def send_body(self, body: bytes, status: int = 200, content_type: str = "application/json", headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        if self.command == "HEAD":
+            return
+
+        view = memoryview(body)
+        for offset in range(0, len(body), BLOCK_SIZE):
+            block = view[offset:offset + BLOCK_SIZE]
+            self.fake.wait_bandwidth(len(block))
+            self.wfile.write(block)
+
+    def send_json(self, data: dict, status: int = 200, headers: dict | None = None):
+        self.send_body(json.dumps(data).encode("utf-8"), status, headers=headers)
+
+    def send_conditional_json(self, data: dict):
+        # Lists carry an ETag, a client sending it back gets 304 while nothing changed
+        body = json.dumps(data, sort_keys=True).encode("utf-8")
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_body(body, headers={"ETag": etag})
+
+    def read_json(self, body: bytes) -> dict:
+        return json.loads(body or b"{}")
+
+    def read_form(self, body: bytes) -> dict:
+        return {key: values[0] for key, values in parse_qs(body.decode("utf-8"), keep_blank_values=True).items()}
+
+    # -------- DISPATCH --------
+
+    def do_GET(self):
+        self.handle_request()
+
+    def do_HEAD(self):
+        self.handle_request()
+
+    def do_POST(self):
+        self.handle_request()
+
+    def do_PUT(self):
+        self.handle_request()
+
+    def do_DELETE(self):
+        self.handle_request()
+
+    def handle_request(self):
+        url = urlsplit(self.path)
+        body = self.read_body()
+
+        with self.fake.lock:
+            self.fake.request_count += 1
+
+        self.fake.wait_latency()
+
+        username = None
+        if url.path not in PUBLIC_PATHS:
+            token = self.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+            username = self.fake.tokens.get(token)
+            if username is None:
+                self.send_json({"error": "Invalid or expired token"}, 401)
+                return
+
+        # A repeated request with an idempotency key gets the answer of the first one
+        idempotency_key = self.headers.get("Idempotency-Key")
+        reply_key = (idempotency_key, url.path)
+        if idempotency_key and reply_key in self.fake.replies:
+            self.send_json(*self.fake.replies[reply_key])
+            return
+
+        reply = self.route(url.path, parse_qs(url.query), body, username)
+        if reply is None:
+            return
+
+        if idempotency_key and self.command == "POST":
+            self.fake.replies[reply_key] = reply
+        self.send_json(*reply)
+
+    def route(self, path: str, query: dict, body: bytes, username: str | None) -> tuple[dict, int] | None:
+        # Returns the JSON answer and its status, or None when the handler already sent a response
+        parts = path.strip("/").split("/")
+
+        if path == "/":
+            return {"message": "Dddit fake server"}, 200
+
+        if parts[0] == "auth" and self.command == "POST":
+            return self.handle_auth(parts[1], self.read_json(body) if body else {}, username)
+
+        if path == "/repositories/owned":
+            owned, _ = self.fake.visible_repositories(username)
+            return {"message": "Owned repositories found successfully",
+                    "ownedRepositories": [{"repositoryName": name} for name in owned]}, 200
+
+        if path == "/repositories/contributed":
+            _, contributed = self.fake.visible_repositories(username)
+            return {"message": "Contributed repositories found successfully",
+                    "contributedRepositories": [{"repositoryName": name} for name in contributed]}, 200
+
+        if path in ("/repositories/create", "/resources/create", "/branches/create"):
+            return self.handle_create(parts[0], self.read_json(body), username)
+
+        if path == "/resources/list":
+            return self.handle_resource_list(self.read_json(body))
+
+        if path == "/resources/tree":
+            return self.handle_version_tree(self.read_json(body))
+
+        if parts[0] == "invitations":
+            return self.handle_invitation(parts[1], self.read_json(body) if body else {}, username)
+
+        if parts[0] == "versions":
+            return self.handle_version(parts[1:], query, body, username)
+
+        return {"error": f"No endpoint for {self.command} {path}"}, 404
+
+    # -------- AUTH ENDPOINTS --------
+
+    def handle_auth(self, action: str, data: dict, username: str | None) -> tuple[dict, int]:
+        fake = self.fake
+
+        if action == "signup":
+            if data.get("username") in fake.users:
+                return {"error": "Username already taken"}, 409
+            return {"message": "User registered successfully", "token": fake.add_user(data["username"], data["password"])}, 200
+
+        if action == "login":
+            if fake.users.get(data.get("username")) != data.get("password"):
+                return {"error": "Wrong username or password"}, 401
+            return {"message": "User logged in successfully", "token": fake.add_user(data["username"], data["password"])}, 200
+
+        if action == "logout":
+            token = self.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+            fake.tokens.pop(token, None)
+            return {"message": "User logged out successfully"}, 200
+
+        return {"error": "Unknown auth endpoint"}, 404
+
+    # -------- REPOSITORY, RESOURCE AND BRANCH ENDPOINTS --------
+
+    def handle_create(self, kind: str, data: dict, username: str) -> tuple[dict, int]:
+        fake = self.fake
+        repository_name = data.get("repositoryName")
+
+        with fake.lock:
+            if kind == "repositories":
+                if repository_name in fake.repositories:
+                    return {"error": "Repository already exists"}, 409
+                fake.repositories[repository_name] = {"owner": username, "contributors": {username}, "resources": {}}
+                return {"message": "Repository created successfully"}, 200
+
+            repository = fake.repositories.get(repository_name)
+            if repository is None:
+                return {"error": "Repository not found"}, 404
+
+            resources = repository["resources"]
+            if kind == "resources":
+                if data["resourceName"] in resources:
+                    return {"error": "Resource already exists"}, 409
+                resources[data["resourceName"]] = {"main": []}
+                return {"message": "Resource created successfully"}, 200
+
+            branches = resources.get(data.get("resourceName"))
+            if branches is None:
+                return {"error": "Resource not found"}, 404
+            if data["branchName"] in branches:
+                return {"error": "Branch already exists"}, 409
+            branches[data["branchName"]] = []
+            return {"message": "Branch created successfully"}, 200
+
+    def handle_resource_list(self, data: dict) -> None:
+        with self.fake.lock:
+            repository = self.fake.repositories.get(data.get("repositoryName"))
+            if repository is None:
+                self.send_json({"error": "Repository not found"}, 404)
+                return None
+            resources = [{"resourceName": name} for name in repository["resources"]]
+
+        self.send_conditional_json({"message": "Resources found successfully", "resources": resources})
+        return None
+
+    def handle_version_tree(self, data: dict) -> None:
+        with self.fake.lock:
+            branches = self.fake.find_resource(data.get("repositoryName"), data.get("resourceName"))
+            if branches is None:
+                self.send_json({"error": "Resource not found"}, 404)
+                return None
+            tree = {branch_name: list(versions) for branch_name, versions in branches.items()}
+
+        self.send_conditional_json({"message": "Version tree found successfully", "versionTree": tree})
+        return None
+
+    # -------- INVITATION ENDPOINTS --------
+
+    def handle_invitation(self, action: str, data: dict, username: str) -> tuple[dict, int]:
+        fake = self.fake
+
+        with fake.lock:
+            if action == "invite":
+                repository = fake.repositories.get(data.get("repositoryName"))
+                if repository is None or repository["owner"] != username:
+                    return {"error": "Repository not found"}, 404
+                if data.get("toUsername") not in fake.users:
+                    return {"error": "User not found"}, 404
+                fake.invitations.append({"from": username, "to": data["toUsername"], "repositoryName": data["repositoryName"]})
+                return {"message": "Invitation sent successfully"}, 200
+
+            if action == "list":
+                # The client reads the other user of an invitation from toUsername
+                received = [{"toUsername": i["from"], "repositoryName": i["repositoryName"]}
+                            for i in fake.invitations if i["to"] == username]
+                return {"message": "Invitations found successfully", "invitations": received}, 200
+
+            if action == "accept":
+                for invitation in fake.invitations:
+                    if (invitation["to"], invitation["from"], invitation["repositoryName"]) == \
+                            (username, data.get("toUsername"), data.get("repositoryName")):
+                        fake.invitations.remove(invitation)
+                        fake.repositories[invitation["repositoryName"]]["contributors"].add(username)
+                        return {"message": "Invitation accepted successfully"}, 200
+                return {"error": "Invitation not found"}, 404
+
+        return {"error": "Unknown invitation endpoint"}, 404
+
+    # -------- VERSION ENDPOINTS --------
+
+    def handle_version(self, parts: list, query: dict, body: bytes, username: str) -> tuple[dict, int] | None:
+        fake = self.fake
+        action = parts[0]
+
+        if action == "push":
+            fields, files = parse_multipart(body, self.headers.get("Content-Type", ""))
+            stored = {}
+            with fake.lock:
+                for _, file_name, content in files:
+                    file_hash = hashlib.sha256(content).hexdigest()
+                    fake.objects[file_hash] = content
+                    stored[file_name] = file_hash
+            for reference in json.loads(fields.get("references") or "[]"):
+                stored[reference["fileName"]] = reference["hash"]
+            return fake.store_version(fields, stored, username)
+
+        if action == "objects" and parts[1] == "check":
+            return self.handle_object_check(self.read_json(body))
+
+        if action == "objects":
+            return self.handle_object_download(parts[1])
+
+        if action == "uploads":
+            return self.handle_upload(parts[1:], body, username)
+
+        fields = self.read_form(body)
+        with fake.lock:
+            version = fake.versions.get((fields.get("repositoryName"), fields.get("resourceName"),
+                                         fields.get("branchName"), fields.get("versionName")))
+        if version is None:
+            return {"error": "Version not found"}, 404
+
+        if action == "metadata":
+            return {"message": "Metadata found successfully", "versionName": fields["versionName"],
+                    "username": version["username"], "pushedAt": version["pushedAt"],
+                    "comment": version["comment"], "tags": []}, 200
+
+        if action == "manifest":
+            return {"algorithm": "sha256", "files": [{"fileName": name, "hash": file_hash, "size": len(fake.objects[file_hash])}
+                                                     for name, file_hash in version["files"].items()]}, 200
+
+        if action == "pull":
+            wanted = json.loads(fields["fileNames"]) if fields.get("fileNames") else list(version["files"])
+            files = [(name, fake.objects[version["files"][name]]) for name in wanted if name in version["files"]]
+            multipart_body, content_type = build_multipart("Version pulled successfully", files)
+            self.send_body(multipart_body, content_type=content_type)
+            return None
+
+        return {"error": f"Unknown version endpoint {action}"}, 404
+
+    def handle_object_check(self, data: dict) -> tuple[dict, int]:
+        with self.fake.lock:
+            return {"missing": [h for h in data.get("hashes", []) if h not in self.fake.objects]}, 200
+
+    def handle_object_download(self, file_hash: str) -> None:
+        content = self.fake.objects.get(file_hash)
+        if content is None:
+            self.send_json({"error": "Object not found"}, 404)
+            return None
+
+        headers = {"Accept-Ranges": "bytes"}
+        requested_range = self.headers.get("Range")
+
+        if requested_range and self.command == "GET":
+            start, end = (int(v) for v in requested_range.removeprefix("bytes=").split("-"))
+            end = min(end, len(content) - 1)
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(content)}"
+            self.send_body(content[start:end + 1], 206, "application/octet-stream", headers)
+        else:
+            self.send_body(content, 200, "application/octet-stream", headers)
+
+        return None
+
+    def handle_upload(self, parts: list, body: bytes, username: str) -> tuple[dict, int]:
+        # Chunked mesh uploads and parallel material uploads share the session endpoints, both end with a commit
+        fake = self.fake
+
+        if not parts:
+            with fake.lock:
+                upload_id = uuid.uuid4().hex
+                fake.uploads[upload_id] = {"data": self.read_json(body), "files": {}, "chunks": [], "acknowledged": 0}
+            return {"uploadId": upload_id}, 200
+
+        with fake.lock:
+            upload = fake.uploads.get(parts[0])
+        if upload is None:
+            return {"error": "Upload session not found"}, 404
+
+        if len(parts) == 1 and self.command == "GET":
+            return {"acknowledgedChunks": upload["acknowledged"]}, 200
+
+        if len(parts) == 1 and self.command == "DELETE":
+            with fake.lock:
+                fake.uploads.pop(parts[0], None)
+            return {"message": "Upload session discarded"}, 200
+
+        if parts[1] == "chunks":
+            chunk_hash = hashlib.sha256(body).hexdigest()
+            if chunk_hash != self.headers.get("X-Chunk-SHA256"):
+                return {"error": "Chunk checksum mismatch"}, 400
+
+            with fake.lock:
+                if int(parts[2]) != upload["acknowledged"]:
+                    return {"error": "Chunk out of order"}, 409
+                upload["chunks"].append(body)
+                upload["acknowledged"] += 1
+
+                if upload["acknowledged"] == upload["data"].get("chunkCount"):
+                    content = b"".join(upload.pop("chunks"))
+                    file_hash = hashlib.sha256(content).hexdigest()
+                    fake.objects[file_hash] = content
+                    upload["files"][upload["data"]["fileName"]] = file_hash
+
+            return {"hash": chunk_hash}, 200
+
+        if parts[1] == "files":
+            file_hash = hashlib.sha256(body).hexdigest()
+            with fake.lock:
+                fake.objects[file_hash] = body
+                upload["files"][unquote(parts[2])] = file_hash
+            return {"hash": file_hash, "size": len(body)}, 200
+
+        if parts[1] == "commit":
+            data = self.read_json(body)
+            files = {}
+            for entry in data.get("files", []):
+                if upload["files"].get(entry["fileName"]) != entry["hash"]:
+                    return {"error": f"{entry['fileName']} was not confirmed"}, 409
+                files[entry["fileName"]] = entry["hash"]
+            for reference in data.get("references", []):
+                files[reference["fileName"]] = reference["hash"]
+
+            with fake.lock:
+                fake.uploads.pop(parts[0], None)
+            return fake.store_version(upload["data"], files, username)
+
+        return {"error": "Unknown upload endpoint"}, 404
+
+# -------- MAIN --------
+
+def main():
+    parser = argparse.ArgumentParser(description="In-memory stand-in for the Dddit server")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay added before every answer")
+    parser.add_argument("--bandwidth-mb", type=float, default=0, help="MB/s shared by all transfers, 0 for no limit")
+    parser.add_argument("--user", default="bench", help="User created with the seeded repositories")
+    parser.add_argument("--repositories", type=int, default=2, help="Repositories to seed")
+    parser.add_argument("--resources", type=int, default=2, help="Resources to seed in every repository")
+    args = parser.parse_args()
+
+    server = FakeDdditServer(port=args.port, latency=args.latency_ms / 1000,
+                             bandwidth=args.bandwidth_mb * MEGABYTE or None)
+    server.seed(args.user, args.repositories, args.resources)
+
+    print(f"Fake Dddit server on {server.base_url}, log in as {args.user} with password \"password\"")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
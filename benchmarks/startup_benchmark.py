@@ -0,0 +1,135 @@
+import argparse
+import os
+import re
+import select
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# -------- CONFIGURATION --------
+ROOT_PATH = Path(__file__).resolve().parent.parent
+
+# Modules that must only be imported once a command needs them
+LAZY_MODULES = ["requests", "requests_toolbelt", "jwt", "typer", "prompt_toolkit", "mimetypes"]
+
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+PROMPT_PATTERN = re.compile(rb"~[^\r\n$]* ?\$")
+
+# -------- IMPORT TIME FUNCTIONS --------
+
+def measure_import_time(home: str) -> dict:
+    # Runs "import CLI" in a fresh interpreter, returns the cumulative microseconds of every module it imported.
+    # Children are listed before their parent, so everything between the previous top level line and CLI belongs to it
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import CLI"],
+        cwd=ROOT_PATH, env={**os.environ, "HOME": home}, capture_output=True, text=True, timeout=60
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import CLI failed - {result.stderr.strip().splitlines()[-1:]}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if not match:
+            continue
+
+        modules[match.group(4)] = int(match.group(2))
+        if not match.group(3):
+            if match.group(4) == "CLI":
+                return modules
+            modules = {}
+
+    raise RuntimeError("import CLI missing from the import time report")
+
+def check_import_budget(budget_ms: float, home: str) -> bool:
+    modules = measure_import_time(home)
+    cli_ms = modules["CLI"] / 1000
+    ok = True
+
+    print(f"import CLI: {cli_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+    if cli_ms > budget_ms:
+        print(f"FAIL import CLI is over budget by {cli_ms - budget_ms:.1f} ms")
+        ok = False
+
+    for name in LAZY_MODULES:
+        if name in modules:
+            print(f"FAIL {name} is imported eagerly ({modules[name] / 1000:.1f} ms)")
+            ok = False
+
+    slowest = sorted(((us, name) for name, us in modules.items() if name != "CLI"), reverse=True)[:5]
+    for us, name in slowest:
+        print(f"  {name}: {us / 1000:.1f} ms")
+
+    return ok
+
+# -------- FIRST PROMPT FUNCTIONS --------
+
+def measure_first_prompt(home: str, timeout: float) -> float:
+    # Starts the REPL in a pseudo terminal and returns the seconds until the prompt is drawn
+    import pty
+
+    started_at = time.perf_counter()
+    pid, fd = pty.fork()
+    if pid == 0:
+        os.chdir(ROOT_PATH)
+        os.environ["HOME"] = home
+        os.execv(sys.executable, [sys.executable, "CLI.py"])
+
+    output = b""
+    elapsed = None
+    try:
+        while time.perf_counter() - started_at < timeout:
+            ready, _, _ = select.select([fd], [], [], 0.1)
+            if ready:
+                output += os.read(fd, 4096)
+            if PROMPT_PATTERN.search(re.sub(rb"\x1b\[[0-9;?]*[A-Za-z]", b"", output)):
+                elapsed = time.perf_counter() - started_at
+                break
+
+        os.write(fd, b"exit\r")
+        time.sleep(0.2)
+    finally:
+        try:
+            os.kill(pid, 9)
+        except ProcessLookupError:
+            pass
+        os.waitpid(pid, 0)
+        os.close(fd)
+
+    if elapsed is None:
+        raise RuntimeError(f"no prompt within {timeout:.0f} s")
+
+    return elapsed
+
+def report_first_prompt(label: str, home: str, runs: int, timeout: float):
+    timings = [measure_first_prompt(home, timeout) for _ in range(runs)]
+    print(f"{label}: min {min(timings) * 1000:.0f} ms, median {statistics.median(timings) * 1000:.0f} ms "
+          f"over {runs} runs")
+
+# -------- MAIN --------
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import time budget check and time to first prompt benchmark")
+    parser.add_argument("--budget-ms", type=float, default=150, help="Maximum cumulative time of import CLI")
+    parser.add_argument("--runs", type=int, default=5, help="Startups measured for the time to first prompt")
+    parser.add_argument("--timeout", type=float, default=30, help="Seconds to wait for the prompt")
+    parser.add_argument("--home", default=None, help="HOME with a cached context, measured as a second scenario")
+    parser.add_argument("--skip-prompt", action="store_true", help="Only run the import time budget check")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as empty_home:
+        ok = check_import_budget(args.budget_ms, empty_home)
+
+        if not args.skip_prompt:
+            report_first_prompt("first prompt without session", empty_home, args.runs, args.timeout)
+            if args.home:
+                report_first_prompt("first prompt with cached context", args.home, args.runs, args.timeout)
+
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,21 @@
+import os
 import typer
-import requests
 from datetime import datetime
-from rich.console import Console
+from subsystems.local.output_manager import get_console
 from rich.prompt import Prompt
 from subsystems.auth.dto.UserDTO import UserDTO
-from subsystems.local.context_manager import create_context, user_data
-from subsystems.local.token_manager import save_token, load_token, clear_token
+from subsystems.local.context_manager import create_context, clear_context
+from subsystems.local.token_manager import save_token, clear_token
 from subsystems.local.working_directory_manager import clear_working_directory
+from subsystems.network import http_client
 
 # -------- CONFIGURATION --------
-BASE_URL = "http://localhost:8080/auth"
+BASE_PATH = "/auth"
 
-console = Console()
+# Lets scripted runs log in without a terminal to type the password in
+PASSWORD_ENV = "DDDIT_PASSWORD"
+
+console = get_console()
 
 app = typer.Typer(help="Authentication commands")
 
@@ -22,19 +26,17 @@ def signup(
         username: str = typer.Argument(..., help="Username to register a new account")
 ) -> bool:
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    password = Prompt.ask(f"[white]{now}[/white] [PASSWORD]", password=True)
+    password = os.environ.get(PASSWORD_ENV) or Prompt.ask(f"[white]{now}[/white] [PASSWORD]", password=True)
 
     user = UserDTO(username=username, password=password)
 
-    token = load_token()
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
-
-    response = requests.post(f"{BASE_URL}/signup", json=user.__dict__, headers=headers)
+    response = http_client.post(f"{BASE_PATH}/signup", json=user.__dict__)
     data = response.json()
 
     new_token = data.get("token")
     if new_token:
         save_token(new_token)
+        http_client.set_token(new_token)
 
     message = data.get('message')
     error = data.get('error')
@@ -55,19 +57,17 @@ def login(
         username: str = typer.Argument(..., help="Username to log in to the account")
 ) -> bool:
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    password = Prompt.ask(f"[white]{now}[/white] [[cyan]PASSWORD[/cyan]]", password=True)
+    password = os.environ.get(PASSWORD_ENV) or Prompt.ask(f"[white]{now}[/white] [[cyan]PASSWORD[/cyan]]", password=True)
 
     user = UserDTO(username=username, password=password)
 
-    token = load_token()
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
-
-    response = requests.post(f"{BASE_URL}/login", json=user.__dict__, headers=headers)
+    response = http_client.post(f"{BASE_PATH}/login", json=user.__dict__)
     data = response.json()
 
     new_token = data.get("token")
     if new_token:
         save_token(new_token)
+        http_client.set_token(new_token)
 
     message = data.get('message')
     error = data.get('error')
@@ -85,22 +85,18 @@ def login(
 
 @app.command()
 def logout() -> bool:
-    token = load_token()
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
-
-    response = requests.post(f"{BASE_URL}/logout", headers=headers)
+    response = http_client.post(f"{BASE_PATH}/logout")
     data = response.json()
 
     if response.status_code == 200:
         clear_token()
+        http_client.set_token(None)
 
     message = data.get('message')
     error = data.get('error')
 
     if message:
-        user_data.clear()
-        user_data["username"] = None
-        user_data["repositories"] = []
+        clear_context(remove_cache=True)
 
         clear_working_directory()
 
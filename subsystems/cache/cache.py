@@ -0,0 +1,35 @@
+import typer
+from datetime import datetime
+from subsystems.local.output_manager import get_console
+from subsystems.local.object_store_manager import MEGABYTE, OBJECTS_DIR, collect_garbage, get_store_stats
+
+# -------- CONFIGURATION --------
+console = get_console()
+
+app = typer.Typer(help="Local object store commands")
+
+# -------- CLI COMMANDS --------
+
+@app.command("stats")
+def show_cache_stats():
+    stats = get_store_stats()
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Object store statistics for {OBJECTS_DIR}")
+    console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] Objects - {stats['objects']}")
+    console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] Size - {stats['bytes'] / MEGABYTE:.2f} MB "
+                  f"of {stats['budgetBytes'] / MEGABYTE:.2f} MB budget")
+
+    if stats["oldestUse"] is not None:
+        oldest_use = datetime.fromtimestamp(stats["oldestUse"]).strftime("%Y-%m-%d %H:%M:%S")
+        newest_use = datetime.fromtimestamp(stats["newestUse"]).strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] Least recently used object - {oldest_use}")
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] Most recently used object - {newest_use}")
+
+@app.command("gc")
+def collect_cache_garbage():
+    removed_objects, removed_bytes = collect_garbage()
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Removed {removed_objects} objects "
+                  f"({removed_bytes / MEGABYTE:.2f} MB) from the object store")
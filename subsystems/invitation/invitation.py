@@ -1,14 +1,14 @@
-import requests
 import typer
 from datetime import datetime
-from rich.console import Console
+from subsystems.local.listing_manager import ListingOptions, show_listing
+from subsystems.local.output_manager import get_console
 from subsystems.invitation.dto.InvitationDTO import InvitationDTO
-from subsystems.local.token_manager import load_token
+from subsystems.network import http_client
 
 # -------- CONFIGURATION --------
-BASE_URL = "http://localhost:8080/invitations"
+BASE_PATH = "/invitations"
 
-console = Console()
+console = get_console()
 
 app = typer.Typer(help="Invitations management commands")
 
@@ -21,10 +21,7 @@ def send_invitation(
 ):
     invitation_dto = InvitationDTO(to_username, repository_name)
 
-    token = load_token()
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
-
-    response = requests.post(f"{BASE_URL}/invite", json=invitation_dto.__dict__, headers=headers)
+    response = http_client.post(f"{BASE_PATH}/invite", json=invitation_dto.__dict__)
     data = response.json()
 
     message = data.get('message')
@@ -33,18 +30,19 @@ def send_invitation(
     if message:
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] {message}")
+        return True
     else:
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {error}")
+        return False
 
 @app.command("pending")
-def list_pending_invitations():
-
-    token = load_token()
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
-
-    response = requests.get(f"{BASE_URL}/list", headers=headers)
-    print(response.json())
+def list_pending_invitations(
+        limit: int | None = typer.Option(None, "--limit", help="Maximum number of invitations to show"),
+        offset: int = typer.Option(0, "--offset", help="Number of invitations to skip"),
+        json_output: bool = typer.Option(False, "--json", help="Print the invitations as one JSON document")
+):
+    response = http_client.get(f"{BASE_PATH}/list")
     json_data = response.json()
 
     error = json_data.get("error")
@@ -57,21 +55,16 @@ def list_pending_invitations():
     message = json_data.get('message')
 
     if message:
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] {message}")
-
-        if not data:
+        if not data and not json_output:
             now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] {message}")
             console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] No invitations received")
 
             return None
 
-        for invitation in data:
-            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            console.print(
-                f"[white]{now}[/white] [[cyan]INFO[/cyan]] Received invitation from "
-                f"{invitation.get('toUsername')} "
-                f"for {invitation.get('repositoryName')} repository")
+        show_listing([message], "invitations", data,
+                     lambda i: f"Received invitation from {i.get('toUsername')} for {i.get('repositoryName')} repository",
+                     ListingOptions(limit, offset, json_output))
 
 @app.command("accept")
 def accept_invitation(
@@ -82,10 +75,7 @@ def accept_invitation(
 
     invitation_dto = InvitationDTO(from_username, repository_name)
 
-    token = load_token()
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
-
-    response = requests.post(f"{BASE_URL}/accept", json=invitation_dto.__dict__, headers=headers)
+    response = http_client.post(f"{BASE_PATH}/accept", json=invitation_dto.__dict__)
     data = response.json()
 
     message = data.get('message')
@@ -94,8 +84,10 @@ def accept_invitation(
     if message:
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] {message}")
-        context_manager.update_context_after_invitation(token, repository_name)
+        context_manager.update_context_after_invitation(repository_name)
+        return True
 
     else:
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {error}")
\ No newline at end of file
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {error}")
+        return False
\ No newline at end of file
@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+# -------- CONFIGURATION --------
+APP_NAME = "Dddit"
+
+CONFIG_DIR = Path.home() / "AppData" / "Local" / APP_NAME
+
+CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+
+CONFIG_FILE = CONFIG_DIR / "config.json"
+
+ENV_PREFIX = "DDDIT_"
+
+DEFAULT_SETTINGS = {
+    "base_url": "http://localhost:8080",
+    "connect_timeout": 5.0,
+    "read_timeout": 60.0,
+    "total_timeout": 0,
+    "request_retries": 3,
+    "retry_base_delay": 0.5,
+    "retry_max_delay": 10.0,
+    "retry_budget": 20,
+    "http_pool_size": 16,
+    "context_workers": 8,
+    "transfer_chunk_size": 1024 * 1024,
+    "deduplicate_pushes": True,
+    "delta_pulls": True,
+    "object_store_budget_mb": 10240,
+    "parallel_uploads": True,
+    "upload_workers": 4,
+    "upload_retries": 3,
+    "parallel_pulls": True,
+    "download_workers": 4,
+    "download_retries": 3,
+    "pull_range_size": 8 * 1024 * 1024,
+    "chunked_mesh_uploads": True,
+    "upload_chunk_size": 8 * 1024 * 1024,
+    "batch_workers": 4,
+    "background_transfers": True,
+    "offline_probe_interval": 15.0,
+    "sync_workers": 4,
+    "collect_stats": False,
+    "trace_file": "",
+    "profile_commands": False,
+    "profile_top": 20,
+    "listing_page_size": 500,
+    "tree_versions": 5
+}
+
+# Settings read from config.json, read again only once the file changes on disk
+settings_cache: dict = {}
+
+settings_mtime: int | None = None
+
+# Grows every time the cached settings change, so callers holding resolved values know when to resolve them again
+settings_generation = 0
+
+settings_lock = threading.Lock()
+
+# -------- SETTINGS MANAGEMENT FUNCTIONS --------
+
+def load_settings() -> dict:
+    # A single stat per call, config.json is parsed again only when its modification time changed
+    global settings_cache, settings_mtime, settings_generation
+
+    try:
+        mtime = os.stat(CONFIG_FILE).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    with settings_lock:
+        if mtime == settings_mtime:
+            return settings_cache
+
+        settings = {}
+        if mtime is not None:
+            try:
+                with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+                    settings = json.load(f)
+            except (OSError, ValueError):
+                settings = {}
+
+        settings_cache, settings_mtime = settings, mtime
+        settings_generation += 1
+        return settings_cache
+
+def get_settings_generation() -> int:
+    load_settings()
+    return settings_generation
+
+def get_setting(key: str):
+    default = DEFAULT_SETTINGS[key]
+
+    env_value = os.environ.get(ENV_PREFIX + key.upper())
+    if env_value is not None:
+        return cast_setting(env_value, default)
+
+    value = load_settings().get(key)
+    if value is not None:
+        return cast_setting(value, default)
+
+    return default
+
+def cast_setting(value, default):
+    try:
+        if isinstance(default, bool):
+            return str(value).strip().lower() in ("1", "true", "yes", "on")
+        if isinstance(default, int):
+            return int(value)
+        if isinstance(default, float):
+            return float(value)
+        return str(value)
+    except (TypeError, ValueError):
+        return default
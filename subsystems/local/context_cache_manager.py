@@ -0,0 +1,51 @@
+import json
+import os
+from datetime import datetime
+from subsystems.local.token_manager import AUTH_DIR
+
+# -------- CONFIGURATION --------
+CACHE_FORMAT_VERSION = 1
+
+# -------- CONTEXT CACHE MANAGEMENT FUNCTIONS --------
+
+def get_context_cache_file(username: str):
+    return AUTH_DIR / f"{username}.context"
+
+def save_context_cache(username: str, repositories: list, stamps: dict):
+    cache_file = get_context_cache_file(username)
+    temp_file = cache_file.with_suffix(".context.tmp")
+
+    cache = {
+        "formatVersion": CACHE_FORMAT_VERSION,
+        "username": username,
+        "savedAt": datetime.now().isoformat(),
+        "repositories": repositories,
+        "stamps": stamps
+    }
+
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+
+    os.replace(temp_file, cache_file)
+
+def load_context_cache(username: str) -> dict | None:
+    cache_file = get_context_cache_file(username)
+
+    if not cache_file.exists():
+        return None
+
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if cache.get("formatVersion") != CACHE_FORMAT_VERSION or cache.get("username") != username:
+        return None
+
+    return cache
+
+def clear_context_cache(username: str):
+    cache_file = get_context_cache_file(username)
+    if cache_file.exists():
+        cache_file.unlink()
@@ -1,102 +1,346 @@
-import requests
-import jwt
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
 from datetime import datetime
+from itertools import islice
 from typing import Dict, List
-from rich.console import Console
+from subsystems.local import metrics_manager
+from subsystems.local.output_manager import get_console
+from subsystems.local.config_manager import get_setting
+from subsystems.local.context_cache_manager import save_context_cache, load_context_cache, clear_context_cache
+from subsystems.local.context_model import UserContext, RepositoryNode, ResourceNode, BranchNode, ContextView
+from subsystems.local.job_manager import submit
+from subsystems.network import http_client
 from subsystems.versioning.dto.RepositoryDTO import RepositoryDTO
 from subsystems.versioning.dto.ResourceDTO import ResourceDTO
 
 # -------- CONFIGURATION --------
-BASE_URL = "http://localhost:8080"
+console = get_console()
 
-console = Console()
+context = UserContext()
 
-user_data: Dict = {
-    "username": None,
-    "repositories": []
-}
+user_data = ContextView(context)
+
+# ETag of the last resource list (key "repository") and version tree (key "repository/resource") received
+context_stamps: Dict[str, str] = {}
+
+context_lock = threading.RLock()
+
+context_dirty = False
+
+context_generation = 0
 
 # -------- CONTEXT CREATION --------
 
-def create_context(token):
-    try:
-        username = jwt.decode(token, options={"verify_signature": False}).get("sub")
-        set_username(username)
-    except jwt.ExpiredSignatureError:
-        return None
-    except jwt.InvalidTokenError:
-        return None
+def create_context(token, max_workers: int | None = None) -> bool:
+    username = get_username_from_token(token)
+    if username is None:
+        return False
+
+    clear_context()
+    set_username(username)
 
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Initializing local context 0%")
 
-    repositories = get_repositories(token)
+    repositories = get_repositories()
+
+    if repositories is None:
+        return False
 
-    if repositories is None or len(repositories) == 0:
+    if len(repositories) == 0:
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Initializing local context 100%")
         console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Context initialized")
+        save_context()
+        return True
+
+    if not fetch_repositories_content(repositories, max_workers):
+        return False
+
+    save_context()
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Context initialized")
+    return True
+
+def refresh_context(token, max_workers: int | None = None) -> bool:
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Discarding cached context")
+
+    refreshed = False
+    try:
+        refreshed = create_context(token, max_workers)
+    finally:
+        # A refresh that failed half way keeps the last complete context instead of leaving the user without one
+        if not refreshed and load_cached_context(token):
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Refresh failed, keeping the cached context")
+
+    return refreshed
+
+def get_username_from_token(token) -> str | None:
+    if not token:
         return None
 
-    repository_counter = 0
-    for repository_name in repositories:
-        repository_counter += 1
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Initializing local context {repository_counter/len(repositories) * 100:.2f}%")
-        resources = get_resources(token, repository_name)
+    import jwt
+
+    try:
+        return jwt.decode(token, options={"verify_signature": False}).get("sub")
+    except jwt.ExpiredSignatureError:
+        return None
+    except jwt.InvalidTokenError:
+        return None
+
+# -------- CONTEXT CACHE --------
+
+def load_cached_context(token) -> bool:
+    global context_dirty
+
+    username = get_username_from_token(token)
+    if username is None:
+        return False
+
+    with metrics_manager.span("context.cache_load"):
+        cache = load_context_cache(username)
+    if cache is None:
+        return False
+
+    clear_context()
 
-        if resources is None:
+    with context_lock, metrics_manager.span("context.merge"):
+        set_username(username)
+        context.load_repositories(cache.get("repositories", []))
+        context_stamps.update(cache.get("stamps", {}))
+        context_dirty = False
+
+    saved_at = datetime.fromisoformat(cache.get("savedAt")).strftime("%Y-%m-%d %H:%M:%S")
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Local context loaded from cache saved at {saved_at}")
+    return True
+
+def save_context():
+    global context_dirty
+
+    with context_lock:
+        username = context.username
+        if username is None:
             return None
 
-        for resource_name in resources:
-            get_branches_and_versions(token, repository_name, resource_name)
+        repositories = context.repositories_to_list()
+        stamps = dict(context_stamps)
+        context_dirty = False
 
-    console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Context initialized")
+    with metrics_manager.span("context.cache_save"):
+        save_context_cache(username, repositories, stamps)
     return None
 
+def persist_context():
+    if context_dirty:
+        save_context()
+
+def clear_context(remove_cache: bool = False):
+    global context_dirty
+    global context_generation
+
+    with context_lock:
+        username = context.username
+
+        context.clear()
+        context_stamps.clear()
+
+        context_dirty = False
+        context_generation += 1
+
+    if remove_cache and username is not None:
+        clear_context_cache(username)
+
+# -------- CONTEXT REVALIDATION --------
+
+def revalidate_context_in_background() -> threading.Thread:
+    thread = threading.Thread(target=revalidate_context, name="context-revalidation", daemon=True)
+    thread.start()
+    return thread
+
+def revalidate_context() -> bool:
+    # Revalidation only adds what the server reports on top of the cached tree; the refresh command is
+    # the way to drop items that no longer exist on the server.
+    generation = context_generation
+
+    try:
+        json_owned, json_contributed = request_repositories()
+
+        error_message = json_owned.get("error") or json_contributed.get("error")
+        if error_message:
+            print_revalidation_error(error_message)
+            return False
+
+        if generation != context_generation:
+            return False
+
+        repositories = merge_repositories(json_owned, json_contributed)
+
+        if not fetch_repositories_content(repositories, revalidate_generation=generation):
+            return False
+
+    except Exception as e:
+        print_revalidation_error(str(e))
+        return False
+
+    if generation != context_generation:
+        return False
+
+    save_context()
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Cached context revalidated")
+    return True
+
+def print_revalidation_error(error_message: str):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Cached context could not be revalidated: {error_message}")
+
 # -------- CONTEXT UPDATE --------
 
-def update_context_after_invitation(token, repository_name):
+def update_context_after_invitation(repository_name, max_workers: int | None = None):
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Updating local context 0%")
 
     add_repository(repository_name, False)
-    resources = get_resources(token, repository_name)
+    resources = get_resources(repository_name)
+
+    if resources is None:
+        return None
 
-    if resources is None or len(resources) == 0:
+    if len(resources) == 0:
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Updating local context 100%")
 
-    resource_counter = 0
-    for resource_name in resources:
-        resource_counter += 1
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Updating local context {resource_counter / len(resources) * 100:.2f}%")
-        get_branches_and_versions(token, repository_name, resource_name)
+    if not fetch_resources_content(repository_name, resources, max_workers):
+        return None
+
+    save_context()
 
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Context updated")
     return None
 
-# -------- CONTEXT RETRIEVING FUNCTIONS --------
+# -------- CONCURRENT CONTEXT FETCHING --------
+
+def fetch_repositories_content(repositories: List[str], max_workers: int | None = None,
+                               revalidate_generation: int | None = None) -> bool:
+    # Resource lists and version trees are requested on worker threads, but every result is merged into
+    # the context from this thread only. When revalidating, requests carry the cached ETags and unchanged
+    # subtrees are kept as they are.
+    revalidate = revalidate_generation is not None
+
+    executor = ThreadPoolExecutor(max_workers=resolve_max_workers(max_workers))
+    pending_requests = {repository_name: 1 for repository_name in repositories}
+    futures = {submit(executor, request_resources, repository_name,
+                      context_stamps.get(repository_name) if revalidate else None): (repository_name, None)
+               for repository_name in repositories}
+    completed_repositories = 0
+
+    try:
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                repository_name, resource_name = futures.pop(future)
+                json_data, stamp = future.result()
+
+                error_message = json_data.get("error")
+                if error_message:
+                    if revalidate:
+                        print_revalidation_error(error_message)
+                    else:
+                        clear_context_with_error(error_message)
+                    return False
+
+                if revalidate and revalidate_generation != context_generation:
+                    return False
+
+                if resource_name is None:
+                    if json_data.get("notModified"):
+                        resources = list_resources(repository_name)
+                    else:
+                        resources = merge_resources(repository_name, json_data)
+                        set_stamp(stamp, repository_name)
+
+                    for resource_name_found in resources:
+                        pending_requests[repository_name] += 1
+                        tree_stamp = context_stamps.get(stamp_key(repository_name, resource_name_found)) if revalidate else None
+                        new_future = submit(executor, request_version_tree, repository_name, resource_name_found, tree_stamp)
+                        futures[new_future] = (repository_name, resource_name_found)
+
+                elif not json_data.get("notModified"):
+                    merge_version_tree(repository_name, resource_name, json_data)
+                    set_stamp(stamp, repository_name, resource_name)
+
+                pending_requests[repository_name] -= 1
+
+                if pending_requests[repository_name] == 0 and not revalidate:
+                    completed_repositories += 1
+                    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Initializing local context "
+                                  f"{completed_repositories / len(repositories) * 100:.2f}%")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return True
+
+def fetch_resources_content(repository_name: str, resources: List[str], max_workers: int | None = None) -> bool:
+    executor = ThreadPoolExecutor(max_workers=resolve_max_workers(max_workers))
+    futures = {submit(executor, request_version_tree, repository_name, resource_name): resource_name
+               for resource_name in resources}
+    completed_resources = 0
+
+    try:
+        for future in as_completed(futures):
+            json_data, stamp = future.result()
+
+            error_message = json_data.get("error")
+            if error_message:
+                clear_context_with_error(error_message)
+                return False
 
-def get_repositories(token) -> list[str] | None:
+            merge_version_tree(repository_name, futures[future], json_data)
+            set_stamp(stamp, repository_name, futures[future])
+
+            completed_resources += 1
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Updating local context "
+                          f"{completed_resources / len(resources) * 100:.2f}%")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return True
+
+def resolve_max_workers(max_workers: int | None) -> int:
+    if max_workers is None:
+        max_workers = get_setting("context_workers")
+    return max(1, max_workers)
+
+def clear_context_with_error(error_message: str):
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    clear_context()
 
-    response_owned = requests.get(f"{BASE_URL}/repositories/owned", headers=headers)
-    response_contributed = requests.get(f"{BASE_URL}/repositories/contributed", headers=headers)
+    console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Error during context initialization")
+    console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {error_message}")
+
+# -------- CONTEXT RETRIEVING FUNCTIONS --------
+
+def get_repositories() -> list[str] | None:
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    json_owned = response_owned.json()
-    json_contributed = response_contributed.json()
+    json_owned, json_contributed = request_repositories()
 
     error_message_owned = json_owned.get("error")
     error_message_contributed = json_contributed.get("error")
 
     if error_message_owned or error_message_contributed:
-        user_data.clear()
-        user_data["username"] = None
-        user_data["repositories"] = []
+        clear_context()
 
         console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Error during context initialization")
 
@@ -108,159 +352,208 @@ def get_repositories(token) -> list[str] | None:
 
         return None
 
-    repositories = []
+    return merge_repositories(json_owned, json_contributed)
 
-    for repository in json_owned.get("ownedRepositories", []):
-        repository_name = repository.get("repositoryName")
-        add_repository(repository_name, owned=True)
-        repositories.append(repository_name)
+def get_resources(repository_name) -> list[str] | None:
+    json_data, stamp = request_resources(repository_name)
 
-    for repository in json_contributed.get("contributedRepositories", []):
-        repository_name = repository.get("repositoryName")
-        add_repository(repository_name, owned=False)
-        repositories.append(repository_name)
+    error_message = json_data.get("error")
 
-    return repositories
+    if error_message:
+        clear_context_with_error(error_message)
+        return None
 
-def get_resources(token, repository_name) -> list[str] | None:
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    set_stamp(stamp, repository_name)
+    return merge_resources(repository_name, json_data)
 
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
+def request_repositories() -> tuple[dict, dict]:
+    response_owned = http_client.get("/repositories/owned")
+    response_contributed = http_client.get("/repositories/contributed")
+
+    return http_client.read_json(response_owned), http_client.read_json(response_contributed)
+
+def request_resources(repository_name, stamp: str | None = None) -> tuple[dict, str | None]:
+    headers = {}
+    if stamp:
+        headers["If-None-Match"] = stamp
 
     repository_dto = RepositoryDTO(repository_name)
 
-    response = requests.post(f"{BASE_URL}/resources/list", json=repository_dto.__dict__, headers=headers)
+    response = http_client.post("/resources/list", json=repository_dto.__dict__, headers=headers, idempotent=True)
 
-    error_message = response.json().get("error")
+    return read_conditional_response(response)
 
-    if error_message:
-        user_data.clear()
-        user_data["username"] = None
-        user_data["repositories"] = []
+def request_version_tree(repository_name, resource_name, stamp: str | None = None) -> tuple[dict, str | None]:
+    headers = {}
+    if stamp:
+        headers["If-None-Match"] = stamp
 
-        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Error during context initialization")
-        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {error_message}")
+    resource_dto = ResourceDTO(repository_name, resource_name)
 
-        return None
+    response = http_client.post("/resources/tree", json=resource_dto.__dict__, headers=headers, idempotent=True)
+
+    return read_conditional_response(response)
+
+def read_conditional_response(response) -> tuple[dict, str | None]:
+    if response.status_code == 304:
+        return {"notModified": True}, None
+
+    return http_client.read_json(response), response.headers.get("ETag")
+
+# -------- CONTEXT MERGING FUNCTIONS --------
+
+def merge_repositories(json_owned: dict, json_contributed: dict) -> list[str]:
+    repositories = []
+
+    for repository in json_owned.get("ownedRepositories", []):
+        repository_name = repository.get("repositoryName")
+        add_repository(repository_name, owned=True)
+        repositories.append(repository_name)
+
+    for repository in json_contributed.get("contributedRepositories", []):
+        repository_name = repository.get("repositoryName")
+        add_repository(repository_name, owned=False)
+        repositories.append(repository_name)
 
-    data = response.json()["resources"]
+    return repositories
 
+def merge_resources(repository_name, json_data: dict) -> list[str]:
     resources = []
 
-    for resource in data:
+    for resource in json_data.get("resources", []):
         resource_name = resource.get("resourceName")
         add_resource(repository_name, resource_name)
         resources.append(resource_name)
 
     return resources
 
-def get_branches_and_versions(token, repository_name, resource_name) -> None:
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+def merge_version_tree(repository_name, resource_name, json_data: dict) -> None:
+    data = json_data.get("versionTree") or {}
 
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
-
-    resource_dto = ResourceDTO(repository_name, resource_name)
+    with metrics_manager.span("context.merge"):
+        for branch_name, versions in data.items():
+            add_branch(repository_name, resource_name, branch_name)
 
-    response = requests.post(f"{BASE_URL}/resources/tree", json=resource_dto.__dict__, headers=headers)
+            for version_name in versions:
+                add_version(repository_name, resource_name, branch_name, version_name)
 
-    error_message = response.json().get("error")
-
-    if error_message:
-        user_data.clear()
-        user_data["username"] = None
-        user_data["repositories"] = []
-
-        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Error during context initialization")
-        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {error_message}")
+    return None
 
-        return None
-    
-    data = response.json().get("versionTree")
+def stamp_key(repository_name: str, resource_name: str | None = None) -> str:
+    return repository_name if resource_name is None else f"{repository_name}/{resource_name}"
 
-    for branch_name, versions in data.items():
-        add_branch(repository_name, resource_name, branch_name)
-        
-        for version_name in versions:
-            add_version(repository_name, resource_name, branch_name, version_name)
+def set_stamp(stamp: str | None, repository_name: str, resource_name: str | None = None):
+    global context_dirty
 
-    return None
+    with context_lock:
+        if stamp:
+            context_stamps[stamp_key(repository_name, resource_name)] = stamp
+        else:
+            context_stamps.pop(stamp_key(repository_name, resource_name), None)
+        context_dirty = True
 
 # -------- CONTEXT WRITING FUNCTIONS --------
 
 def set_username(username: str):
-    user_data["username"] = username
+    context.username = username
 
 def add_repository(repository_name: str, owned: bool):
-    if not any(r["name"] == repository_name for r in user_data["repositories"]):
-        user_data["repositories"].append({
-            "name": repository_name,
-            "owned": owned,
-            "resources": []
-        })
+    global context_dirty
+
+    with context_lock:
+        if repository_name not in context.repositories:
+            context.repositories[repository_name] = RepositoryNode(repository_name, owned)
+            context_dirty = True
 
 def add_resource(repository_name: str, resource_name: str):
-    repository = next((r for r in user_data["repositories"] if r["name"] == repository_name), None)
-    if repository:
-        if not any(res["name"] == resource_name for res in repository["resources"]):
-            repository["resources"].append({
-                "name": resource_name,
-                "branches": []
-            })
+    global context_dirty
+
+    with context_lock:
+        repository = context.get_repository(repository_name)
+        if repository and resource_name not in repository.resources:
+            repository.resources[resource_name] = ResourceNode(resource_name)
+            context_dirty = True
 
 def add_branch(repository_name: str, resource_name: str, branch_name: str):
-    repository = next((r for r in user_data["repositories"] if r["name"] == repository_name), None)
-    if repository:
-        resource = next((res for res in repository["resources"] if res["name"] == resource_name), None)
-        if resource:
-            if not any(b["name"] == branch_name for b in resource["branches"]):
-                resource["branches"].append({
-                    "name": branch_name,
-                    "versions": []
-                })
+    global context_dirty
+
+    with context_lock:
+        resource = context.get_resource(repository_name, resource_name)
+        if resource and branch_name not in resource.branches:
+            resource.branches[branch_name] = BranchNode(branch_name)
+            context_dirty = True
 
 def add_version(repository_name: str, resource_name: str, branch_name: str, version_name: str):
-    repository = next((r for r in user_data["repositories"] if r["name"] == repository_name), None)
-    if repository:
-        resource = next((res for res in repository["resources"] if res["name"] == resource_name), None)
-        if resource:
-            branch = next((b for b in resource["branches"] if b["name"] == branch_name), None)
-            if branch and version_name not in branch["versions"]:
-                branch["versions"].append(version_name)
+    global context_dirty
+
+    with context_lock:
+        branch = context.get_branch(repository_name, resource_name, branch_name)
+        if branch and version_name not in branch.versions:
+            branch.versions[version_name] = None
+            context_dirty = True
 
 # -------- CONTEXT READING FUNCTIONS --------
 
 def list_repositories(filter_type: str = "all") -> List[str]:
-    result = []
-    for r in user_data["repositories"]:
-        if filter_type == "all" or (filter_type == "owned" and r["owned"]) or (
-                filter_type == "contributed" and not r["owned"]):
-            result.append(f"{r['name']} ({'owned' if r['owned'] else 'contributed'})")
-    return result
+    with context_lock:
+        return [f"{r.name} ({'owned' if r.owned else 'contributed'})" for r in context.repositories.values()
+                if filter_type == "all" or (filter_type == "owned" and r.owned) or (
+                        filter_type == "contributed" and not r.owned)]
+
+def list_repository_names() -> List[str]:
+    with context_lock:
+        return list(context.repositories)
 
 def list_resources(repository_name: str) -> List[str]:
-    repository = next((r for r in user_data["repositories"] if r["name"] == repository_name), None)
-    return [res["name"] for res in repository["resources"]] if repository else []
+    with context_lock:
+        repository = context.get_repository(repository_name)
+        return list(repository.resources) if repository else []
 
 def list_branches(repository_name: str, resource_name: str) -> List[str]:
-    repository = next((r for r in user_data["repositories"] if r["name"] == repository_name), None)
-    if repository:
-        resource = next((res for res in repository["resources"] if res["name"] == resource_name), None)
-        if resource:
-            return [b["name"] for b in resource["branches"]]
-    return []
+    with context_lock:
+        resource = context.get_resource(repository_name, resource_name)
+        return list(resource.branches) if resource else []
 
 def list_versions(repository_name: str, resource_name: str, branch_name: str) -> List[str]:
-    repository = next((r for r in user_data["repositories"] if r["name"] == repository_name), None)
-    if repository:
-        resource = next((res for res in repository["resources"] if res["name"] == resource_name), None)
-        if resource:
-            branch = next((b for b in resource["branches"] if b["name"] == branch_name), None)
-            if branch:
-                return branch["versions"]
-    return []
+    with context_lock:
+        branch = context.get_branch(repository_name, resource_name, branch_name)
+        return list(branch.versions) if branch else []
+
+def count_versions(repository_name: str, resource_name: str, branch_name: str) -> int:
+    with context_lock:
+        branch = context.get_branch(repository_name, resource_name, branch_name)
+        return len(branch.versions) if branch else 0
+
+def list_versions_range(repository_name: str, resource_name: str, branch_name: str, start: int,
+                        end: int | None) -> List[str]:
+    # Versions start to end of a branch, oldest first, without copying the rest of its history. Negative
+    # bounds count from the most recent version, like list slices.
+    with context_lock:
+        branch = context.get_branch(repository_name, resource_name, branch_name)
+        if branch is None:
+            return []
+
+        start, end, _ = slice(start, end).indices(len(branch.versions))
+        if start >= len(branch.versions) // 2:
+            return list(islice(reversed(branch.versions), len(branch.versions) - end,
+                               len(branch.versions) - start))[::-1]
+        return list(islice(branch.versions, start, end))
+
+def has_repository(repository_name: str) -> bool:
+    return context.get_repository(repository_name) is not None
+
+def has_resource(repository_name: str, resource_name: str) -> bool:
+    return context.get_resource(repository_name, resource_name) is not None
+
+def has_branch(repository_name: str, resource_name: str, branch_name: str) -> bool:
+    return context.get_branch(repository_name, resource_name, branch_name) is not None
+
+def has_version(repository_name: str, resource_name: str, branch_name: str, version_name: str) -> bool:
+    branch = context.get_branch(repository_name, resource_name, branch_name)
+    return branch is not None and version_name in branch.versions
 
 # -------- CONTEXT DEBUG FUNCTION --------
 
 def print_structure():
     import json
-    print(json.dumps(user_data, indent=4))
+    print(json.dumps(dict(user_data), indent=4))
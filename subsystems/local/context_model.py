@@ -0,0 +1,96 @@
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+# -------- CONTEXT NODES --------
+
+@dataclass(slots=True)
+class BranchNode:
+    name: str
+    versions: Dict[str, None] = field(default_factory=dict) # Used as an insertion-ordered set
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "versions": list(self.versions)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BranchNode":
+        return cls(data["name"], dict.fromkeys(data.get("versions", [])))
+
+@dataclass(slots=True)
+class ResourceNode:
+    name: str
+    branches: Dict[str, BranchNode] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "branches": [b.to_dict() for b in self.branches.values()]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ResourceNode":
+        branches = (BranchNode.from_dict(b) for b in data.get("branches", []))
+        return cls(data["name"], {b.name: b for b in branches})
+
+@dataclass(slots=True)
+class RepositoryNode:
+    name: str
+    owned: bool
+    resources: Dict[str, ResourceNode] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "owned": self.owned, "resources": [r.to_dict() for r in self.resources.values()]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RepositoryNode":
+        resources = (ResourceNode.from_dict(r) for r in data.get("resources", []))
+        return cls(data["name"], data.get("owned", False), {r.name: r for r in resources})
+
+@dataclass(slots=True)
+class UserContext:
+    username: str | None = None
+    repositories: Dict[str, RepositoryNode] = field(default_factory=dict)
+
+    def clear(self):
+        self.username = None
+        self.repositories = {}
+
+    def get_repository(self, repository_name: str) -> RepositoryNode | None:
+        return self.repositories.get(repository_name)
+
+    def get_resource(self, repository_name: str, resource_name: str) -> ResourceNode | None:
+        repository = self.repositories.get(repository_name)
+        return repository.resources.get(resource_name) if repository else None
+
+    def get_branch(self, repository_name: str, resource_name: str, branch_name: str) -> BranchNode | None:
+        resource = self.get_resource(repository_name, resource_name)
+        return resource.branches.get(branch_name) if resource else None
+
+    def repositories_to_list(self) -> List[dict]:
+        return [r.to_dict() for r in self.repositories.values()]
+
+    def load_repositories(self, repositories: List[dict]):
+        nodes = (RepositoryNode.from_dict(r) for r in repositories)
+        self.repositories = {r.name: r for r in nodes}
+
+# -------- READ-ONLY CONTEXT VIEW --------
+
+class ContextView(Mapping):
+    # Exposes the context with the shape of the former user_data dictionary. Every lookup returns a fresh
+    # snapshot, so callers can neither mutate the model nor observe it half-updated.
+    __slots__ = ("_context",)
+
+    KEYS = ("username", "repositories")
+
+    def __init__(self, context: UserContext):
+        self._context = context
+
+    def __getitem__(self, key):
+        if key == "username":
+            return self._context.username
+        if key == "repositories":
+            return self._context.repositories_to_list()
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# -------- CONFIGURATION --------
+APP_NAME = "Dddit"
+
+INDEXES_DIR = Path.home() / "AppData" / "Local" / APP_NAME / "indexes"
+
+INDEXES_DIR.mkdir(parents=True, exist_ok=True)
+
+INDEX_FORMAT_VERSION = 1
+
+# Directories modified this recently may still change within the same mtime tick, so they are rescanned next time
+RACY_WINDOW_NS = 2 * 1_000_000_000
+
+index_lock = threading.RLock()
+
+# Working directory -> {"directories": {relative path: {"mtime", "files", "dirs"}}, "names": {name: [relative paths]}}
+loaded_indexes: Dict[str, dict] = {}
+
+# -------- INDEX PERSISTENCE FUNCTIONS --------
+
+def get_index_file(root: Path) -> Path:
+    root_hash = hashlib.sha256(str(root).encode("utf-8")).hexdigest()[:16]
+    return INDEXES_DIR / f"{root_hash}.json"
+
+def get_index(root: Path) -> dict:
+    with index_lock:
+        key = str(root)
+        if key not in loaded_indexes:
+            directories = load_directories(root)
+            loaded_indexes[key] = {"directories": directories, "names": build_names(directories)}
+        return loaded_indexes[key]
+
+def load_directories(root: Path) -> Dict[str, dict]:
+    try:
+        with open(get_index_file(root), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if index.get("formatVersion") != INDEX_FORMAT_VERSION or index.get("root") != str(root):
+        return {}
+
+    return index.get("directories", {})
+
+def save_index(root: Path):
+    with index_lock:
+        index_file = get_index_file(root)
+        temp_file = index_file.with_suffix(".json.tmp")
+
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump({"formatVersion": INDEX_FORMAT_VERSION, "root": str(root),
+                       "directories": get_index(root)["directories"]}, f)
+
+        os.replace(temp_file, index_file)
+
+# -------- INDEX REFRESH FUNCTIONS --------
+
+def refresh_index(root: Path) -> bool:
+    # Only directories whose mtime changed are listed again. Adding, removing or renaming an entry always
+    # updates the mtime of its parent, so an unchanged directory costs a single stat call.
+    with index_lock:
+        index = get_index(root)
+        directories = index["directories"]
+        visited = set()
+        changed = False
+        pending = [""]
+
+        while pending:
+            relative = pending.pop()
+            visited.add(relative)
+
+            try:
+                mtime = (root / relative).stat().st_mtime_ns
+            except OSError:
+                continue
+
+            entry = directories.get(relative)
+            if entry is None or entry["mtime"] != mtime:
+                entry = scan_directory(root / relative, mtime)
+                directories[relative] = entry
+                changed = True
+
+            pending.extend(f"{relative}/{name}" if relative else name for name in entry["dirs"])
+
+        for relative in [relative for relative in directories if relative not in visited]:
+            del directories[relative]
+            changed = True
+
+        if changed:
+            index["names"] = build_names(directories)
+            save_index(root)
+
+        return changed
+
+def refresh_index_in_background(root: Path) -> threading.Thread:
+    thread = threading.Thread(target=refresh_index, args=(root,), name="working-directory-index", daemon=True)
+    thread.start()
+    return thread
+
+def scan_directory(path: Path, mtime: int) -> dict:
+    files = []
+    dirs = []
+
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                (dirs if is_dir else files).append(entry.name)
+    except OSError:
+        pass
+
+    if time.time_ns() - mtime < RACY_WINDOW_NS:
+        mtime = -1
+
+    return {"mtime": mtime, "files": files, "dirs": dirs}
+
+def build_names(directories: Dict[str, dict]) -> Dict[str, List[str]]:
+    names = {}
+    for relative, entry in directories.items():
+        for name in entry["files"] + entry["dirs"]:
+            names.setdefault(os.path.normcase(name), []).append(f"{relative}/{name}" if relative else name)
+    return names
+
+# -------- INDEX LOOKUP FUNCTIONS --------
+
+def find_paths(root: Path, name: str) -> List[Path]:
+    # Reads the index as it is, the command looking names up refreshes it once beforehand with refresh_index
+    with index_lock:
+        return sorted(root / relative for relative in get_index(root)["names"].get(os.path.normcase(name), []))
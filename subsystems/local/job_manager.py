@@ -0,0 +1,319 @@
+import contextvars
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List
+from subsystems.local import profile_manager
+from subsystems.local.output_manager import get_console
+from subsystems.local.config_manager import get_setting
+
+# -------- CONFIGURATION --------
+console = get_console()
+
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+jobs: Dict[int, "Job"] = {}
+
+jobs_lock = threading.Lock()
+
+next_job_id = 1
+
+# Job whose thread is running the current code, workers started through submit() inherit it
+active_job: contextvars.ContextVar["Job | None"] = contextvars.ContextVar("active_job", default=None)
+
+# -------- JOB CLASS --------
+
+class JobCancelledError(Exception):
+    pass
+
+class JobTimeoutError(JobCancelledError):
+    pass
+
+class Job:
+    # A command running on its own thread, or the command running in the foreground. Transfers started by the
+    # command register their TransferProgress here, so the job can report bytes/s and ETA, and a cancel request
+    # or the total timeout stops them at the next chunk or request.
+    def __init__(self, job_id: int, description: str, key: str, background: bool = True):
+        self.job_id = job_id
+        self.description = description
+        self.key = key
+        self.background = background
+        self.status = RUNNING
+        self.error: str | None = None
+        self.started_at = time.monotonic()
+        self.finished_at: float | None = None
+        self.timeout = get_setting("total_timeout")
+        self.deadline = self.started_at + self.timeout if self.timeout > 0 else None
+        self.cancel_event = threading.Event()
+        self.transfers: Dict[str, object] = {}
+        self.transfers_lock = threading.Lock()
+        self.thread: threading.Thread | None = None
+
+    def add_transfer(self, progress):
+        # A retried transfer replaces its failed attempt, so bytes are not counted twice
+        with self.transfers_lock:
+            self.transfers[progress.label] = progress
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelledError(f"{self.description} cancelled")
+
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise JobTimeoutError(f"{self.description} timed out after {self.timeout:g} s")
+
+    def remaining_time(self) -> float | None:
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def elapsed(self) -> float:
+        return max((self.finished_at or time.monotonic()) - self.started_at, 1e-9)
+
+    def progress(self) -> tuple[int, int | None, float]:
+        # Transferred bytes, total bytes when every transfer knows its size and bytes per second
+        with self.transfers_lock:
+            transfers = list(self.transfers.values())
+
+        transferred_bytes = sum(t.transferred_bytes for t in transfers)
+        sizes = [t.total_bytes for t in transfers]
+        total_bytes = sum(sizes) if transfers and all(sizes) else None
+        rate = sum(t.transferred_bytes - t.initial_bytes for t in transfers) / self.elapsed()
+
+        return transferred_bytes, total_bytes, rate
+
+    def is_running(self) -> bool:
+        return self.status == RUNNING
+
+# -------- JOB MANAGEMENT FUNCTIONS --------
+
+def start_job(description: str, key: str, function: Callable[[], bool | None],
+              on_finish: Callable[["Job"], None] | None = None) -> Job | None:
+    # Runs function on a daemon thread, a False result counts as a failure. Jobs with the same key, for example
+    # two pulls of one version, cannot run at the same time.
+    global next_job_id
+
+    with jobs_lock:
+        for job in jobs.values():
+            if job.is_running() and job.key == key:
+                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Job {job.job_id} is already running {job.description}")
+                return None
+
+        job = Job(next_job_id, description, key)
+        jobs[job.job_id] = job
+        next_job_id += 1
+
+    def run():
+        active_job.set(job)
+
+        try:
+            with profile_manager.profile_command(description):
+                result = function()
+            status = FAILED if result is False else DONE
+        except JobTimeoutError as e:
+            job.error = str(e)
+            status = FAILED
+        except JobCancelledError:
+            status = CANCELLED
+        except Exception as e:
+            job.error = str(e)
+            status = FAILED
+
+        job.finished_at = time.monotonic()
+        job.status = status
+
+        if on_finish is not None:
+            on_finish(job)
+
+        report_finished_job(job)
+
+    job.thread = threading.Thread(target=contextvars.copy_context().run, args=(run,), name=f"job-{job.job_id}", daemon=True)
+    job.thread.start()
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Job {job.job_id} started - {description}")
+    return job
+
+@contextmanager
+def foreground_job(description: str):
+    # Runs the body as an unlisted job, so it gets the total timeout and Ctrl-C cancels its transfers. The
+    # handler sets the cancel flag before raising KeyboardInterrupt, so worker threads stop at their next chunk
+    # while the interrupted thread unwinds.
+    job = Job(0, description, description, background=False)
+    token = active_job.set(job)
+
+    def interrupt(signum, frame):
+        job.cancel_event.set()
+        raise KeyboardInterrupt
+
+    previous_handler = None
+    if threading.current_thread() is threading.main_thread():
+        previous_handler = signal.signal(signal.SIGINT, interrupt)
+
+    try:
+        yield job
+    finally:
+        if previous_handler is not None:
+            signal.signal(signal.SIGINT, previous_handler)
+        active_job.reset(token)
+
+def current_job() -> Job | None:
+    return active_job.get()
+
+def check_cancelled():
+    job = current_job()
+    if job is not None:
+        job.check_cancelled()
+
+def sleep(seconds: float):
+    # Pauses the current job, waking up as soon as it is cancelled and never past its total timeout
+    job = current_job()
+    if job is None:
+        time.sleep(seconds)
+        return
+
+    remaining = job.remaining_time()
+    job.cancel_event.wait(seconds if remaining is None else min(seconds, remaining))
+    job.check_cancelled()
+
+def remaining_time() -> float | None:
+    # Time left before the total timeout of the current job, None without a limit
+    job = current_job()
+    return job.remaining_time() if job is not None else None
+
+def submit(executor, function: Callable, *args):
+    # Executor workers do not inherit context variables, every task gets its own copy so it runs in the same job
+    return executor.submit(contextvars.copy_context().run, function, *args)
+
+def get_jobs(job_ids: List[int] | None = None) -> List[Job] | None:
+    # Returns None when one of the given ids is unknown
+    with jobs_lock:
+        if not job_ids:
+            return list(jobs.values())
+
+        if any(job_id not in jobs for job_id in job_ids):
+            return None
+
+        return [jobs[job_id] for job_id in job_ids]
+
+def running_jobs() -> List[Job]:
+    with jobs_lock:
+        return [job for job in jobs.values() if job.is_running()]
+
+def forget_finished_jobs(shown_jobs: List[Job]):
+    with jobs_lock:
+        for job in shown_jobs:
+            if not job.is_running():
+                jobs.pop(job.job_id, None)
+
+# -------- JOB COMMANDS --------
+
+def show_jobs():
+    # Finished jobs are listed once more, then forgotten
+    listed_jobs = get_jobs()
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if not listed_jobs:
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] No background jobs")
+        return
+
+    for job in listed_jobs:
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] [{job.job_id}] {job.status} {describe_job(job)}")
+
+    forget_finished_jobs(listed_jobs)
+
+def wait_jobs(job_ids: List[int] | None = None, interval: float = 1.0) -> bool:
+    # Blocks until the jobs finish, reporting their progress, Ctrl-C stops waiting without cancelling them
+    waited_jobs = get_jobs(job_ids)
+    if waited_jobs is None:
+        print_unknown_job_error(job_ids)
+        return False
+
+    waited_jobs = [job for job in waited_jobs if job.is_running()]
+    if not waited_jobs:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] No running jobs to wait for")
+        return True
+
+    try:
+        while True:
+            for job in waited_jobs:
+                job.thread.join(timeout=interval / len(waited_jobs))
+
+            pending_jobs = [job for job in waited_jobs if job.is_running()]
+            if not pending_jobs:
+                break
+
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            for job in pending_jobs:
+                console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] [{job.job_id}] {job.status} {describe_job(job)}")
+    except KeyboardInterrupt:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Stopped waiting, jobs keep running in background")
+        return False
+
+    forget_finished_jobs(waited_jobs)
+    return all(job.status == DONE for job in waited_jobs)
+
+def cancel_jobs(job_ids: List[int] | None = None) -> bool:
+    cancelled_jobs = get_jobs(job_ids)
+    if cancelled_jobs is None:
+        print_unknown_job_error(job_ids)
+        return False
+
+    cancelled_jobs = [job for job in cancelled_jobs if job.is_running()]
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if not cancelled_jobs:
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] No running jobs to cancel")
+        return True
+
+    for job in cancelled_jobs:
+        job.cancel_event.set()
+        console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Cancelling job {job.job_id} - {job.description}")
+
+    return True
+
+# -------- JOB REPORTING FUNCTIONS --------
+
+def describe_job(job: Job) -> str:
+    from subsystems.network.transfer_progress import MEGABYTE, format_duration
+
+    transferred_bytes, total_bytes, rate = job.progress()
+    description = f"{job.description} - {format_duration(job.elapsed())}"
+
+    if transferred_bytes or total_bytes:
+        if total_bytes:
+            percentage = transferred_bytes / total_bytes * 100
+            description += f", {transferred_bytes / MEGABYTE:.2f}/{total_bytes / MEGABYTE:.2f} MB ({percentage:.2f}%)"
+        else:
+            description += f", {transferred_bytes / MEGABYTE:.2f} MB"
+
+        description += f" at {rate / MEGABYTE:.2f} MB/s"
+
+        if job.is_running() and total_bytes and rate > 0:
+            description += f", ETA {format_duration(max(total_bytes - transferred_bytes, 0) / rate)}"
+
+    if job.error:
+        description += f" - {job.error}"
+
+    return description
+
+def report_finished_job(job: Job):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if job.status == DONE:
+        console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Job {job.job_id} finished - {describe_job(job)}")
+    elif job.status == CANCELLED:
+        console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Job {job.job_id} cancelled - {describe_job(job)}")
+    else:
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Job {job.job_id} failed - {describe_job(job)}")
+
+def print_unknown_job_error(job_ids: List[int]):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Unknown job among {', '.join(str(i) for i in job_ids)}")
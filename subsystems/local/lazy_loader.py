@@ -0,0 +1,24 @@
+import importlib.util
+import sys
+from types import ModuleType
+
+# -------- LAZY IMPORT FUNCTIONS --------
+
+def lazy_import(name: str) -> ModuleType:
+    # Returns the module right away but runs its code on first attribute access, so subsystems and heavy
+    # dependencies only cost startup time once a command actually uses them
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        # Only named by string, a frozen build has to be told to bundle it with --collect-submodules subsystems
+        raise ImportError(f"Cannot find module {name}, it may be missing from the build", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List
+from subsystems.local.config_manager import get_setting
+from subsystems.local.output_manager import get_console
+
+# -------- CONFIGURATION --------
+console = get_console()
+
+# -------- LISTING OPTIONS --------
+
+@dataclass(slots=True)
+class ListingOptions:
+    limit: int | None = None
+    offset: int = 0
+    json_output: bool = False
+
+def parse_listing_options(parts: List[str]) -> ListingOptions | None:
+    # Reads --limit <n>, --offset <n> and --json from a command line, returns None after printing the error of
+    # a malformed option
+    options = ListingOptions()
+
+    index = 0
+    while index < len(parts):
+        part = parts[index].lower()
+
+        if part == "--json":
+            options.json_output = True
+        elif part in ("--limit", "--offset"):
+            value = parts[index + 1] if index + 1 < len(parts) else ""
+            if not value.isdigit():
+                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {part} needs a number, not {value or 'nothing'}")
+                return None
+
+            if part == "--limit":
+                options.limit = int(value)
+            else:
+                options.offset = int(value)
+            index += 1
+
+        index += 1
+
+    return options
+
+# -------- LISTING FUNCTIONS --------
+
+def show_listing(messages: List[str], key: str, items: list, render: Callable[[object], str] = str,
+                 options: ListingOptions | None = None):
+    # Prints the success messages and one page of items with a single timestamp. In a terminal, long listings
+    # stop after listing_page_size items unless a limit was given, with a hint to see the rest.
+    options = options or ListingOptions()
+    start, end = get_page(len(items), options)
+    page = items[start:end]
+
+    if options.json_output:
+        console.print_data({key: page, "total": len(items), "offset": start})
+        return
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    for message in messages:
+        console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] {message}")
+
+    console.print_rows(now, "INFO", "cyan", [render(item) for item in page])
+    print_page_hint(now, key, start, end, len(items))
+
+def get_page(total: int, options: ListingOptions) -> tuple[int, int]:
+    # Bounds of the items to show, a terminal gets listing_page_size items when no limit was given
+    limit = options.limit
+    if limit is None and console.is_terminal and not options.json_output:
+        limit = get_setting("listing_page_size") or None
+
+    start = min(options.offset, total)
+    end = total if limit is None else min(total, start + limit)
+    return start, end
+
+def print_page_hint(now: str, key: str, start: int, end: int, total: int):
+    if end < total:
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] Showing {start + 1}-{end} of {total} {key}, "
+                      f"add --offset {end} for the next ones")
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List
+from subsystems.local import metrics_manager
+
+# -------- CONFIGURATION --------
+APP_NAME = "Dddit"
+
+MANIFESTS_DIR = Path.home() / "AppData" / "Local" / APP_NAME / "manifests"
+
+MANIFESTS_DIR.mkdir(parents=True, exist_ok=True)
+
+HASH_ALGORITHM = "sha256"
+
+# -------- HASHING FUNCTIONS --------
+
+def hash_file(path: Path, chunk_size: int) -> str:
+    digest = hashlib.new(HASH_ALGORITHM)
+    with metrics_manager.span("disk.hash"), open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def build_manifest(paths: List[Path], chunk_size: int) -> Dict[str, dict]:
+    return {path.name: describe_file(path, hash_file(path, chunk_size)) for path in paths}
+
+def describe_file(path: Path, file_hash: str) -> dict:
+    # Size and modification time let later pulls reuse the file without hashing it again
+    stat = path.stat()
+    return {"hash": file_hash, "size": stat.st_size, "path": str(path.resolve()), "mtime": stat.st_mtime_ns}
+
+# -------- MANIFEST MANAGEMENT FUNCTIONS --------
+
+def get_manifest_file(repository_name: str, resource_name: str, branch_name: str, version_name: str) -> Path:
+    return MANIFESTS_DIR / repository_name / resource_name / branch_name / f"{version_name}.json"
+
+def save_manifest(repository_name: str, resource_name: str, branch_name: str, version_name: str, files: Dict[str, dict]):
+    manifest_file = get_manifest_file(repository_name, resource_name, branch_name, version_name)
+    manifest_file.parent.mkdir(parents=True, exist_ok=True)
+
+    temp_file = manifest_file.with_suffix(".json.tmp")
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump({"algorithm": HASH_ALGORITHM, "versionName": version_name, "files": files}, f)
+
+    os.replace(temp_file, manifest_file)
+
+def load_manifest(repository_name: str, resource_name: str, branch_name: str, version_name: str) -> Dict[str, dict] | None:
+    manifest_file = get_manifest_file(repository_name, resource_name, branch_name, version_name)
+
+    if not manifest_file.exists():
+        return None
+
+    try:
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get("algorithm") != HASH_ALGORITHM:
+        return None
+
+    return manifest.get("files")
+
+# -------- LOCAL COPIES LOOKUP --------
+
+def find_local_copies(repository_name: str, resource_name: str) -> Dict[str, Path]:
+    # Maps every hash recorded for the resource to a file on disk that still matches its manifest entry
+    copies = {}
+
+    resource_dir = MANIFESTS_DIR / repository_name / resource_name
+    if not resource_dir.exists():
+        return copies
+
+    for manifest_file in resource_dir.glob("*/*.json"):
+        branch_name = manifest_file.parent.name
+        files = load_manifest(repository_name, resource_name, branch_name, manifest_file.stem) or {}
+
+        for entry in files.values():
+            if entry["hash"] in copies or not entry.get("path"):
+                continue
+
+            path = Path(entry["path"])
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+
+            if stat.st_size == entry["size"] and stat.st_mtime_ns == entry.get("mtime"):
+                copies[entry["hash"]] = path
+
+    return copies
@@ -0,0 +1,235 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Dict
+from subsystems.local.config_manager import get_setting
+from subsystems.local.output_manager import get_console
+
+# -------- CONFIGURATION --------
+console = get_console()
+
+MEGABYTE = 1024 * 1024
+
+# Upper bounds of the histogram buckets in milliseconds, the last bucket takes everything slower
+BUCKET_BOUNDS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, float("inf"))
+
+# Read once, every instrumented call site checks this flag before taking a single timestamp
+enabled = get_setting("collect_stats")
+
+histograms: Dict[str, "Histogram"] = {}
+
+# Bytes moved over the network and to disk, by name
+counters: Dict[str, int] = {}
+
+metrics_lock = threading.Lock()
+
+collected_since = datetime.now()
+
+trace_file = None
+
+trace_path: Path | None = None
+
+# -------- HISTOGRAM CLASS --------
+
+class Histogram:
+    # Fixed log-spaced buckets, so recording costs the same whatever the number of samples and percentiles are
+    # read from the bucket bounds, capped by the slowest sample seen
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = 0.0
+        self.buckets = [0] * len(BUCKET_BOUNDS)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.buckets[bisect_left(BUCKET_BOUNDS, value)] += 1
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        target = fraction * self.count
+        seen = 0
+
+        for bound, bucket in zip(BUCKET_BOUNDS, self.buckets):
+            seen += bucket
+            if seen >= target:
+                return min(bound, self.maximum)
+
+        return self.maximum
+
+# -------- SPAN CLASSES --------
+
+class Span:
+    __slots__ = ("name", "fields", "started_at")
+
+    def __init__(self, name: str, fields: dict):
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self) -> "Span":
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, (time.perf_counter() - self.started_at) * 1000, **self.fields)
+
+class NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "NullSpan":
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+NULL_SPAN = NullSpan()
+
+# -------- RECORDING FUNCTIONS --------
+
+def span(name: str, **fields) -> Span | NullSpan:
+    # Times the block it wraps, a shared no-op span is handed out when collection is off
+    if not enabled:
+        return NULL_SPAN
+    return Span(name, fields)
+
+def record(name: str, milliseconds: float, **fields):
+    if not enabled:
+        return
+
+    with metrics_lock:
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = histograms[name] = Histogram()
+        histogram.observe(milliseconds)
+
+        if trace_file is not None:
+            write_trace({"at": time.time(), "span": name, "ms": round(milliseconds, 3), **fields})
+
+def count_bytes(name: str, amount: int):
+    if not enabled:
+        return
+
+    with metrics_lock:
+        counters[name] = counters.get(name, 0) + amount
+
+def write(file, data: bytes):
+    # Writes data to an open file, timing the write and counting its bytes
+    if not enabled:
+        file.write(data)
+        return
+
+    started_at = time.perf_counter()
+    file.write(data)
+    record("disk.write", (time.perf_counter() - started_at) * 1000)
+    count_bytes("disk.bytes_written", len(data))
+
+def reset_metrics():
+    global collected_since
+
+    with metrics_lock:
+        histograms.clear()
+        counters.clear()
+        collected_since = datetime.now()
+
+# -------- TRACE FILE FUNCTIONS --------
+
+def write_trace(sample: dict):
+    # Called with metrics_lock held, a trace that can no longer be written is closed instead of failing the command
+    global trace_file
+
+    try:
+        trace_file.write(json.dumps(sample) + "\n")
+    except (OSError, ValueError):
+        trace_file = None
+
+def open_trace(path: Path) -> bool:
+    global trace_file, trace_path
+
+    try:
+        new_trace_file = open(path, "a", encoding="utf-8", buffering=1)
+    except OSError as e:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Cannot open trace file {path} - {e}")
+        return False
+
+    close_trace()
+
+    with metrics_lock:
+        trace_file, trace_path = new_trace_file, path
+
+    return True
+
+def close_trace():
+    global trace_file, trace_path
+
+    with metrics_lock:
+        if trace_file is not None:
+            trace_file.close()
+        trace_file, trace_path = None, None
+
+if enabled and get_setting("trace_file"):
+    open_trace(Path(get_setting("trace_file")).expanduser())
+
+# -------- CLI COMMANDS --------
+
+def show_stats():
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if not enabled:
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] Statistics are not collected, set collect_stats to true")
+        return
+
+    with metrics_lock:
+        listed_histograms = sorted(histograms.items())
+        listed_counters = sorted(counters.items())
+
+    since = collected_since.strftime("%Y-%m-%d %H:%M:%S")
+    if not listed_histograms and not listed_counters:
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] Nothing measured since {since}")
+        return
+
+    console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Statistics since {since}, times in ms")
+
+    for name, histogram in listed_histograms:
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] {name} - {histogram.count} calls, "
+                      f"mean {histogram.mean():.2f}, p50 {histogram.percentile(0.5):.2f}, "
+                      f"p95 {histogram.percentile(0.95):.2f}, max {histogram.maximum:.2f}, total {histogram.total:.2f}")
+
+    for name, value in listed_counters:
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] {name} - {value / MEGABYTE:.2f} MB")
+
+    if trace_path is not None:
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] Tracing to {trace_path}")
+
+def clear_stats():
+    reset_metrics()
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Statistics reset")
+
+def set_trace(target: str) -> bool:
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if not enabled:
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Statistics are not collected, set collect_stats to true")
+        return False
+
+    if target.lower() == "off":
+        close_trace()
+        console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Tracing stopped")
+        return True
+
+    path = Path(target.strip('"')).expanduser().resolve()
+    if not open_trace(path):
+        return False
+
+    console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Tracing every measured span to {path}")
+    return True
@@ -0,0 +1,180 @@
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+from subsystems.local import metrics_manager
+from subsystems.local.config_manager import get_setting
+
+# -------- CONFIGURATION --------
+APP_NAME = "Dddit"
+
+OBJECTS_DIR = Path.home() / "AppData" / "Local" / APP_NAME / "objects"
+
+OBJECTS_DIR.mkdir(parents=True, exist_ok=True)
+
+INDEX_FILE = OBJECTS_DIR / "index.json"
+
+MEGABYTE = 1024 * 1024
+
+store_lock = threading.RLock()
+
+# Object hash -> {"size", "mtime", "lastUsed"}, loaded from INDEX_FILE on first use
+store_index: Dict[str, dict] | None = None
+
+# -------- INDEX MANAGEMENT FUNCTIONS --------
+
+def get_index() -> Dict[str, dict]:
+    global store_index
+
+    with store_lock:
+        if store_index is None:
+            try:
+                with open(INDEX_FILE, "r", encoding="utf-8") as f:
+                    store_index = json.load(f)
+            except (OSError, ValueError):
+                store_index = {}
+        return store_index
+
+def save_index():
+    with store_lock:
+        temp_file = INDEX_FILE.with_suffix(".json.tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(get_index(), f)
+        os.replace(temp_file, INDEX_FILE)
+
+def get_object_path(file_hash: str) -> Path:
+    return OBJECTS_DIR / file_hash[:2] / file_hash
+
+# -------- OBJECT MANAGEMENT FUNCTIONS --------
+
+def store_files(files: Dict[str, dict]):
+    # Objects are hard links to the pushed or pulled files whenever possible, so caching costs no extra disk
+    # space or copy time. A file edited in place changes the shared mtime and invalidates its object.
+    with store_lock, metrics_manager.span("store.files"):
+        index = get_index()
+
+        for entry in files.values():
+            file_hash = entry["hash"]
+            if is_valid_object(file_hash):
+                index[file_hash]["lastUsed"] = time.time()
+                continue
+
+            object_path = get_object_path(file_hash)
+            object_path.parent.mkdir(exist_ok=True)
+
+            try:
+                link_or_copy(Path(entry["path"]), object_path)
+            except OSError:
+                continue
+
+            stat = object_path.stat()
+            index[file_hash] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "lastUsed": time.time()}
+
+        evict_objects(get_setting("object_store_budget_mb") * MEGABYTE)
+        save_index()
+
+def checkout_object(file_hash: str, target: Path) -> bool:
+    with store_lock:
+        if not is_valid_object(file_hash):
+            return False
+
+        link_or_copy(get_object_path(file_hash), target)
+        get_index()[file_hash]["lastUsed"] = time.time()
+        return True
+
+def is_valid_object(file_hash: str) -> bool:
+    with store_lock:
+        entry = get_index().get(file_hash)
+        if entry is None:
+            return False
+
+        try:
+            stat = get_object_path(file_hash).stat()
+        except OSError:
+            del get_index()[file_hash]
+            return False
+
+        if stat.st_size != entry["size"] or stat.st_mtime_ns != entry["mtime"]:
+            remove_object(file_hash)
+            return False
+
+        return True
+
+def remove_object(file_hash: str):
+    with store_lock:
+        get_index().pop(file_hash, None)
+        get_object_path(file_hash).unlink(missing_ok=True)
+
+def evict_objects(budget_bytes: int) -> tuple[int, int]:
+    with store_lock:
+        index = get_index()
+        total_bytes = sum(entry["size"] for entry in index.values())
+        removed_objects = 0
+        removed_bytes = 0
+
+        for file_hash, entry in sorted(index.items(), key=lambda item: item[1]["lastUsed"]):
+            if total_bytes <= budget_bytes:
+                break
+
+            remove_object(file_hash)
+            total_bytes -= entry["size"]
+            removed_objects += 1
+            removed_bytes += entry["size"]
+
+        return removed_objects, removed_bytes
+
+def link_or_copy(source: Path, target: Path):
+    # Renaming a hard link over another link to the same file does nothing and would leave the temporary link behind
+    if target.exists() and os.path.samefile(source, target):
+        return
+
+    temp_path = target.with_name(f".{target.name}.link")
+    temp_path.unlink(missing_ok=True)
+
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        shutil.copy2(source, temp_path)
+
+    os.replace(temp_path, target)
+
+# -------- STORE MAINTENANCE FUNCTIONS --------
+
+def get_store_stats() -> dict:
+    with store_lock:
+        index = get_index()
+        last_used = [entry["lastUsed"] for entry in index.values()]
+
+        return {
+            "objects": len(index),
+            "bytes": sum(entry["size"] for entry in index.values()),
+            "budgetBytes": get_setting("object_store_budget_mb") * MEGABYTE,
+            "oldestUse": min(last_used) if last_used else None,
+            "newestUse": max(last_used) if last_used else None
+        }
+
+def collect_garbage() -> tuple[int, int]:
+    with store_lock:
+        index = get_index()
+        removed_objects = 0
+        removed_bytes = 0
+
+        for file_hash in list(index):
+            size = index[file_hash]["size"]
+            if not is_valid_object(file_hash):
+                removed_objects += 1
+                removed_bytes += size
+
+        for object_path in OBJECTS_DIR.glob("*/*"):
+            if object_path.name not in index:
+                removed_bytes += object_path.stat().st_size
+                removed_objects += 1
+                object_path.unlink(missing_ok=True)
+
+        evicted_objects, evicted_bytes = evict_objects(get_setting("object_store_budget_mb") * MEGABYTE)
+        save_index()
+
+        return removed_objects + evicted_objects, removed_bytes + evicted_bytes
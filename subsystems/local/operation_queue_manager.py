@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+# -------- CONFIGURATION --------
+APP_NAME = "Dddit"
+
+QUEUE_DIR = Path.home() / "AppData" / "Local" / APP_NAME / "queue"
+
+QUEUE_DIR.mkdir(parents=True, exist_ok=True)
+
+QUEUED = "queued"
+CONFLICT = "conflict"
+
+# The REPL thread queues operations while the replay thread removes them, every change rewrites the whole file
+queue_lock = threading.RLock()
+
+# -------- OPERATION QUEUE MANAGEMENT FUNCTIONS --------
+
+def get_queue_file(username: str) -> Path:
+    return QUEUE_DIR / f"{username}.json"
+
+def load_operations(username: str) -> List[dict]:
+    queue_file = get_queue_file(username)
+
+    with queue_lock:
+        if not queue_file.exists():
+            return []
+
+        try:
+            with open(queue_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+def save_operations(username: str, operations: List[dict]):
+    queue_file = get_queue_file(username)
+    temp_file = queue_file.with_suffix(".json.tmp")
+
+    with queue_lock:
+        if not operations:
+            if queue_file.exists():
+                queue_file.unlink()
+            return
+
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(operations, f, indent=2)
+
+        os.replace(temp_file, queue_file)
+
+def create_operation(operation_type: str, arguments: dict) -> dict:
+    # The idempotency key is chosen before the first attempt, so a replay is recognised by the server when that
+    # attempt reached it before the connection was lost
+    return {
+        "id": None,
+        "type": operation_type,
+        "arguments": arguments,
+        "idempotencyKey": uuid.uuid4().hex,
+        "queuedAt": None,
+        "status": QUEUED,
+        "error": None
+    }
+
+def enqueue_operation(username: str, operation: dict) -> dict:
+    with queue_lock:
+        operations = load_operations(username)
+
+        operation = {**operation, "id": max((o["id"] for o in operations), default=0) + 1,
+                     "queuedAt": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "status": QUEUED, "error": None}
+        operations.append(operation)
+
+        save_operations(username, operations)
+        return operation
+
+def update_operation(username: str, operation_id: int, **fields) -> bool:
+    with queue_lock:
+        operations = load_operations(username)
+
+        for operation in operations:
+            if operation["id"] == operation_id:
+                operation.update(fields)
+                save_operations(username, operations)
+                return True
+
+        return False
+
+def remove_operation(username: str, operation_id: int) -> bool:
+    with queue_lock:
+        operations = load_operations(username)
+        remaining_operations = [o for o in operations if o["id"] != operation_id]
+
+        if len(remaining_operations) == len(operations):
+            return False
+
+        save_operations(username, remaining_operations)
+        return True
@@ -0,0 +1,125 @@
+import json
+import re
+import threading
+from datetime import datetime
+from typing import List
+from rich.console import Console
+from rich.errors import MarkupError
+from rich.text import Span, Text
+
+# -------- CONFIGURATION --------
+# Matches the "<timestamp> [LEVEL] message" lines every command prints
+LOG_LINE_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) \[([A-Z_]+)\]?\s*(.*)$", re.DOTALL)
+
+ERROR_LEVEL = "ERROR"
+
+DATA_LEVEL = "DATA"
+
+# -------- RECORDING CONSOLE CLASS --------
+
+class RecordingConsole(Console):
+    # Console shared by every subsystem. While recording, printed lines are also collected as
+    # {"time", "level", "message"} records, so scripted runs can emit them as JSON and derive exit codes.
+    def __init__(self):
+        super().__init__()
+        self.records: List[dict] | None = None
+        self.echo = True
+        self.records_lock = threading.Lock()
+
+    def start_recording(self, echo: bool = True):
+        with self.records_lock:
+            self.records = []
+            self.echo = echo
+
+    def stop_recording(self) -> List[dict]:
+        with self.records_lock:
+            records = self.records or []
+            self.records = None
+            self.echo = True
+            return records
+
+    def print(self, *objects, **kwargs):
+        with self.records_lock:
+            if self.records is not None:
+                record = parse_record(" ".join(to_plain_text(o) for o in objects))
+                if record is not None:
+                    self.records.append(record)
+
+            echo = self.echo
+
+        if echo:
+            super().print(*objects, **kwargs)
+
+    def print_rows(self, now: str, level: str, style: str, rows: List[str]):
+        # Prints "<timestamp> [LEVEL] row" lines in one write, with no markup to parse in the rows. Listings of
+        # thousands of items printed line by line spend seconds in Rich, most of it parsing and highlighting.
+        if not rows:
+            return
+
+        with self.records_lock:
+            if self.records is not None:
+                self.records.extend({"time": now, "level": level, "message": row} for row in rows)
+
+            echo = self.echo
+
+        if not echo:
+            return
+
+        lines = [f"{now} [{level}] {row}" for row in rows]
+
+        # Piped output has no styles to render
+        if not self.is_terminal:
+            self.file.write("\n".join(lines) + "\n")
+            self.file.flush()
+            return
+
+        spans = []
+        position = 0
+        level_offset = len(now) + 2
+        for line in lines:
+            spans.append(Span(position, position + len(now), "white"))
+            spans.append(Span(position + level_offset, position + level_offset + len(level), style))
+            position += len(line) + 1
+
+        super().print(Text("\n".join(lines), spans=spans), highlight=False, soft_wrap=True)
+
+    def print_data(self, document: dict):
+        # Writes a JSON document on one line for scripts, recorded with the document itself as message
+        with self.records_lock:
+            if self.records is not None:
+                self.records.append({"time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "level": DATA_LEVEL,
+                                     "message": document})
+
+            echo = self.echo
+
+        if echo:
+            self.file.write(json.dumps(document) + "\n")
+            self.file.flush()
+
+def to_plain_text(value) -> str:
+    if isinstance(value, Text):
+        return value.plain
+    if isinstance(value, str):
+        try:
+            return Text.from_markup(value).plain
+        except MarkupError:
+            return value
+    return str(value)
+
+def parse_record(line: str) -> dict | None:
+    line = line.strip()
+    if not line:
+        return None
+
+    match = LOG_LINE_PATTERN.match(line)
+    if match is None:
+        return {"time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "level": "OUTPUT", "message": line}
+
+    return {"time": match.group(1), "level": match.group(2), "message": match.group(3)}
+
+# -------- CONSOLE ACCESS FUNCTIONS --------
+
+console = RecordingConsole()
+
+def get_console() -> RecordingConsole:
+    return console
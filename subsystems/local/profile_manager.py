@@ -0,0 +1,146 @@
+import io
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from subsystems.local.config_manager import get_setting
+from subsystems.local.output_manager import get_console
+
+# -------- CONFIGURATION --------
+console = get_console()
+
+APP_NAME = "Dddit"
+
+PROFILES_DIR = Path.home() / "AppData" / "Local" / APP_NAME / "profiles"
+
+# Off unless asked for, DDDIT_PROFILE_COMMANDS=true profiles scripted runs that have no REPL to toggle it in
+enabled = get_setting("profile_commands")
+
+# Completions run on the prompt thread between commands, their calls add up until the next command is dumped
+completion_profiler = None
+
+profile_lock = threading.Lock()
+
+# -------- PROFILING FUNCTIONS --------
+
+@contextmanager
+def profile_command(description: str):
+    # Profiles the body on the calling thread and saves a dump and a hotspot summary once it finishes.
+    # Transfers started by the command run on worker threads, their time shows as waits in the summary.
+    if not enabled:
+        yield
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12 profiles every thread with one tool, a command started while another is profiled is not
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        profiler.disable()
+        # profile off stops saving right away, including the profile of the command that turned it off
+        if enabled:
+            save_profile(description, profiler)
+
+@contextmanager
+def profile_completion():
+    global completion_profiler
+
+    if not enabled:
+        yield
+        return
+
+    import cProfile
+
+    with profile_lock:
+        if completion_profiler is None:
+            completion_profiler = cProfile.Profile()
+        profiler = completion_profiler
+
+    try:
+        profiler.enable()
+    except ValueError:
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        profiler.disable()
+
+def save_profile(description: str, profiler) -> Path | None:
+    global completion_profiler
+
+    with profile_lock:
+        completions, completion_profiler = completion_profiler, None
+
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    label = re.sub(r"[^A-Za-z0-9_.-]+", "_", description)[:40].strip("_") or "command"
+    dump_path = PROFILES_DIR / f"{stamp}_{label}.prof"
+
+    try:
+        PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(dump_path)
+
+        summary = f"{description}\n\n{summarize_profile(profiler)}"
+        if completions is not None:
+            completions.dump_stats(dump_path.with_suffix(".completions.prof"))
+            summary += f"\nCompletions since the previous command\n\n{summarize_profile(completions)}"
+
+        dump_path.with_suffix(".txt").write_text(summary, encoding="utf-8")
+    except OSError as e:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Cannot save profile of {description} - {e}")
+        return None
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Profile of {description} saved to {dump_path}")
+    return dump_path
+
+def summarize_profile(profiler) -> str:
+    # The hotspots by own time point at slow code, the ones by cumulative time at the calls that led to it
+    import pstats
+
+    top = max(1, get_setting("profile_top"))
+    output = io.StringIO()
+
+    stats = pstats.Stats(profiler, stream=output)
+    stats.strip_dirs()
+    stats.sort_stats("tottime").print_stats(top)
+    stats.sort_stats("cumulative").print_stats(top)
+
+    return output.getvalue()
+
+# -------- CLI COMMANDS --------
+
+def set_profiling(state: str) -> bool:
+    global enabled
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    state = state.lower()
+
+    if state not in ("on", "off"):
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {state} is not a valid state, use on or off")
+        return False
+
+    enabled = state == "on"
+
+    if enabled:
+        console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Profiling every command, dumps and hotspot "
+                      f"summaries are saved to {PROFILES_DIR}")
+    else:
+        console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Profiling stopped")
+    return True
+
+def show_profiling():
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    state = "on" if enabled else "off"
+    console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] Profiling is {state}, profiles are saved to {PROFILES_DIR}")
@@ -0,0 +1,44 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# -------- CONFIGURATION --------
+APP_NAME = "Dddit"
+
+UPLOADS_DIR = Path.home() / "AppData" / "Local" / APP_NAME / "uploads"
+
+UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
+
+# -------- UPLOAD STATE MANAGEMENT FUNCTIONS --------
+
+def get_upload_state_file(data: dict, path: Path) -> Path:
+    key = json.dumps([data["repositoryName"], data["resourceName"], data["branchName"], data["versionName"],
+                      str(path.resolve())])
+    return UPLOADS_DIR / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}.json"
+
+def save_upload_state(data: dict, path: Path, state: dict):
+    state_file = get_upload_state_file(data, path)
+    temp_file = state_file.with_suffix(".json.tmp")
+
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+    os.replace(temp_file, state_file)
+
+def load_upload_state(data: dict, path: Path) -> dict | None:
+    state_file = get_upload_state_file(data, path)
+
+    if not state_file.exists():
+        return None
+
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def clear_upload_state(data: dict, path: Path):
+    state_file = get_upload_state_file(data, path)
+    if state_file.exists():
+        state_file.unlink()
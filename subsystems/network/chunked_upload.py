@@ -0,0 +1,174 @@
+import hashlib
+import time
+from datetime import datetime
+from pathlib import Path
+import requests
+from subsystems.local.output_manager import get_console
+from subsystems.local.config_manager import get_setting
+from subsystems.local.job_manager import check_cancelled
+from subsystems.local.manifest_manager import HASH_ALGORITHM
+from subsystems.local.upload_state_manager import save_upload_state, load_upload_state, clear_upload_state
+from subsystems.network import http_client
+from subsystems.network.retry_policy import is_retryable_error, is_retryable_status, wait_before_retry
+from subsystems.network.transfer_progress import TransferProgress, MEGABYTE, format_duration
+
+# -------- CONFIGURATION --------
+console = get_console()
+
+# -------- CHUNKED UPLOAD FUNCTIONS --------
+
+def upload_in_chunks(path: str, data: dict, file_path: Path, mime_type: str, idempotency_key: str) -> tuple[dict, str | None] | None:
+    # The file is sent in fixed-size chunks to an upload session, each with its own SHA-256 checked by the
+    # server. The session and the number of acknowledged chunks are saved after every chunk, so a push
+    # interrupted by a network error, a crash or Ctrl-C resumes from the first chunk the server has not
+    # acknowledged. Every chunk is read once, and the file hash is built from the chunks as they are sent.
+    # Returns the server reply and the file hash, None as hash when the upload failed, or None when the
+    # server has no upload sessions.
+    stat = file_path.stat()
+    size = stat.st_size
+    chunk_size = max(1, get_setting("upload_chunk_size"))
+    chunk_count = -(-size // chunk_size)
+
+    # The file hash is only known once every chunk was read, a changed size or mtime tells a resumed upload apart
+    state = load_upload_state(data, file_path)
+    if state is not None and (state.get("fileSize") != size or state.get("fileMtime") != stat.st_mtime_ns
+                              or state.get("chunkSize") != chunk_size):
+        state = None
+
+    if state is not None:
+        acknowledged_chunks = request_acknowledged_chunks(path, state["uploadId"])
+        if acknowledged_chunks is None:
+            state = None
+        else:
+            state["acknowledgedChunks"] = acknowledged_chunks
+
+    if state is None:
+        payload = {**data, "fileName": file_path.name, "contentType": mime_type, "fileSize": size,
+                   "chunkSize": chunk_size, "chunkCount": chunk_count}
+        response = http_client.post(path, json=payload, idempotency_key=idempotency_key)
+
+        # Servers without upload sessions do not expose the endpoint, the push then falls back to one multipart request
+        if response.status_code in (404, 405, 501):
+            return None
+
+        json_data = response.json()
+        if not json_data.get("uploadId"):
+            return {"error": json_data.get("error") or "Upload session could not be started"}, None
+
+        state = {"uploadId": json_data["uploadId"], "fileSize": size, "fileMtime": stat.st_mtime_ns,
+                 "chunkSize": chunk_size, "acknowledgedChunks": 0}
+        save_upload_state(data, file_path, state)
+    else:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Resuming upload of {file_path.name} "
+                      f"from chunk {state['acknowledgedChunks'] + 1}/{chunk_count}")
+
+    upload_id = state["uploadId"]
+    file_digest = hashlib.new(HASH_ALGORITHM)
+    progress = TransferProgress(f"Sending {file_path.name}", size,
+                                initial_bytes=min(state["acknowledgedChunks"] * chunk_size, size))
+
+    try:
+        with open(file_path, "rb") as f:
+            # Chunks acknowledged by an earlier session are read only to add them to the file hash
+            for _ in range(state["acknowledgedChunks"]):
+                file_digest.update(f.read(chunk_size))
+
+            for index in range(state["acknowledgedChunks"], chunk_count):
+                check_cancelled()
+                started_at = time.monotonic()
+
+                chunk = f.read(chunk_size)
+                file_digest.update(chunk)
+
+                error = upload_chunk(path, upload_id, file_path.name, chunk, index, index * chunk_size, size)
+                if error:
+                    return {"error": f"Upload of {file_path.name} failed at chunk {index + 1}/{chunk_count} - {error}, "
+                                     f"push again to resume"}, None
+
+                state["acknowledgedChunks"] = index + 1
+                save_upload_state(data, file_path, state)
+                progress.transferred_bytes += len(chunk)
+                if not progress.quiet:
+                    report_chunk(file_path.name, index, chunk_count, len(chunk), time.monotonic() - started_at, progress)
+    except OSError as e:
+        return {"error": f"Upload of {file_path.name} failed - {e}"}, None
+    except KeyboardInterrupt:
+        return {"error": f"Upload of {file_path.name} interrupted after chunk {state['acknowledgedChunks']}/{chunk_count}, "
+                         f"push again to resume"}, None
+
+    file_hash = file_digest.hexdigest()
+    response = http_client.post(f"{path}/{upload_id}/commit", idempotency_key=idempotency_key,
+                                json={"files": [{"fileName": file_path.name, "hash": file_hash, "size": size}], "references": []})
+    json_data = response.json()
+
+    if json_data.get("message"):
+        clear_upload_state(data, file_path)
+
+    return json_data, file_hash
+
+def request_acknowledged_chunks(path: str, upload_id: str) -> int | None:
+    try:
+        response = http_client.get(f"{path}/{upload_id}")
+    except requests.RequestException:
+        return None
+
+    # Expired or unknown sessions start over
+    if response.status_code != 200:
+        return None
+
+    return response.json().get("acknowledgedChunks")
+
+def upload_chunk(path: str, upload_id: str, filename: str, chunk: bytes, index: int, offset: int, size: int) -> str | None:
+    # The chunk is hashed and sent from the same buffer, so retries send it again without reading the file.
+    # Returns the last error once every attempt has failed.
+    chunk_hash = hashlib.new(HASH_ALGORITHM, chunk).hexdigest()
+    headers = {
+        "Content-Type": "application/octet-stream",
+        "Content-Range": f"bytes {offset}-{offset + len(chunk) - 1}/{size}",
+        "X-Chunk-SHA256": chunk_hash
+    }
+    error = None
+
+    for attempt in range(max(0, get_setting("upload_retries")) + 1):
+        if attempt > 0 and not wait_before_retry(attempt - 1, f"Chunk {index + 1} of {filename} failed - {error}"):
+            break
+
+        try:
+            response = http_client.request("PUT", f"{path}/{upload_id}/chunks/{index}", data=chunk, headers=headers,
+                                           retries=0)
+        except requests.RequestException as e:
+            if not is_retryable_error(e, True):
+                return str(e)
+            error = str(e)
+            continue
+
+        try:
+            json_data = response.json()
+        except ValueError:
+            json_data = {}
+
+        if is_retryable_status(response.status_code):
+            error = json_data.get("error") or f"HTTP {response.status_code}"
+            continue
+
+        if response.status_code >= 400:
+            return json_data.get("error") or f"HTTP {response.status_code}"
+
+        if json_data.get("hash", chunk_hash) != chunk_hash:
+            error = "Checksum mismatch"
+            continue
+
+        return None
+
+    return error
+
+def report_chunk(filename: str, index: int, chunk_count: int, length: int, elapsed: float, progress: TransferProgress):
+    remaining_time = progress.remaining_time()
+    eta = format_duration(remaining_time) if remaining_time is not None else "unknown"
+    percentage = progress.transferred_bytes / progress.total_bytes * 100 if progress.total_bytes else 100.0
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Sent chunk {index + 1}/{chunk_count} of {filename} "
+                  f"({length / MEGABYTE:.2f} MB at {length / MEGABYTE / max(elapsed, 1e-9):.2f} MB/s, "
+                  f"{percentage:.2f}% done, ETA {eta})")
@@ -0,0 +1,45 @@
+import hashlib
+from pathlib import Path
+from subsystems.network.transfer_progress import TransferProgress
+
+# -------- STREAMING FILE BODY --------
+
+class FileStream:
+    # File-like request body over a byte range of a file. Requests reads it in small blocks, so memory stays
+    # bounded whatever the size of the file, and the SHA-256 of the sent bytes is computed along the way.
+    def __init__(self, path: Path, offset: int = 0, length: int | None = None, progress: TransferProgress | None = None):
+        self.path = path
+        self.length = path.stat().st_size - offset if length is None else length
+        self.remaining = self.length
+        self.progress = progress
+        self.digest = hashlib.sha256()
+        self.handle = open(path, "rb")
+        self.handle.seek(offset)
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+
+        data = self.handle.read(size)
+        self.remaining -= len(data)
+        self.digest.update(data)
+
+        if self.progress:
+            self.progress.update(len(data))
+
+        return data
+
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
+
+    def __len__(self):
+        return self.length
+
+    def close(self):
+        self.handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,187 @@
+import re
+import threading
+import time
+from dataclasses import dataclass
+from subsystems.local import metrics_manager
+from subsystems.local.config_manager import get_setting, get_settings_generation
+from subsystems.local.job_manager import check_cancelled, remaining_time
+from subsystems.local.token_manager import load_token
+from subsystems.network.retry_policy import IDEMPOTENT_METHODS, send_with_retry
+
+# -------- CONFIGURATION --------
+# requests is imported with the first session, it is one of the slowest imports of the CLI
+session: "requests.Session | None" = None
+
+session_lock = threading.Lock()
+
+# Path segments naming one object, upload or chunk, folded so that statistics group requests by endpoint
+ID_SEGMENT = re.compile(r"/(?:\d+|[0-9a-fA-F-]{16,})(?=/|$)")
+
+# -------- CLIENT SETTINGS --------
+
+@dataclass(frozen=True, slots=True)
+class ClientSettings:
+    base_url: str
+    connect_timeout: float
+    read_timeout: float
+    retries: int
+
+# Resolved once and again only when the settings change, every request reads them
+client_settings: ClientSettings | None = None
+
+client_settings_generation = -1
+
+def get_client_settings() -> ClientSettings:
+    global client_settings, client_settings_generation
+
+    generation = get_settings_generation()
+    if client_settings is None or generation != client_settings_generation:
+        client_settings = ClientSettings(base_url=get_setting("base_url").rstrip("/"),
+                                         connect_timeout=get_setting("connect_timeout"),
+                                         read_timeout=get_setting("read_timeout"),
+                                         retries=get_setting("request_retries"))
+        client_settings_generation = generation
+
+    return client_settings
+
+# -------- SESSION MANAGEMENT FUNCTIONS --------
+
+def get_session() -> "requests.Session":
+    global session
+
+    if session is not None:
+        return session
+
+    with session_lock:
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            pool_size = max(1, get_setting("http_pool_size"))
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+
+            new_session = requests.Session()
+            new_session.mount("http://", adapter)
+            new_session.mount("https://", adapter)
+            new_session.headers["Connection"] = "keep-alive"
+
+            apply_token(new_session, load_token())
+            session = new_session
+
+    return session
+
+def set_token(token: str | None):
+    apply_token(get_session(), token)
+
+def apply_token(target: "requests.Session", token: str | None):
+    if token:
+        target.headers["Authorization"] = f"Bearer {token}"
+    else:
+        target.headers.pop("Authorization", None)
+
+def close_session():
+    global session
+
+    with session_lock:
+        if session is not None:
+            session.close()
+            session = None
+
+# -------- REQUEST FUNCTIONS --------
+
+def get_base_url() -> str:
+    return get_client_settings().base_url
+
+def get_timeout(settings: ClientSettings | None = None) -> tuple[float, float]:
+    # Neither wait may outlast the total timeout of the running command
+    settings = settings or get_client_settings()
+    connect_timeout, read_timeout = settings.connect_timeout, settings.read_timeout
+
+    remaining = remaining_time()
+    if remaining is not None:
+        connect_timeout, read_timeout = min(connect_timeout, remaining), min(read_timeout, remaining)
+
+    return max(connect_timeout, 0.001), max(read_timeout, 0.001)
+
+def request(method: str, path: str, idempotent: bool | None = None, idempotency_key: str | None = None,
+            retries: int | None = None, **kwargs) -> "requests.Response":
+    # Reads sent as POST are marked idempotent by their callers. A POST that creates something is only repeated
+    # with an idempotency key, which lets the server recognise the repetition. Streamed bodies cannot be sent
+    # twice, their callers repeat them with a fresh stream. Callers with their own retry loop, such as chunk
+    # uploads and range downloads, pass retries=0 so a failure is retried in one place only.
+    if idempotency_key is not None:
+        kwargs["headers"] = {**kwargs.get("headers", {}), "Idempotency-Key": idempotency_key}
+        idempotent = True
+    elif idempotent is None:
+        idempotent = method in IDEMPOTENT_METHODS
+
+    # Resolved once for every attempt, only the timeouts shrink with the time left to the command
+    settings = get_client_settings()
+    url = f"{settings.base_url}{path}"
+
+    def send() -> "requests.Response":
+        # A cancelled or timed out command sends no further requests
+        check_cancelled()
+        if not metrics_manager.enabled:
+            return get_session().request(method, url, timeout=get_timeout(settings), **kwargs)
+
+        started_at = time.perf_counter()
+        response = get_session().request(method, url, timeout=get_timeout(settings), **kwargs)
+        record_response(method, path, response, (time.perf_counter() - started_at) * 1000)
+        return response
+
+    if not is_replayable(kwargs.get("data")):
+        return send()
+
+    return send_with_retry(send, idempotent, f"{method} {path}", settings.retries if retries is None else retries)
+
+def is_replayable(body) -> bool:
+    return body is None or isinstance(body, (bytes, str, dict, list, tuple))
+
+def record_response(method: str, path: str, response: "requests.Response", milliseconds: float):
+    # Every attempt is measured on its own. The time to first byte is how long the server took to send the
+    # headers, connection setup included. A streamed body is read after this, its time shows in the disk writes.
+    route = f"{method} {ID_SEGMENT.sub('/:id', path)}"
+    bytes_out = int(response.request.headers.get("Content-Length") or 0)
+    # A HEAD answer announces the length of a body it does not send
+    bytes_in = int(response.headers.get("Content-Length") or 0) if method != "HEAD" else 0
+    ttfb = response.elapsed.total_seconds() * 1000
+
+    metrics_manager.record(f"http.request {route}", milliseconds, status=response.status_code, ttfbMs=round(ttfb, 3),
+                           bytesOut=bytes_out, bytesIn=bytes_in)
+    metrics_manager.record("http.ttfb", ttfb)
+    metrics_manager.count_bytes("http.bytes_out", bytes_out)
+    metrics_manager.count_bytes("http.bytes_in", bytes_in)
+
+def read_json(response: "requests.Response") -> dict:
+    # Proxies answer failures with HTML pages, which become an error like the ones the server sends
+    try:
+        with metrics_manager.span("http.parse_json"):
+            return response.json()
+    except ValueError:
+        return {"error": f"Server answered HTTP {response.status_code} without a readable body"}
+
+def get(path: str, **kwargs) -> "requests.Response":
+    return request("GET", path, **kwargs)
+
+def post(path: str, **kwargs) -> "requests.Response":
+    return request("POST", path, **kwargs)
+
+# -------- CONNECTIVITY FUNCTIONS --------
+
+def is_connection_error(error: Exception) -> bool:
+    # The server could not be reached at all, as opposed to a request it received and refused
+    import requests
+
+    return isinstance(error, requests.ConnectionError)
+
+def is_reachable() -> bool:
+    # Sends a single request without retries, any answer, even an error status, proves the server can be reached
+    import requests
+
+    try:
+        get_session().head(f"{get_base_url()}/", timeout=get_timeout()).close()
+    except requests.RequestException:
+        return False
+
+    return True
@@ -0,0 +1,235 @@
+import hashlib
+import mmap
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+from subsystems.local.output_manager import get_console
+from subsystems.network.transfer_progress import TransferProgress
+
+# -------- CONFIGURATION --------
+MAX_HEADERS_SIZE = 64 * 1024
+
+PART_HEADERS = "headers"
+PART_DATA = "data"
+PART_END = "end"
+
+console = get_console()
+
+# -------- MULTIPART HELPERS --------
+
+class MultipartError(Exception):
+    pass
+
+def get_boundary(content_type: str) -> bytes:
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not match:
+        raise MultipartError("Missing multipart boundary")
+    return match.group(1).encode()
+
+def parse_headers(raw_headers: bytes) -> Dict[str, str]:
+    headers = {}
+    for line in raw_headers.decode("utf-8", errors="replace").split("\r\n"):
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+    return headers
+
+def get_disposition_param(headers: Dict[str, str], param: str) -> str | None:
+    match = re.search(rf'{param}="(.*?)"', headers.get("content-disposition", ""))
+    return match.group(1) if match else None
+
+# -------- STREAMING MULTIPART DECODER --------
+
+def iter_multipart(chunks: Iterable[bytes], content_type: str) -> Iterator[Tuple[str, object]]:
+    # Yields (PART_HEADERS, headers), then (PART_DATA, bytes) as the body arrives, then (PART_END, None) for
+    # every part. Only the unread tail of the current chunk is buffered, so memory does not grow with the
+    # size of the parts.
+    boundary = get_boundary(content_type)
+    delimiter = b"--" + boundary
+    body_delimiter = b"\r\n" + delimiter
+
+    buffer = bytearray()
+    state = "preamble"
+
+    for chunk in chunks:
+        buffer += chunk
+
+        while True:
+            if state == "preamble":
+                index = buffer.find(delimiter)
+                if index == -1:
+                    del buffer[:max(0, len(buffer) - len(delimiter))]
+                    break
+
+                if len(buffer) < index + len(delimiter) + 2:
+                    break
+
+                suffix = bytes(buffer[index + len(delimiter):index + len(delimiter) + 2])
+                del buffer[:index + len(delimiter) + 2]
+
+                if suffix == b"--":
+                    return
+                state = "headers"
+
+            elif state == "headers":
+                index = buffer.find(b"\r\n\r\n")
+                if index == -1:
+                    if len(buffer) > MAX_HEADERS_SIZE:
+                        raise MultipartError("Multipart part headers are too large")
+                    break
+
+                headers = parse_headers(bytes(buffer[:index]))
+                del buffer[:index + 4]
+
+                yield PART_HEADERS, headers
+                state = "body"
+
+            else:
+                index = buffer.find(body_delimiter)
+                if index == -1:
+                    safe_length = len(buffer) - len(body_delimiter) + 1
+                    if safe_length > 0:
+                        yield PART_DATA, bytes(buffer[:safe_length])
+                        del buffer[:safe_length]
+                    break
+
+                if index > 0:
+                    yield PART_DATA, bytes(buffer[:index])
+
+                yield PART_END, None
+                del buffer[:index + 2]
+                state = "preamble"
+
+    if state != "preamble" or buffer.strip():
+        raise MultipartError("Multipart response ended unexpectedly")
+
+# -------- STREAMING MULTIPART ENCODER --------
+
+class StreamingMultipartEncoder:
+    # File-like multipart/form-data body for requests. Files are memory-mapped and emitted one chunk at a
+    # time, and each file is closed as soon as its part has been sent, so memory stays bounded by the
+    # chunk size whatever the size of the upload. The SHA-256 of every sent file is kept in digests.
+    def __init__(self, fields: List[Tuple[str, str]], files: List[Tuple[str, Path, str]], chunk_size: int,
+                 report_progress: bool = True):
+        self.boundary = uuid.uuid4().hex
+        self.fields = fields
+        self.files = files
+        self.chunk_size = chunk_size
+        self.report_progress = report_progress
+        self.open_handles = []
+        self.digests: Dict[str, str] = {}
+        self.buffer = bytearray()
+        self.chunks = self.iter_chunks()
+        self.length = self.compute_length()
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def field_header(self, name: str) -> bytes:
+        return (f"--{self.boundary}\r\n"
+                f"Content-Disposition: form-data; name=\"{quote_param(name)}\"\r\n\r\n").encode()
+
+    def file_header(self, name: str, path: Path, mime_type: str) -> bytes:
+        return (f"--{self.boundary}\r\n"
+                f"Content-Disposition: form-data; name=\"{quote_param(name)}\"; filename=\"{quote_param(path.name)}\"\r\n"
+                f"Content-Type: {mime_type}\r\n\r\n").encode()
+
+    def closing_delimiter(self) -> bytes:
+        return f"--{self.boundary}--\r\n".encode()
+
+    def compute_length(self) -> int:
+        length = len(self.closing_delimiter())
+        for name, value in self.fields:
+            length += len(self.field_header(name)) + len(str(value).encode()) + 2
+        for name, path, mime_type in self.files:
+            length += len(self.file_header(name, path, mime_type)) + path.stat().st_size + 2
+        return length
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        for name, value in self.fields:
+            yield self.field_header(name) + str(value).encode() + b"\r\n"
+
+        for name, path, mime_type in self.files:
+            yield self.file_header(name, path, mime_type)
+            yield from self.iter_file(path)
+            yield b"\r\n"
+
+        yield self.closing_delimiter()
+
+    def iter_file(self, path: Path) -> Iterator[bytes]:
+        size = path.stat().st_size
+        progress = TransferProgress(f"Sending {path.name}", size) if self.report_progress else None
+        digest = hashlib.sha256()
+
+        if size > 0:
+            handle = open(path, "rb")
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            self.open_handles.extend((handle, mapped))
+
+            can_advise = hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL")
+            if can_advise:
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+
+            try:
+                for offset in range(0, size, self.chunk_size):
+                    chunk = mapped[offset:offset + self.chunk_size]
+                    digest.update(chunk)
+                    if progress:
+                        progress.update(len(chunk))
+                    yield chunk
+
+                    # Pages already sent are dropped so the mapping does not pin the whole file in memory
+                    if can_advise and offset % mmap.PAGESIZE == 0:
+                        mapped.madvise(mmap.MADV_DONTNEED, offset, len(chunk))
+            finally:
+                self.close_handles()
+
+        self.digests[path.name] = digest.hexdigest()
+
+        if progress:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Sent file {path.name} ({progress.summary()})")
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+
+        if size < 0:
+            size = len(self.buffer)
+
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def __iter__(self):
+        while True:
+            data = self.read(self.chunk_size)
+            if not data:
+                return
+            yield data
+
+    def __len__(self):
+        return self.length
+
+    def close_handles(self):
+        while self.open_handles:
+            self.open_handles.pop().close()
+
+    def close(self):
+        self.chunks.close()
+        self.close_handles()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def quote_param(value: str) -> str:
+    return value.replace("\"", "%22").replace("\r", "%0D").replace("\n", "%0A")
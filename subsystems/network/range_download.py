@@ -0,0 +1,243 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Tuple
+import requests
+from subsystems.local import metrics_manager
+from subsystems.local.output_manager import get_console
+from subsystems.local.config_manager import get_setting
+from subsystems.local.job_manager import submit
+from subsystems.local.manifest_manager import describe_file, hash_file
+from subsystems.network import http_client
+from subsystems.network.retry_policy import is_retryable_error, is_retryable_status, wait_before_retry
+from subsystems.network.transfer_progress import TransferProgress, MEGABYTE
+
+# -------- CONFIGURATION --------
+console = get_console()
+
+# -------- PARTIAL DOWNLOAD CLASS --------
+
+class PartialDownload:
+    # A file downloaded in byte ranges into a hidden .part file. Completed ranges are recorded in a .part.json
+    # file next to it, so an interrupted pull resumes with only the ranges that are still missing.
+    def __init__(self, pull_path: Path, filename: str, file_hash: str, size: int, range_size: int):
+        self.filename = filename
+        self.file_hash = file_hash
+        self.size = size
+        self.target_path = pull_path / filename
+        self.part_path = pull_path / f".{filename}.part"
+        self.state_path = pull_path / f".{filename}.part.json"
+        self.ranges = [(start, min(start + range_size, size)) for start in range(0, size, range_size)]
+        self.lock = threading.Lock()
+        self.completed = self.load_completed()
+        # Set once the server turned out to ignore ranges, a single worker then fetches the whole file
+        self.single_stream = False
+
+        if not self.completed:
+            with open(self.part_path, "wb") as f:
+                f.truncate(size)
+
+        completed_bytes = sum(end - start for start, end in self.ranges if start in self.completed)
+        self.progress = TransferProgress(f"Receiving {filename}", size, initial_bytes=completed_bytes)
+
+    def load_completed(self) -> set[int]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return set()
+
+        if (state.get("hash") != self.file_hash or state.get("size") != self.size
+                or not self.part_path.exists() or self.part_path.stat().st_size != self.size):
+            return set()
+
+        return set(state.get("completed", []))
+
+    def save_completed(self):
+        temp_file = self.state_path.with_suffix(".json.tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump({"hash": self.file_hash, "size": self.size, "completed": sorted(self.completed)}, f)
+        os.replace(temp_file, self.state_path)
+
+    def pending_ranges(self) -> list[Tuple[int, int]]:
+        return [(start, end) for start, end in self.ranges if start not in self.completed]
+
+    def complete_ranges(self, starts: list[int]):
+        with self.lock:
+            self.completed.update(starts)
+            self.save_completed()
+
+    def update_progress(self, transferred_bytes: int):
+        with self.lock:
+            self.progress.update(transferred_bytes)
+
+    def claim_single_stream(self) -> bool:
+        # Returns True to the first worker only. The ranges resumed or received so far are fetched again with the
+        # whole file, so they no longer count towards the progress.
+        with self.lock:
+            if self.single_stream:
+                return False
+            self.single_stream = True
+
+            received_bytes = sum(end - start for start, end in self.ranges if start in self.completed)
+            self.completed.clear()
+            self.progress.transferred_bytes -= received_bytes
+            self.progress.initial_bytes = min(self.progress.initial_bytes, self.progress.transferred_bytes)
+            return True
+
+    def is_complete(self) -> bool:
+        return len(self.completed) == len(self.ranges)
+
+    def finish(self) -> dict | None:
+        # The whole file is checked against its manifest hash before it replaces anything in the working directory
+        file_hash = hash_file(self.part_path, get_setting("transfer_chunk_size"))
+        self.state_path.unlink(missing_ok=True)
+
+        if file_hash != self.file_hash:
+            self.part_path.unlink(missing_ok=True)
+            return None
+
+        os.replace(self.part_path, self.target_path)
+        return describe_file(self.target_path, file_hash)
+
+# -------- RANGE DOWNLOAD FUNCTIONS --------
+
+def download_files(path: str, params: dict, files: Dict[str, dict], pull_path: Path) -> Tuple[Dict[str, dict], str | None] | None:
+    # Files listed in the version manifest are fetched from path/<hash> by a bounded pool of workers, large ones
+    # in several byte ranges at once. Returns the saved files and the first error, or None when the server
+    # cannot serve single files.
+    if not files:
+        return {}, None
+
+    first_hash = next(iter(files.values()))["hash"]
+    response = http_client.request("HEAD", f"{path}/{first_hash}", params=params)
+    if response.status_code in (404, 405, 501):
+        return None
+
+    # Servers that do not accept ranges get one request per file
+    ranged = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+    range_size = get_setting("pull_range_size") if ranged else None
+
+    downloads = {}
+    for filename, entry in files.items():
+        filename = Path(filename).name
+        download = PartialDownload(pull_path, filename, entry["hash"], entry["size"], range_size or max(entry["size"], 1))
+        downloads[filename] = download
+
+        if download.completed:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Resuming {filename} "
+                          f"({download.progress.transferred_bytes / MEGABYTE:.2f} of {entry['size'] / MEGABYTE:.2f} MB already received)")
+
+    received_files = {}
+    error = None
+
+    executor = ThreadPoolExecutor(max_workers=max(1, get_setting("download_workers")))
+    futures = {submit(executor, download_range, path, params, download, start, end, ranged): download
+               for download in downloads.values() for start, end in download.pending_ranges()}
+
+    try:
+        for future in as_completed(futures):
+            download = futures[future]
+            range_error = future.result()
+
+            if range_error:
+                error = f"Download of {download.filename} failed - {range_error}"
+                break
+
+            if download.is_complete() and download.filename not in received_files:
+                error = save_download(download, received_files) or error
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    # Files resumed with nothing left to fetch, or completed while another range was failing, are saved too
+    for download in downloads.values():
+        if download.is_complete() and download.filename not in received_files:
+            error = save_download(download, received_files) or error
+
+    return received_files, error
+
+def download_range(path: str, params: dict, download: PartialDownload, start: int, end: int, ranged: bool) -> str | None:
+    # Runs on a worker thread, returns the last error once every attempt has failed
+    if ranged and download.single_stream:
+        return None
+
+    error = None
+    range_ignored = False
+
+    for attempt in range(max(0, get_setting("download_retries")) + 1):
+        if attempt > 0 and not wait_before_retry(attempt - 1, f"Download of {download.filename} failed - {error}"):
+            break
+
+        headers = {"Range": f"bytes={start}-{end - 1}"} if ranged else {}
+        # Bytes of this attempt, taken back from the progress when the attempt fails and the range is fetched again
+        received_bytes = 0
+
+        try:
+            with http_client.get(f"{path}/{download.file_hash}", params=params, headers=headers, stream=True,
+                                 retries=0) as response:
+                if is_retryable_status(response.status_code):
+                    error = f"HTTP {response.status_code}"
+                    continue
+
+                if response.status_code not in (200, 206):
+                    return f"HTTP {response.status_code}"
+
+                # A server that ignores the range answers with the whole file. Every range worker would then write
+                # all of it, so the response is dropped unread and the file is fetched once in a single stream.
+                if ranged and not is_requested_range(response, start, end, download.size):
+                    range_ignored = True
+                    break
+
+                with open(download.part_path, "r+b") as f:
+                    f.seek(start)
+                    for chunk in response.iter_content(chunk_size=get_setting("transfer_chunk_size")):
+                        metrics_manager.write(f, chunk)
+                        received_bytes += len(chunk)
+                        download.update_progress(len(chunk))
+        except requests.RequestException as e:
+            download.update_progress(-received_bytes)
+            if not is_retryable_error(e, True):
+                return str(e)
+            error = str(e)
+            continue
+        except OSError as e:
+            download.update_progress(-received_bytes)
+            return str(e)
+
+        if ranged:
+            download.complete_ranges([start])
+        else:
+            download.complete_ranges([range_start for range_start, _ in download.ranges])
+        return None
+
+    if not range_ignored:
+        return error
+
+    # Only the first worker to notice fetches the file, the others leave their ranges to it
+    if not download.claim_single_stream():
+        return None
+
+    return download_range(path, params, download, 0, download.size, False)
+
+def is_requested_range(response: "requests.Response", start: int, end: int, size: int) -> bool:
+    # A partial answer must cover exactly the requested bytes, as in Content-Range: bytes 0-1023/4096
+    if response.status_code != 206:
+        return False
+
+    content_range = response.headers.get("Content-Range", "").strip()
+    return content_range in (f"bytes {start}-{end - 1}/{size}", f"bytes {start}-{end - 1}/*")
+
+def save_download(download: PartialDownload, received_files: Dict[str, dict]) -> str | None:
+    entry = download.finish()
+    if entry is None:
+        return f"Checksum mismatch for {download.filename}"
+
+    received_files[download.filename] = entry
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Saved file {download.filename} ({download.progress.summary()})")
+    return None
@@ -0,0 +1,128 @@
+import random
+import threading
+from datetime import datetime
+from typing import Callable
+from subsystems.local.output_manager import get_console
+from subsystems.local.config_manager import get_setting
+from subsystems.local.job_manager import sleep
+
+# -------- CONFIGURATION --------
+console = get_console()
+
+# Statuses a server or proxy sends for a request it did not process, worth sending again after a pause
+RETRYABLE_STATUSES = (408, 429, 502, 503, 504)
+
+# Methods whose repetition has the same effect as one request
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS")
+
+# Every request that succeeds at the first attempt earns back a tenth of a retry
+BUDGET_DEPOSIT = 0.1
+
+# -------- RETRY BUDGET CLASS --------
+
+class RetryBudget:
+    # Retries shared by every request of the process. When the server is down, each request would otherwise retry
+    # on its own and multiply the load, so retries stop once the budget is spent and come back with successes.
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.tokens = capacity
+        self.lock = threading.Lock()
+
+    def withdraw(self) -> bool:
+        with self.lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def deposit(self):
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + BUDGET_DEPOSIT)
+
+retry_budget: RetryBudget | None = None
+
+budget_lock = threading.Lock()
+
+def get_retry_budget() -> RetryBudget:
+    global retry_budget
+
+    with budget_lock:
+        if retry_budget is None:
+            retry_budget = RetryBudget(max(0, get_setting("retry_budget")))
+        return retry_budget
+
+# -------- RETRY CLASSIFICATION FUNCTIONS --------
+
+def is_retryable_status(status_code: int) -> bool:
+    return status_code in RETRYABLE_STATUSES
+
+def is_retryable_error(error: Exception, idempotent: bool) -> bool:
+    # A request that could not connect was never sent and can always be repeated. One that failed afterwards
+    # may have reached the server, so only idempotent requests are repeated then.
+    import requests
+
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+        return idempotent
+
+    return False
+
+def get_retry_delay(attempt: int, response=None) -> float:
+    # Exponential backoff with full jitter, a Retry-After sent by the server is honoured up to the maximum delay
+    max_delay = get_setting("retry_max_delay")
+
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), max_delay)
+
+    return random.uniform(0, min(max_delay, get_setting("retry_base_delay") * 2 ** attempt))
+
+# -------- RETRY FUNCTIONS --------
+
+def wait_before_retry(attempt: int, reason: str, response=None) -> bool:
+    # Returns False when the retry budget is spent. The pause ends early when the command is cancelled.
+    if not get_retry_budget().withdraw():
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Retry budget exhausted, giving up after {reason}")
+        return False
+
+    delay = get_retry_delay(attempt, response)
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] {reason}, retrying in {delay:.2f} s")
+
+    sleep(delay)
+    return True
+
+def send_with_retry(send: Callable[[], "requests.Response"], idempotent: bool, description: str,
+                    retries: int | None = None) -> "requests.Response":
+    # send makes one attempt with a fresh body. Retryable errors, and retryable responses to idempotent requests,
+    # are repeated up to retries times, request_retries unless the caller already resolved it. The last response
+    # is returned or the last error raised.
+    if retries is None:
+        retries = get_setting("request_retries")
+    retries = max(0, retries)
+    attempt = 0
+
+    while True:
+        try:
+            response = send()
+        except Exception as e:
+            if attempt >= retries or not is_retryable_error(e, idempotent):
+                raise
+            if not wait_before_retry(attempt, f"{description} failed - {type(e).__name__}"):
+                raise
+        else:
+            if attempt >= retries or not idempotent or not is_retryable_status(response.status_code):
+                if attempt == 0 and response.status_code < 500:
+                    get_retry_budget().deposit()
+                return response
+
+            if not wait_before_retry(attempt, f"{description} answered HTTP {response.status_code}", response):
+                return response
+            response.close()
+
+        attempt += 1
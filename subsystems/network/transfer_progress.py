@@ -0,0 +1,78 @@
+import time
+from datetime import datetime
+from subsystems.local.output_manager import get_console
+from subsystems.local.job_manager import current_job
+
+# -------- CONFIGURATION --------
+MEGABYTE = 1024 * 1024
+
+console = get_console()
+
+# -------- TRANSFER PROGRESS REPORTING --------
+
+class TransferProgress:
+    def __init__(self, label: str, total_bytes: int | None = None, interval: float = 1.0, initial_bytes: int = 0):
+        self.label = label
+        self.total_bytes = total_bytes
+        self.interval = interval
+        # Bytes already transferred by an earlier, resumed transfer count towards progress but not throughput
+        self.initial_bytes = initial_bytes
+        self.transferred_bytes = initial_bytes
+        self.started_at = time.monotonic()
+        self.reported_at = self.started_at
+
+        # Transfers of a background job are shown by the jobs command instead of printing over the prompt
+        self.job = current_job()
+        self.quiet = self.job is not None and self.job.background
+        if self.job is not None:
+            self.job.add_transfer(self)
+
+    def update(self, transferred_bytes: int):
+        self.transferred_bytes += transferred_bytes
+
+        if self.job is not None:
+            self.job.check_cancelled()
+
+        if self.quiet:
+            return
+
+        current_time = time.monotonic()
+        if current_time - self.reported_at >= self.interval:
+            self.reported_at = current_time
+            self.report()
+
+    def elapsed(self) -> float:
+        return max(time.monotonic() - self.started_at, 1e-9)
+
+    def throughput(self) -> float:
+        return (self.transferred_bytes - self.initial_bytes) / MEGABYTE / self.elapsed()
+
+    def remaining_time(self) -> float | None:
+        throughput = self.throughput()
+        if not self.total_bytes or throughput <= 0:
+            return None
+        return max(self.total_bytes - self.transferred_bytes, 0) / MEGABYTE / throughput
+
+    def report(self):
+        transferred = self.transferred_bytes / MEGABYTE
+
+        if self.total_bytes:
+            total = self.total_bytes / MEGABYTE
+            percentage = self.transferred_bytes / self.total_bytes * 100
+            amount = f"{transferred:.2f}/{total:.2f} MB ({percentage:.2f}%)"
+        else:
+            amount = f"{transferred:.2f} MB"
+
+        remaining_time = self.remaining_time()
+        eta = f", ETA {format_duration(remaining_time)}" if remaining_time is not None else ""
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] {self.label} {amount} at {self.throughput():.2f} MB/s{eta}")
+
+    def summary(self) -> str:
+        return f"{self.transferred_bytes} byte in {self.elapsed():.2f} s at {self.throughput():.2f} MB/s"
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
@@ -0,0 +1,324 @@
+import threading
+import time
+import typer
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import List
+from subsystems.local import context_manager, job_manager
+from subsystems.local.config_manager import get_setting
+from subsystems.local.output_manager import get_console
+from subsystems.local.operation_queue_manager import CONFLICT, QUEUED, create_operation, enqueue_operation, \
+    load_operations, remove_operation, update_operation
+from subsystems.network import http_client
+
+# -------- CONFIGURATION --------
+console = get_console()
+
+app = typer.Typer(help="Offline operation queue commands")
+
+# Outcomes of run_or_queue besides QUEUED
+SENT = "sent"
+REJECTED = "rejected"
+
+# Set when a mutation could not reach the server, cleared once a probe gets an answer. While it is set,
+# mutations are queued right away instead of waiting for their requests to fail.
+offline = False
+
+sync_thread: threading.Thread | None = None
+
+sync_thread_lock = threading.Lock()
+
+# One replay at a time, a second one would send the same operations twice
+replay_lock = threading.Lock()
+
+# -------- OPERATION FUNCTIONS --------
+
+def describe_operation(operation: dict) -> str:
+    arguments = operation["arguments"]
+    operation_type = operation["type"]
+
+    if operation_type == "init_repository":
+        return f"init repository {arguments['repositoryName']}"
+    elif operation_type == "init_resource":
+        return f"init resource {arguments['repositoryName']}/{arguments['resourceName']}"
+    elif operation_type == "init_branch":
+        return f"init branch {arguments['repositoryName']}/{arguments['resourceName']}/{arguments['branchName']}"
+    elif operation_type == "push":
+        return (f"push {Path(arguments['path']).name} to {arguments['repositoryName']}/{arguments['resourceName']}/"
+                f"{arguments['branchName']}")
+    elif operation_type == "invite":
+        return f"invite {arguments['username']} to {arguments['repositoryName']}"
+    else:
+        return f"accept invitation of {arguments['username']} to {arguments['repositoryName']}"
+
+def execute_operation(operation: dict) -> bool:
+    from subsystems.invitation import invitation
+    from subsystems.versioning import branch, repository, resource, version
+
+    arguments = operation["arguments"]
+    operation_type = operation["type"]
+
+    if operation_type == "init_repository":
+        return repository.init(arguments["repositoryName"])
+    elif operation_type == "init_resource":
+        return resource.init(arguments["repositoryName"], arguments["resourceName"])
+    elif operation_type == "init_branch":
+        return branch.init(arguments["repositoryName"], arguments["resourceName"], arguments["branchName"])
+    elif operation_type == "push":
+        version_path = Path(arguments["path"])
+        if not version_path.exists():
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {version_path} no longer exists")
+            return False
+
+        return version.push_version(arguments["repositoryName"], arguments["resourceName"], arguments["branchName"],
+                                    version_path, arguments["comment"], arguments["isMesh"],
+                                    operation["idempotencyKey"])
+    elif operation_type == "invite":
+        return invitation.send_invitation(arguments["username"], arguments["repositoryName"])
+    else:
+        return invitation.accept_invitation(arguments["username"], arguments["repositoryName"])
+
+def apply_operation_locally(operation: dict):
+    # Created items are added to the context right away, so the user can cd into them and queue what goes inside
+    arguments = operation["arguments"]
+    operation_type = operation["type"]
+
+    if operation_type == "init_repository":
+        context_manager.add_repository(arguments["repositoryName"], True)
+    elif operation_type == "init_resource":
+        context_manager.add_resource(arguments["repositoryName"], arguments["resourceName"])
+    elif operation_type == "init_branch":
+        context_manager.add_branch(arguments["repositoryName"], arguments["resourceName"], arguments["branchName"])
+    elif operation_type == "accept":
+        context_manager.add_repository(arguments["repositoryName"], False)
+
+def run_or_queue(operation_type: str, arguments: dict) -> str:
+    # Sends a mutation, or queues it when the server cannot be reached. It is also queued while older operations
+    # of the same repository wait for replay, so they reach the server in the order they were given. Returns
+    # SENT, QUEUED or REJECTED.
+    global offline
+
+    username = context_manager.user_data["username"]
+    operation = create_operation(operation_type, arguments)
+
+    if username is None:
+        return SENT if execute_operation(operation) else REJECTED
+
+    if offline:
+        return queue_operation(username, operation, "Server unreachable")
+
+    if has_queued_operations(username, arguments["repositoryName"]):
+        return queue_operation(username, operation, f"Older operations of {arguments['repositoryName']} wait for replay")
+
+    try:
+        if execute_operation(operation):
+            return SENT
+    except Exception as e:
+        if not http_client.is_connection_error(e):
+            raise
+
+    # A transfer that lost the server half way reports a failure without raising, the probe tells both apart
+    if http_client.is_reachable():
+        return REJECTED
+
+    offline = True
+    return queue_operation(username, operation, "Server unreachable")
+
+def queue_operation(username: str, operation: dict, reason: str) -> str:
+    operation = enqueue_operation(username, operation)
+    apply_operation_locally(operation)
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] {reason}, {describe_operation(operation)} "
+                  f"queued as #{operation['id']}")
+
+    start_sync_in_background()
+
+    return QUEUED
+
+def has_queued_operations(username: str, repository_name: str) -> bool:
+    return any(o["arguments"]["repositoryName"] == repository_name for o in load_operations(username))
+
+# -------- REPLAY FUNCTIONS --------
+
+def replay_operations(username: str, operations: List[dict]) -> tuple[int, int]:
+    # Replays the operations of one repository in order, returns how many were replayed and how many failed.
+    # An operation the server refuses is kept as a conflict and holds back the ones after it, which may depend
+    # on it. When the server is lost again, the rest stays queued for the next replay.
+    global offline
+
+    replayed = 0
+
+    for operation in operations:
+        if operation["status"] == CONFLICT:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] {len(operations) - replayed} operations of "
+                          f"{operation['arguments']['repositoryName']} held back by conflict #{operation['id']}")
+            return replayed, 0
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Replaying #{operation['id']} "
+                      f"{describe_operation(operation)}")
+
+        error = "Refused by the server"
+        try:
+            if execute_operation(operation):
+                remove_operation(username, operation["id"])
+                replayed += 1
+                continue
+        except job_manager.JobCancelledError:
+            raise
+        except Exception as e:
+            if http_client.is_connection_error(e):
+                offline = True
+                return replayed, 0
+            error = f"{type(e).__name__} - {e}"
+
+        if not http_client.is_reachable():
+            offline = True
+            return replayed, 0
+
+        update_operation(username, operation["id"], status=CONFLICT, error=error)
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Conflict on #{operation['id']} "
+                      f"{describe_operation(operation)}, {len(operations) - replayed - 1} later operations held back. "
+                      f"Fix it and run sync again, or remove it with queue drop {operation['id']}")
+        return replayed, 1
+
+    return replayed, 0
+
+def replay_queue(username: str) -> bool:
+    # Repositories are independent and replayed in parallel, returns False when operations are left in the queue
+    global offline
+
+    operations = load_operations(username)
+    if not operations:
+        return True
+
+    if not http_client.is_reachable():
+        offline = True
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Server still unreachable, "
+                      f"{len(operations)} operations stay queued")
+        return False
+
+    offline = False
+
+    groups = {}
+    for operation in sorted(operations, key=lambda o: o["id"]):
+        groups.setdefault(operation["arguments"]["repositoryName"], []).append(operation)
+
+    workers = max(1, min(get_setting("sync_workers"), len(groups)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [job_manager.submit(executor, replay_operations, username, group) for group in groups.values()]
+        results = [future.result() for future in futures]
+
+    context_manager.persist_context()
+
+    replayed = sum(r for r, _ in results)
+    conflicts = sum(c for _, c in results)
+    remaining = len(load_operations(username))
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if remaining == 0:
+        console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Replayed {replayed} queued operations")
+    else:
+        console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Replayed {replayed} queued operations, "
+                      f"{conflicts} new conflicts, {remaining} operations left in the queue")
+
+    return remaining == 0
+
+# -------- BACKGROUND SYNC FUNCTIONS --------
+
+def start_sync_in_background() -> threading.Thread:
+    global sync_thread
+
+    with sync_thread_lock:
+        if sync_thread is None or not sync_thread.is_alive():
+            sync_thread = threading.Thread(target=sync_when_reachable, args=(context_manager.user_data["username"],),
+                                           name="offline-sync", daemon=True)
+            sync_thread.start()
+
+        return sync_thread
+
+def sync_when_reachable(username: str):
+    # Probes the server every offline_probe_interval seconds while operations wait for replay
+    while True:
+        time.sleep(max(1.0, get_setting("offline_probe_interval")))
+
+        operations = load_operations(username)
+        if not any(o["status"] == QUEUED for o in operations):
+            return
+
+        if not http_client.is_reachable():
+            continue
+
+        with replay_lock:
+            replay_queue(username)
+
+        if not offline:
+            return
+
+# -------- CLI COMMANDS --------
+
+@app.command("ls")
+def show_queue():
+    username = context_manager.user_data["username"]
+    operations = load_operations(username) if username is not None else []
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if not operations:
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] No queued operations")
+        return
+
+    state = "offline" if offline else "online"
+    console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] {len(operations)} queued operations, client is {state}")
+
+    for operation in operations:
+        line = f"#{operation['id']} {operation['status']} {describe_operation(operation)} - queued at {operation['queuedAt']}"
+        if operation["error"]:
+            line += f" - {operation['error']}"
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] {line}")
+
+@app.command("drop")
+def drop_operation(
+        operation_id: int = typer.Argument(..., help="Id of the queued operation to remove")
+) -> bool:
+    username = context_manager.user_data["username"]
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if username is None or not remove_operation(username, operation_id):
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Unknown queued operation #{operation_id}")
+        return False
+
+    console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Removed #{operation_id} from the queue, "
+                  f"refresh to drop what it added to the local context")
+    return True
+
+@app.command("sync")
+def sync_queue() -> bool:
+    # Replays queued operations now, conflicts are kept for a second try once resolved
+    username = context_manager.user_data["username"]
+
+    if username is None or not load_operations(username):
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] No queued operations")
+        return True
+
+    if not replay_lock.acquire(blocking=False):
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Queued operations are already being replayed")
+        return False
+
+    try:
+        # A conflict the user resolved on the server gets another try
+        for operation in load_operations(username):
+            if operation["status"] == CONFLICT:
+                update_operation(username, operation["id"], status=QUEUED, error=None)
+
+        return replay_queue(username)
+    finally:
+        replay_lock.release()
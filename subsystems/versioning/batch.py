@@ -0,0 +1,160 @@
+import json
+import time
+import typer
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import List
+from subsystems.local.output_manager import get_console
+from subsystems.local import context_manager
+from subsystems.local.config_manager import get_setting
+from subsystems.local.job_manager import submit
+from subsystems.sync import sync
+
+# -------- CONFIGURATION --------
+console = get_console()
+
+app = typer.Typer(help="Batch push commands")
+
+# -------- CLI COMMANDS --------
+
+@app.command("manifest")
+def push_manifest(
+        manifest_path: Path = typer.Argument(..., help="JSON manifest mapping files and folders to branches"),
+        WORKING_DIRECTORY: Path = typer.Argument(..., help="Local working directory path")
+) -> bool:
+    manifest_path = WORKING_DIRECTORY / manifest_path
+
+    try:
+        items = load_batch_manifest(manifest_path, WORKING_DIRECTORY)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Invalid batch manifest {manifest_path} - {e}")
+        return False
+
+    return push_items(items)
+
+@app.command("glob")
+def push_glob(
+        repository_name: str = typer.Argument(..., help="Name of the repository to push to"),
+        resource_name: str = typer.Argument(..., help="Name of the resource to push to"),
+        branch_name: str = typer.Argument(..., help="Name of the branch to push to"),
+        pattern: str = typer.Argument(..., help="Glob pattern relative to the working directory"),
+        comment: str = typer.Argument(..., help="Comment describing every push"),
+        WORKING_DIRECTORY: Path = typer.Argument(..., help="Local working directory path")
+) -> bool:
+    items = [create_item(path, repository_name, resource_name, branch_name, comment)
+             for path in sorted(WORKING_DIRECTORY.glob(pattern))]
+    return push_items(items)
+
+# -------- BATCH MANIFEST FUNCTIONS --------
+
+def load_batch_manifest(manifest_path: Path, working_directory: Path) -> List[dict]:
+    # {"comment": "...", "items": [{"path" or "glob": "...", "repository": "...", "resource": "...", "branch": "...",
+    # "comment": "..."}]}, paths and globs are relative to the working directory and the comment is optional
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    items = []
+    for entry in manifest["items"]:
+        comment = entry.get("comment", manifest.get("comment", " "))
+
+        if "glob" in entry:
+            paths = sorted(working_directory.glob(entry["glob"]))
+        else:
+            paths = [working_directory / entry["path"]]
+
+        items.extend(create_item(path, entry["repository"], entry["resource"], entry["branch"], comment) for path in paths)
+
+    return items
+
+def create_item(path: Path, repository_name: str, resource_name: str, branch_name: str, comment: str) -> dict:
+    return {
+        "path": path,
+        "repositoryName": repository_name,
+        "resourceName": resource_name,
+        "branchName": branch_name,
+        "comment": comment
+    }
+
+# -------- BATCH PUSH FUNCTIONS --------
+
+def push_items(items: List[dict]) -> bool:
+    # Items are pushed by a bounded pool of workers sharing the connection pool, every item reports its own
+    # status as it finishes and a summary follows once all of them are done
+    if not items:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] No files or folders to push")
+        return False
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Pushing {len(items)} versions "
+                  f"with {get_setting('batch_workers')} parallel workers")
+
+    started_at = time.monotonic()
+    failed_items = []
+    queued_items = 0
+    completed_items = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, get_setting("batch_workers"))) as executor:
+        futures = {submit(executor, push_item, item): item for item in items}
+
+        for future in as_completed(futures):
+            item = futures[future]
+            completed_items += 1
+
+            try:
+                error, queued = future.result()
+            except Exception as e:
+                error, queued = str(e), False
+
+            target = f"{item['repositoryName']}/{item['resourceName']}/{item['branchName']}"
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            if error:
+                failed_items.append((item, error))
+                console.print(f"[white]{now}[/white] [[red]ERROR[/red]] [{completed_items}/{len(items)}] "
+                              f"{item['path'].name} to {target} - {error}")
+            elif queued:
+                queued_items += 1
+                console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] [{completed_items}/{len(items)}] "
+                              f"{item['path'].name} queued for {target}")
+            else:
+                console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] [{completed_items}/{len(items)}] "
+                              f"{item['path'].name} pushed to {target}")
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] Batch push completed in {time.monotonic() - started_at:.2f} s - "
+                  f"{len(items) - len(failed_items) - queued_items} pushed, {queued_items} queued, "
+                  f"{len(failed_items)} failed")
+
+    for item, error in failed_items:
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] Failed {item['path']} - {error}")
+
+    return not failed_items
+
+def push_item(item: dict) -> tuple[str | None, bool]:
+    # Runs on a worker thread, returns why the item could not be pushed and whether it was queued for replay.
+    # Items go through the same path as the push command, so they are queued while the server is unreachable.
+    path = item["path"]
+
+    if not context_manager.has_branch(item["repositoryName"], item["resourceName"], item["branchName"]):
+        return f"Branch {item['branchName']} does not exist in {item['repositoryName']}/{item['resourceName']}", False
+
+    if path.is_file():
+        is_mesh = True
+    elif path.is_dir():
+        if any(not child.is_file() for child in path.iterdir()):
+            return f"Material version {path} contains other directories", False
+        is_mesh = False
+    else:
+        return f"{path} not found in file system", False
+
+    arguments = {"repositoryName": item["repositoryName"], "resourceName": item["resourceName"],
+                 "branchName": item["branchName"], "path": str(path.resolve()), "comment": item["comment"],
+                 "isMesh": is_mesh}
+
+    status = sync.run_or_queue("push", arguments)
+    if status == sync.REJECTED:
+        return "Push rejected by the server", False
+
+    return None, status == sync.QUEUED
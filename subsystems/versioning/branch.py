@@ -1,15 +1,15 @@
-import requests
 import typer
 from datetime import datetime
-from rich.console import Console
+from subsystems.local.listing_manager import ListingOptions, show_listing
+from subsystems.local.output_manager import get_console
 from subsystems.local.context_manager import add_branch
-from subsystems.local.token_manager import load_token
+from subsystems.network import http_client
 from subsystems.versioning.dto.BranchDTO import BranchDTO
 
 # -------- CONFIGURATION --------
-BASE_URL = "http://localhost:8080/branches"
+BASE_PATH = "/branches"
 
-console = Console()
+console = get_console()
 
 app = typer.Typer(help="Branches management commands")
 
@@ -23,10 +23,7 @@ def init(
 ):
     branch_dto = BranchDTO(repository_name, resource_name, branch_name)
 
-    token = load_token()
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
-
-    response = requests.post(f"{BASE_URL}/create", json=branch_dto.__dict__, headers=headers)
+    response = http_client.post(f"{BASE_PATH}/create", json=branch_dto.__dict__)
     data = response.json()
 
     message = data.get('message')
@@ -36,23 +33,23 @@ def init(
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] {message}")
         add_branch(repository_name, resource_name, branch_name)
+        return True
     else:
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {error}")
+        return False
 
 
 @app.command("ls")
 def list_branches(
         repository_name: str = typer.Argument(..., help="Name of the repository containing the resource"),
-        resource_name: str = typer.Argument(..., help="Name of the resource whose branches will be listed")
+        resource_name: str = typer.Argument(..., help="Name of the resource whose branches will be listed"),
+        limit: int | None = typer.Option(None, "--limit", help="Maximum number of branches to show"),
+        offset: int = typer.Option(0, "--offset", help="Number of branches to skip"),
+        json_output: bool = typer.Option(False, "--json", help="Print the branches as one JSON document")
 ):
     from subsystems.local import context_manager
 
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Branches found successfully for "
-        f"{resource_name} resource in {repository_name} repository")
-
     branches = context_manager.list_branches(repository_name, resource_name)
-    for branch in branches:
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] {branch}")
\ No newline at end of file
+    show_listing([f"Branches found successfully for {resource_name} resource in {repository_name} repository"],
+                 "branches", branches, options=ListingOptions(limit, offset, json_output))
@@ -1,15 +1,15 @@
-import requests
 import typer
 from datetime import datetime
-from rich.console import Console
+from subsystems.local.listing_manager import ListingOptions, show_listing
+from subsystems.local.output_manager import get_console
 from subsystems.local.context_manager import add_repository
-from subsystems.local.token_manager import load_token
+from subsystems.network import http_client
 from subsystems.versioning.dto.RepositoryDTO import RepositoryDTO
 
 # -------- CONFIGURATION --------
-BASE_URL = "http://localhost:8080/repositories"
+BASE_PATH = "/repositories"
 
-console = Console()
+console = get_console()
 
 app = typer.Typer(help="Repository management commands")
 
@@ -21,10 +21,7 @@ def init(
 ):
     repository = RepositoryDTO(repository_name)
 
-    token = load_token()
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
-
-    response = requests.post(f"{BASE_URL}/create", json=repository.__dict__, headers=headers)
+    response = http_client.post(f"{BASE_PATH}/create", json=repository.__dict__)
     data = response.json()
 
     message = data.get('message')
@@ -34,34 +31,33 @@ def init(
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] {message}")
         add_repository(repository_name, True)
+        return True
     else:
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {error}")
+        return False
 
 
 @app.command("ls")
 def list_repos(
         o: bool = typer.Option(False, "--o", help="List only owned repositories"),
-        c: bool = typer.Option(False, "--c", help="List only contributed repositories")
+        c: bool = typer.Option(False, "--c", help="List only contributed repositories"),
+        limit: int | None = typer.Option(None, "--limit", help="Maximum number of repositories to show"),
+        offset: int = typer.Option(0, "--offset", help="Number of repositories to skip"),
+        json_output: bool = typer.Option(False, "--json", help="Print the repositories as one JSON document")
 ):
     from subsystems.local import context_manager
 
     if o:
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Owned repositories found successfully")
+        messages = ["Owned repositories found successfully"]
         repositories = context_manager.list_repositories("owned")
 
     elif c:
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Contributed repositories found successfully")
+        messages = ["Contributed repositories found successfully"]
         repositories = context_manager.list_repositories("contributed")
 
     else:
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Owned repositories found successfully")
-        console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Contributed repositories found successfully")
+        messages = ["Owned repositories found successfully", "Contributed repositories found successfully"]
         repositories = context_manager.list_repositories()
 
-    for repository_name in repositories:
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] {repository_name}")
\ No newline at end of file
+    show_listing(messages, "repositories", repositories, options=ListingOptions(limit, offset, json_output))
@@ -1,18 +1,23 @@
-import requests
 import typer
 from datetime import datetime
-from rich.console import Console
+from typing import List
+from subsystems.local.config_manager import get_setting
+from subsystems.local.listing_manager import ListingOptions, get_page, print_page_hint, show_listing
+from subsystems.local.output_manager import get_console
 from subsystems.local.context_manager import add_resource
-from subsystems.local.token_manager import load_token
+from subsystems.network import http_client
 from subsystems.versioning.dto.ResourceDTO import ResourceDTO
 
 # -------- CONFIGURATION --------
-BASE_URL = "http://localhost:8080/resources"
+BASE_PATH = "/resources"
 
-console = Console()
+console = get_console()
 
 app = typer.Typer(help="Resources management commands")
 
+# Rows printed at once while a tree is rendered, the first branches show up before the last ones are read
+TREE_BATCH_ROWS = 200
+
 # -------- CLI COMMANDS --------
 
 @app.command()
@@ -22,10 +27,7 @@ def init(
 ):
     resource_dto = ResourceDTO(repository_name, resource_name)
 
-    token = load_token()
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
-
-    response = requests.post(f"{BASE_URL}/create", json=resource_dto.__dict__, headers=headers)
+    response = http_client.post(f"{BASE_PATH}/create", json=resource_dto.__dict__)
     data = response.json()
 
     message = data.get('message')
@@ -35,48 +37,134 @@ def init(
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] {message}")
         add_resource(repository_name, resource_name)
+        return True
     else:
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {error}")
+        return False
 
 @app.command("ls")
 def list_resources(
-        repository_name: str = typer.Argument(..., help="Name of the repository containing the resources")
+        repository_name: str = typer.Argument(..., help="Name of the repository containing the resources"),
+        limit: int | None = typer.Option(None, "--limit", help="Maximum number of resources to show"),
+        offset: int = typer.Option(0, "--offset", help="Number of resources to skip"),
+        json_output: bool = typer.Option(False, "--json", help="Print the resources as one JSON document")
 ):
     from subsystems.local import context_manager
 
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Resources found successfully in {repository_name} repository")
-
     resources = context_manager.list_resources(repository_name)
-    for resource in resources:
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] {resource}")
+    show_listing([f"Resources found successfully in {repository_name} repository"], "resources", resources,
+                 options=ListingOptions(limit, offset, json_output))
 
 @app.command("tree")
 def show_version_tree(
         repository_name: str = typer.Argument(..., help="Name of the repository containing the resource"),
-        resource_name: str = typer.Argument(..., help="Name of the resource whose version tree will be displayed")
+        resource_name: str = typer.Argument(..., help="Name of the resource whose version tree will be displayed"),
+        branch_names: List[str] = typer.Argument(None, help="Branches to expand with all their versions"),
+        recent_versions: int | None = typer.Option(None, "--versions", help="Most recent versions shown for each branch"),
+        limit: int | None = typer.Option(None, "--limit", help="Maximum number of branches, or versions of expanded branches, to show"),
+        offset: int = typer.Option(0, "--offset", help="Number of branches, or versions of expanded branches, to skip"),
+        json_output: bool = typer.Option(False, "--json", help="Print the tree as one JSON document")
 ):
+    # Branches are collapsed to their tree_versions most recent versions and only the branches of the page are
+    # read from the context, so the size of the history does not slow the tree down
     from subsystems.local import context_manager
 
+    options = ListingOptions(limit, offset, json_output)
+
+    if branch_names:
+        expand_branches(repository_name, resource_name, branch_names, options)
+        return
+
+    if recent_versions is None:
+        recent_versions = get_setting("tree_versions")
+
+    branches = context_manager.list_branches(repository_name, resource_name)
+    start, end = get_page(len(branches), options)
+
+    if json_output:
+        console.print_data({"branches": [describe_branch(repository_name, resource_name, b, recent_versions)
+                                         for b in branches[start:end]],
+                            "total": len(branches), "offset": start})
+        return
+
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Version tree found successfully "
                   f"for {resource_name} resource in {repository_name} repository")
 
-    resources = context_manager.list_resources(repository_name)
-    for resource in resources:
-        if resource == resource_name:
-            branches = context_manager.list_branches(repository_name, resource)
+    rows = [resource_name]
+    collapsed = False
+    for index, branch_name in enumerate(branches[start:end]):
+        branch = describe_branch(repository_name, resource_name, branch_name, recent_versions)
+        collapsed = collapsed or len(branch["versions"]) < branch["versionCount"]
+
+        # Connectors follow the position among all branches, a page that is not the last one ends with ├──
+        last = start + index == len(branches) - 1
+        rows.append(f"{'└── ' if last else '├── '}{branch_name} ({count_label(branch['versionCount'])})")
+        if branch["versions"]:
+            hidden = branch["versionCount"] - len(branch["versions"])
+            chain = " -> ".join(branch["versions"])
+            rows.append(f"{'    ' if last else '│   '}└── {f'... {hidden} older -> ' if hidden else ''}{chain}")
+
+        if len(rows) >= TREE_BATCH_ROWS:
+            console.print_rows(now, "INFO", "cyan", rows)
+            rows = []
+
+    console.print_rows(now, "INFO", "cyan", rows)
+    print_page_hint(now, "branches", start, end, len(branches))
+
+    if collapsed:
+        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] Add branch names to tree to expand them, "
+                      f"or --versions to show more of every branch")
+
+def expand_branches(repository_name: str, resource_name: str, branch_names: List[str], options: ListingOptions):
+    # Lists every version of the given branches, --limit and --offset page through the versions of each one
+    from subsystems.local import context_manager
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    documents = []
+
+    for branch_name in branch_names:
+        if not context_manager.has_branch(repository_name, resource_name, branch_name):
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] Branch {branch_name} not found "
+                          f"in {resource_name} resource")
+            continue
+
+        total = context_manager.count_versions(repository_name, resource_name, branch_name)
+        start, end = get_page(total, options)
+        versions = context_manager.list_versions_range(repository_name, resource_name, branch_name, start, end)
+
+        if options.json_output:
+            documents.append({"branchName": branch_name, "versions": versions, "total": total, "offset": start})
+            continue
+
+        console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Versions of {branch_name} branch found "
+                      f"successfully for {resource_name} resource in {repository_name} repository")
+
+        rows = [f"{branch_name} ({count_label(total)})"]
+        for index, version_name in enumerate(versions):
+            rows.append(f"{'└── ' if start + index == total - 1 else '├── '}{version_name}")
+
+            if len(rows) >= TREE_BATCH_ROWS:
+                console.print_rows(now, "INFO", "cyan", rows)
+                rows = []
+
+        console.print_rows(now, "INFO", "cyan", rows)
+        print_page_hint(now, f"versions of {branch_name}", start, end, total)
+
+    if options.json_output:
+        console.print_data({"branches": documents})
+
+def describe_branch(repository_name: str, resource_name: str, branch_name: str, recent_versions: int) -> dict:
+    from subsystems.local import context_manager
 
-            for branch in branches:
-                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] {branch}")
+    versions = []
+    if recent_versions > 0:
+        versions = context_manager.list_versions_range(repository_name, resource_name, branch_name, -recent_versions, None)
 
-                versions = context_manager.list_versions(repository_name, resource, branch)
-                versions_string = ""
-                for version in versions:
-                    versions_string += version + " -> "
+    return {"branchName": branch_name,
+            "versionCount": context_manager.count_versions(repository_name, resource_name, branch_name),
+            "versions": versions}
 
-                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] {versions_string[:-4]}")
\ No newline at end of file
+def count_label(count: int) -> str:
+    return "no versions" if count == 0 else "1 version" if count == 1 else f"{count} versions"
@@ -1,19 +1,35 @@
+import hashlib
+import json
 import mimetypes
-import requests
 import typer
 import os
+import shutil
+import uuid
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from rich.text import Text
 from pathlib import Path
+from urllib.parse import quote
 from datetime import datetime
-from json import decoder
-from requests_toolbelt.multipart import decoder
-from rich.console import Console
-from subsystems.local.token_manager import load_token
+from subsystems.local.output_manager import get_console
+from subsystems.local import file_index_manager, metrics_manager
+from subsystems.local.listing_manager import ListingOptions, show_listing
+from subsystems.local.config_manager import get_setting
+from subsystems.local.job_manager import submit
+from subsystems.local.manifest_manager import HASH_ALGORITHM, build_manifest, describe_file, find_local_copies, load_manifest, save_manifest
+from subsystems.local.object_store_manager import checkout_object, link_or_copy, store_files
+from subsystems.network import http_client
+from subsystems.network.chunked_upload import upload_in_chunks
+from subsystems.network.file_stream import FileStream
+from subsystems.network.range_download import download_files
+from subsystems.network.retry_policy import is_retryable_error, is_retryable_status, send_with_retry, wait_before_retry
+from subsystems.network.multipart import StreamingMultipartEncoder, iter_multipart, get_disposition_param, PART_HEADERS, PART_DATA
+from subsystems.network.transfer_progress import TransferProgress
 
 # -------- CONFIGURATION --------
-BASE_URL = "http://localhost:8080/versions"
+BASE_PATH = "/versions"
 
-console = Console()
+console = get_console()
 
 app = typer.Typer(help="Versions management commands")
 
@@ -30,40 +46,82 @@ def push(
         is_mesh: bool = typer.Argument(..., help="Set True if the version is a mesh, False if it is a material"),
         WORKING_DIRECTORY: Path = typer.Argument(..., help="Local working directory path")
 ):
+    # The REPL push command refreshes the index before checking the version name, this lookup only reads it
+    matches = file_index_manager.find_paths(Path(WORKING_DIRECTORY), version_name)
+    version_path = matches[0].resolve()
+
+    return push_version(repository_name, resource_name, branch_name, version_path, comment if comment_option else " ", is_mesh)
+
+def push_version(repository_name: str, resource_name: str, branch_name: str, version_path: Path, comment: str,
+                 is_mesh: bool, idempotency_key: str | None = None) -> bool:
+    # Pushes a resolved mesh file or material folder, returns whether the server accepted the version. Every
+    # request that could create the version carries the same idempotency key, so a retried push is never
+    # stored twice.
     from subsystems.local import context_manager
 
-    start_path = Path(WORKING_DIRECTORY)
-    matches = list(start_path.rglob(version_name))
-    version_path = matches[0].resolve()
+    idempotency_key = idempotency_key or uuid.uuid4().hex
 
+    version_name = version_path.name
     files = []
     data = {
         "repositoryName": repository_name,
         "resourceName": resource_name,
         "branchName": branch_name,
         "versionName": version_name.split(".")[0] if is_mesh else version_name,
-        "comment": comment if comment_option else " "
+        "comment": comment
     }
 
     if version_path.is_file() and is_mesh:
         mime_type, _ = mimetypes.guess_type(version_path)
-        files.append(
-            ("mesh", (version_path.name, open(version_path, "rb"), mime_type or "application/octet-stream"))
-        )
+        files.append(("mesh", version_path, mime_type or "application/octet-stream"))
     elif version_path.is_dir() and not is_mesh:
         for f in version_path.iterdir():
             if f.is_file():
                 mime_type, _ = mimetypes.guess_type(f)
-                files.append(
-                    ("material", (f.name, open(f, "rb"), mime_type or "application/octet-stream"))
-                )
+                files.append(("material", f, mime_type or "application/octet-stream"))
+
+    chunk_size = get_setting("transfer_chunk_size")
+    manifest = {}
+
+    if not is_mesh and get_setting("deduplicate_pushes"):
+        manifest = build_manifest([path for _, path, _ in files], chunk_size)
+        missing_hashes = request_missing_hashes(repository_name, resource_name, branch_name, manifest)
+
+        if missing_hashes is not None:
+            references = [{"fileName": name, "hash": entry["hash"]} for name, entry in manifest.items()
+                          if entry["hash"] not in missing_hashes]
+            files = [f for f in files if manifest[f[1].name]["hash"] in missing_hashes]
+            data["references"] = json.dumps(references)
+
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] {len(references)} of {len(manifest)} "
+                          f"textures already stored on the server, uploading {len(files)}")
+
+    uploaded = None
+    if is_mesh and files and get_setting("chunked_mesh_uploads"):
+        _, mesh_path, mime_type = files[0]
+        uploaded = upload_in_chunks(f"{BASE_PATH}/uploads", data, mesh_path, mime_type, idempotency_key)
+        if uploaded is not None:
+            uploaded = uploaded[0], {mesh_path.name: uploaded[1]}
+    elif not is_mesh and get_setting("parallel_uploads"):
+        uploaded = upload_files_in_parallel(data, files, idempotency_key)
+
+    if uploaded is not None:
+        data, digests = uploaded
+    else:
+        encoders = []
 
-    token = load_token()
+        # The streamed body is consumed by each attempt, a retry sends a fresh one
+        def send_push():
+            with StreamingMultipartEncoder(list(data.items()), files, chunk_size) as encoder:
+                encoders.append(encoder)
+                return http_client.post(f"{BASE_PATH}/push", data=encoder, idempotency_key=idempotency_key,
+                                        headers={"Content-Type": encoder.content_type})
 
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
+        response = send_with_retry(send_push, True, f"POST {BASE_PATH}/push")
 
-    response = requests.post(f"{BASE_URL}/push", data=data, files=files, headers=headers)
-    data =  response.json()
+        data =  response.json()
+        digests = encoders[-1].digests
 
     message = data.get("message")
     error = data.get("error")
@@ -75,26 +133,32 @@ def push(
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] {message}")
         context_manager.add_version(repository_name, resource_name, branch_name, generated_version_name)
+
+        for _, path, _ in files:
+            manifest.setdefault(path.name, describe_file(path, digests[path.name]))
+        save_manifest(repository_name, resource_name, branch_name, generated_version_name, manifest)
+        store_files(manifest)
+        return True
     else:
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {error}")
+        return False
 
 @app.command("ls")
 def list_versions(
         repository_name: str = typer.Argument(..., help="Name of the repository containing the branch"),
         resource_name: str = typer.Argument(..., help="Name of the resource containing the branch"),
-        branch_name: str = typer.Argument(..., help="Name of the branch whose versions to list")
+        branch_name: str = typer.Argument(..., help="Name of the branch whose versions to list"),
+        limit: int | None = typer.Option(None, "--limit", help="Maximum number of versions to show"),
+        offset: int = typer.Option(0, "--offset", help="Number of versions to skip"),
+        json_output: bool = typer.Option(False, "--json", help="Print the versions as one JSON document")
 ):
     from subsystems.local import context_manager
 
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Versions found successfully "
-                  f"for {branch_name} branch for {resource_name} resource in {repository_name} repository")
-
     versions = context_manager.list_versions(repository_name, resource_name, branch_name)
-    for version in versions:
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        console.print(f"[white]{now}[/white] [[cyan]INFO[/cyan]] {version}")
+    show_listing([f"Versions found successfully for {branch_name} branch for {resource_name} resource in "
+                  f"{repository_name} repository"], "versions", versions,
+                 options=ListingOptions(limit, offset, json_output))
 
 
 @app.command()
@@ -114,39 +178,72 @@ def pull(
     }
 
     pull_path = WORKING_DIRECTORY.joinpath(version_name)
+    # Files are received into a hidden staging folder that only replaces the version once every file is complete,
+    # so a failed or cancelled pull never leaves a partial version behind. The folder is kept to resume from.
+    staging_path = WORKING_DIRECTORY.joinpath(f".{version_name}.pull")
+    manifest = {}
 
-    token = load_token()
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
-
-    response = requests.post(f"{BASE_URL}/pull", data=data, headers=headers)
+    if get_setting("delta_pulls") or get_setting("parallel_pulls"):
+        # Versions never change once pushed, so a manifest saved by an earlier push or pull is as good as the server's
+        remote_manifest = (load_manifest(repository_name, resource_name, branch_name, version_name)
+                           or request_version_manifest(data))
 
-    if response.status_code == 200 and 'multipart' in response.headers.get('Content-Type', ''):
-        os.makedirs(pull_path, exist_ok=True)
-        multipart_data = decoder.MultipartDecoder(response.content, response.headers['Content-Type'])
+        if remote_manifest is not None:
+            os.makedirs(staging_path, exist_ok=True)
+            missing_files = list(remote_manifest)
 
-        for part in multipart_data.parts:
-            cd = part.headers.get(b'Content-Disposition', b'').decode()
-            ct = part.headers.get(b'Content-Type', b'application/octet-stream').decode()
+            if get_setting("delta_pulls"):
+                manifest = link_local_copies(repository_name, resource_name, remote_manifest, staging_path)
+                missing_files = [filename for filename in remote_manifest if filename not in manifest]
 
-            if 'name="message"' in cd:
                 now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] {part.text}")
-                continue
-
-            if 'filename=' in cd:
-                import re
-                match = re.search(r'filename="(.+?)"', cd)
-                filename = match.group(1) if match else "unknown_file"
-
-                file_path = os.path.join(pull_path, filename)
-                with open(file_path, 'wb') as f:
-                    f.write(part.content)
-                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Saved file {filename} ({len(part.content)} byte, {ct})")
-    else:
-        error = response.json().get("error")
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {error}")
+                console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] {len(manifest)} of {len(remote_manifest)} "
+                              f"files reused from local cache, downloading {len(missing_files)}")
+
+                if not missing_files:
+                    publish_pulled_version(staging_path, pull_path, manifest)
+                    save_manifest(repository_name, resource_name, branch_name, version_name, manifest)
+
+                    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Version {version_name} restored from local files")
+                    return True
+
+            if get_setting("parallel_pulls"):
+                params = {key: data[key] for key in ("repositoryName", "resourceName", "branchName", "versionName")}
+                downloaded = download_files(f"{BASE_PATH}/objects", params,
+                                            {filename: remote_manifest[filename] for filename in missing_files}, staging_path)
+
+                if downloaded is not None:
+                    received_files, error = downloaded
+
+                    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    if error:
+                        console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {error}, run pull again to resume")
+                        return False
+
+                    manifest.update(received_files)
+                    publish_pulled_version(staging_path, pull_path, manifest)
+                    save_manifest(repository_name, resource_name, branch_name, version_name, manifest)
+                    store_files(received_files)
+                    console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Version {version_name} pulled successfully")
+                    return True
+
+            data["fileNames"] = json.dumps(missing_files)
+
+    with http_client.post(f"{BASE_PATH}/pull", data=data, stream=True, idempotent=True) as response:
+        if response.status_code == 200 and 'multipart' in response.headers.get('Content-Type', ''):
+            os.makedirs(staging_path, exist_ok=True)
+            received_files = receive_version_files(response, staging_path)
+            manifest.update(received_files)
+            publish_pulled_version(staging_path, pull_path, manifest)
+            save_manifest(repository_name, resource_name, branch_name, version_name, manifest)
+            store_files(received_files)
+            return True
+        else:
+            error = response.json().get("error")
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {error}")
+            return False
 
 
 @app.command("metadata")
@@ -164,10 +261,7 @@ def show_version_metadata(
         "comment": None
     }
 
-    token = load_token()
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
-
-    response = requests.post(f"{BASE_URL}/metadata", data=data, headers=headers)
+    response = http_client.post(f"{BASE_PATH}/metadata", data=data, idempotent=True)
 
     data = response.json()
 
@@ -202,4 +296,220 @@ def show_version_metadata(
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         console.print(f"[white]{now}[/white] [[red]ERROR[/red]] {error}")
 
+# -------- TRANSFER FUNCTIONS --------
+
+def request_missing_hashes(repository_name: str, resource_name: str, branch_name: str, manifest: dict) -> set[str] | None:
+    payload = {
+        "repositoryName": repository_name,
+        "resourceName": resource_name,
+        "branchName": branch_name,
+        "algorithm": HASH_ALGORITHM,
+        "hashes": sorted({entry["hash"] for entry in manifest.values()})
+    }
+
+    response = http_client.post(f"{BASE_PATH}/objects/check", json=payload, idempotent=True)
+
+    # Servers without content-addressed storage do not expose the endpoint, the push then uploads every file
+    if response.status_code in (404, 405, 501):
+        return None
+
+    json_data = response.json()
+    if json_data.get("error"):
+        return None
+
+    return set(json_data.get("missing", []))
+
+def upload_files_in_parallel(data: dict, files: list, idempotency_key: str) -> tuple[dict, dict] | None:
+    # Every file is sent in its own request to an upload session by a bounded pool of workers. The server only
+    # creates the version when the session is committed, after every file has been confirmed, so a failed
+    # upload never leaves a partial version behind.
+    response = http_client.post(f"{BASE_PATH}/uploads", json={**data, "fileCount": len(files)}, idempotency_key=idempotency_key)
+
+    # Servers without upload sessions do not expose the endpoint, the push then falls back to one multipart request
+    if response.status_code in (404, 405, 501):
+        return None
+
+    json_data = response.json()
+    upload_id = json_data.get("uploadId")
+    if not upload_id:
+        return {"error": json_data.get("error") or "Upload session could not be started"}, {}
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Uploading {len(files)} files "
+                  f"with {get_setting('upload_workers')} parallel workers")
+
+    digests = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, get_setting("upload_workers")))
+    futures = {submit(executor, upload_file, upload_id, path, mime_type): path for _, path, mime_type in files}
+
+    try:
+        for future in as_completed(futures):
+            path = futures[future]
+            digest, error = future.result()
+
+            if error:
+                http_client.request("DELETE", f"{BASE_PATH}/uploads/{upload_id}")
+                return {"error": f"Upload of {path.name} failed - {error}"}, digests
+
+            digests[path.name] = digest
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    payload = {
+        "files": [{"fileName": path.name, "hash": digests[path.name], "size": path.stat().st_size} for _, path, _ in files],
+        "references": json.loads(data.get("references", "[]"))
+    }
+
+    response = http_client.post(f"{BASE_PATH}/uploads/{upload_id}/commit", json=payload, idempotency_key=idempotency_key)
+    return response.json(), digests
+
+def upload_file(upload_id: str, path: Path, mime_type: str) -> tuple[str | None, str | None]:
+    # Runs on a worker thread, returns the SHA-256 of the sent file or the last error once every attempt has failed
+    error = None
+
+    for attempt in range(max(0, get_setting("upload_retries")) + 1):
+        if attempt > 0 and not wait_before_retry(attempt - 1, f"Upload of {path.name} failed - {error}"):
+            break
+
+        progress = TransferProgress(f"Sending {path.name}", path.stat().st_size)
+
+        try:
+            with FileStream(path, progress=progress) as stream:
+                response = http_client.request("PUT", f"{BASE_PATH}/uploads/{upload_id}/files/{quote(path.name)}",
+                                               data=stream, headers={"Content-Type": mime_type})
+                digest = stream.hexdigest()
+        except requests.RequestException as e:
+            if not is_retryable_error(e, True):
+                return None, str(e)
+            error = str(e)
+            continue
+        except OSError as e:
+            return None, str(e)
+
+        try:
+            json_data = response.json()
+        except ValueError:
+            json_data = {}
+
+        if is_retryable_status(response.status_code):
+            error = json_data.get("error") or f"HTTP {response.status_code}"
+            continue
+
+        if response.status_code >= 400:
+            return None, json_data.get("error") or f"HTTP {response.status_code}"
+
+        if json_data.get("hash", digest) != digest:
+            error = "Checksum mismatch"
+            continue
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"[white]{now}[/white] [yellow][SYS_INFO][/yellow] Sent file {path.name} ({progress.summary()})")
+        return digest, None
+
+    return None, error
+
+def receive_version_files(response, pull_path: Path) -> dict:
+    # Every file part is streamed into a hidden temporary file and renamed into place once complete, so
+    # memory use stays at one chunk and an interrupted pull never leaves a truncated file behind.
+    chunks = response.iter_content(chunk_size=get_setting("transfer_chunk_size"))
+
+    part_file = None
+    part_path = None
+    text_buffer = bytearray()
+    received_files = {}
+
+    try:
+        for event, value in iter_multipart(chunks, response.headers['Content-Type']):
+            if event == PART_HEADERS:
+                name = get_disposition_param(value, "name")
+                filename = get_disposition_param(value, "filename")
+                content_type = value.get("content-type", "application/octet-stream")
+
+                if filename is not None:
+                    filename = Path(filename).name or "unknown_file"
+                    part_path = pull_path / f".{filename}.part"
+                    part_file = open(part_path, "wb")
+                    digest = hashlib.new(HASH_ALGORITHM)
+                    progress = TransferProgress(f"Receiving {filename}")
+                else:
+                    text_buffer = bytearray()
+
+            elif event == PART_DATA:
+                if part_file is not None:
+                    metrics_manager.write(part_file, value)
+                    digest.update(value)
+                    progress.update(len(value))
+                else:
+                    text_buffer += value
+
+            elif part_file is not None:
+                part_file.close()
+                part_file = None
+                os.replace(part_path, pull_path / filename)
+                received_files[filename] = describe_file(pull_path / filename, digest.hexdigest())
+
+                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] Saved file {filename} "
+                              f"({progress.summary()}, {content_type})")
+
+            elif name == "message":
+                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                console.print(f"[white]{now}[/white] [[green]SUCCESS[/green]] {text_buffer.decode('utf-8', errors='replace')}")
+    finally:
+        if part_file is not None:
+            part_file.close()
+            part_path.unlink(missing_ok=True)
+
+    return received_files
+
+def request_version_manifest(data: dict) -> dict | None:
+    response = http_client.post(f"{BASE_PATH}/manifest", data=data, idempotent=True)
+
+    if response.status_code in (404, 405, 501):
+        return None
+
+    json_data = response.json()
+    if json_data.get("error") or json_data.get("algorithm", HASH_ALGORITHM) != HASH_ALGORITHM:
+        return None
+
+    return {f["fileName"]: {"hash": f["hash"], "size": f["size"]} for f in json_data.get("files", [])}
+
+def publish_pulled_version(staging_path: Path, pull_path: Path, manifest: dict):
+    # A new version folder is renamed into place at once, an existing one has every file replaced on its own so
+    # files the user added to it are kept. Manifest entries are updated to the published paths.
+    with metrics_manager.span("disk.publish"):
+        for leftover in staging_path.glob(".*"):
+            leftover.unlink(missing_ok=True)
+
+        if not pull_path.exists():
+            os.replace(staging_path, pull_path)
+        else:
+            for staged_file in staging_path.iterdir():
+                if staged_file.is_file() and not staged_file.name.startswith("."):
+                    os.replace(staged_file, pull_path / staged_file.name)
+            shutil.rmtree(staging_path, ignore_errors=True)
+
+    for filename, entry in manifest.items():
+        entry["path"] = str((pull_path / Path(filename).name).resolve())
+
+def link_local_copies(repository_name: str, resource_name: str, remote_manifest: dict, pull_path: Path) -> dict:
+    # Files come from the object store first, then from versions of the same resource found on disk
+    copies = None
+    linked_files = {}
+
+    for filename, entry in remote_manifest.items():
+        target = pull_path / Path(filename).name
+
+        if not checkout_object(entry["hash"], target):
+            if copies is None:
+                copies = find_local_copies(repository_name, resource_name)
+
+            source = copies.get(entry["hash"])
+            if source is None:
+                continue
+
+            link_or_copy(source, target)
+
+        linked_files[filename] = describe_file(target, entry["hash"])
 
+    return linked_files
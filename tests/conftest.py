@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+import pytest
+
+# -------- CONFIGURATION --------
+ROOT_PATH = Path(__file__).resolve().parent.parent
+
+# The client modules create their AppData folders under HOME when imported, so HOME points to a scratch folder
+# before any of them is imported and the tests never touch the real configuration, queue or upload states
+HOME_PATH = tempfile.mkdtemp(prefix="dddit_tests_")
+os.environ["HOME"] = os.environ["USERPROFILE"] = HOME_PATH
+
+sys.path.insert(0, str(ROOT_PATH))
+sys.path.insert(0, str(ROOT_PATH / "benchmarks"))
+
+from fake_server import FakeDdditServer, FakeRequestHandler
+
+USERNAME = "tester"
+
+# Handler methods as the fake server defines them, every interception wraps these and never another wrapper
+ORIGINAL_HANDLERS = {name: getattr(FakeRequestHandler, name) for name in ("handle_object_download", "handle_upload")}
+
+# -------- FIXTURES --------
+
+@pytest.fixture(scope="session")
+def fake_server():
+    # One server for the whole run, the client reads its base URL from the settings
+    server = FakeDdditServer()
+    os.environ["DDDIT_BASE_URL"] = server.base_url
+
+    with server:
+        yield server
+
+@pytest.fixture
+def server(fake_server, monkeypatch):
+    # A fresh server state and a logged user for every test, transfers run one at a time so an interruption
+    # always lands at the same place
+    from subsystems.network import http_client
+
+    fake_server.reset()
+    http_client.set_token(fake_server.seed(USERNAME, repositories=1, resources=1))
+
+    monkeypatch.setenv("DDDIT_DOWNLOAD_WORKERS", "1")
+    monkeypatch.setenv("DDDIT_RETRY_BASE_DELAY", "0")
+    return fake_server
+
+@pytest.fixture
+def intercept(monkeypatch):
+    # intercept(name, hook) calls hook(handler, *args) before the fake server handler method called name. The
+    # hook may change the request, and a (reply, status) it returns is sent instead of the server's answer.
+    def install(name: str, hook):
+        original = ORIGINAL_HANDLERS[name]
+
+        def handle(handler, *args):
+            reply = hook(handler, *args)
+            return reply if reply is not None else original(handler, *args)
+
+        monkeypatch.setattr(FakeRequestHandler, name, handle)
+
+    return install
@@ -0,0 +1,92 @@
+import hashlib
+import os
+from subsystems.network import chunked_upload
+
+UPLOADS_PATH = "/versions/uploads"
+
+CHUNK_SIZE = 1000
+
+# -------- HELPERS --------
+
+def create_mesh(tmp_path, size: int):
+    mesh_path = tmp_path / "mesh.fbx"
+    mesh_path.write_bytes(os.urandom(size))
+    return mesh_path
+
+def version_data() -> dict:
+    return {"repositoryName": "repository_0", "resourceName": "resource_0", "branchName": "main", "versionName": "mesh"}
+
+def record_chunks(intercept, failing_chunk: int | None = None) -> list:
+    # Records the index of every chunk sent, the chunk numbered failing_chunk is refused
+    sent_chunks = []
+
+    def hook(handler, parts, body, username):
+        if len(parts) == 3 and parts[1] == "chunks":
+            sent_chunks.append(int(parts[2]))
+            if int(parts[2]) == failing_chunk:
+                return {"error": "Chunk rejected"}, 400
+        return None
+
+    intercept("handle_upload", hook)
+    return sent_chunks
+
+# -------- TESTS --------
+
+def test_interrupted_upload_resumes_at_first_missing_chunk(server, intercept, monkeypatch, tmp_path):
+    monkeypatch.setenv("DDDIT_UPLOAD_CHUNK_SIZE", str(CHUNK_SIZE))
+    mesh_path = create_mesh(tmp_path, 5 * CHUNK_SIZE + 500)
+
+    sent_chunks = record_chunks(intercept, failing_chunk=3)
+    reply, file_hash = chunked_upload.upload_in_chunks(UPLOADS_PATH, version_data(), mesh_path,
+                                                       "application/octet-stream", "first-attempt")
+
+    assert "failed at chunk 4/6" in reply["error"]
+    assert file_hash is None
+    assert sent_chunks == [0, 1, 2, 3]
+
+    sent_chunks = record_chunks(intercept)
+    reply, file_hash = chunked_upload.upload_in_chunks(UPLOADS_PATH, version_data(), mesh_path,
+                                                       "application/octet-stream", "second-attempt")
+
+    content = mesh_path.read_bytes()
+    assert "message" in reply
+    assert sent_chunks == [3, 4, 5]
+    assert file_hash == hashlib.sha256(content).hexdigest()
+    assert server.objects[file_hash] == content
+
+def test_changed_file_starts_a_new_upload(server, intercept, monkeypatch, tmp_path):
+    monkeypatch.setenv("DDDIT_UPLOAD_CHUNK_SIZE", str(CHUNK_SIZE))
+    mesh_path = create_mesh(tmp_path, 3 * CHUNK_SIZE)
+
+    record_chunks(intercept, failing_chunk=2)
+    chunked_upload.upload_in_chunks(UPLOADS_PATH, version_data(), mesh_path, "application/octet-stream", "first-attempt")
+
+    mesh_path.write_bytes(os.urandom(4 * CHUNK_SIZE))
+    sent_chunks = record_chunks(intercept)
+    reply, file_hash = chunked_upload.upload_in_chunks(UPLOADS_PATH, version_data(), mesh_path,
+                                                       "application/octet-stream", "second-attempt")
+
+    assert "message" in reply
+    assert sent_chunks == [0, 1, 2, 3]
+    assert server.objects[file_hash] == mesh_path.read_bytes()
+
+def test_unavailable_chunk_is_retried_in_one_place(server, intercept, monkeypatch, tmp_path):
+    monkeypatch.setenv("DDDIT_UPLOAD_CHUNK_SIZE", str(CHUNK_SIZE))
+    monkeypatch.setenv("DDDIT_UPLOAD_RETRIES", "2")
+    monkeypatch.setenv("DDDIT_REQUEST_RETRIES", "3")
+    mesh_path = create_mesh(tmp_path, 2 * CHUNK_SIZE)
+
+    sent_chunks = []
+
+    def unavailable(handler, parts, body, username):
+        if len(parts) == 3 and parts[1] == "chunks":
+            sent_chunks.append(int(parts[2]))
+            return {"error": "Service unavailable"}, 503
+        return None
+
+    intercept("handle_upload", unavailable)
+    reply, file_hash = chunked_upload.upload_in_chunks(UPLOADS_PATH, version_data(), mesh_path,
+                                                       "application/octet-stream", "first-attempt")
+
+    assert "failed at chunk 1/2" in reply["error"]
+    assert sent_chunks == [0, 0, 0]
@@ -0,0 +1,75 @@
+import os
+import random
+import pytest
+from subsystems.network.multipart import PART_DATA, PART_END, PART_HEADERS, MultipartError, StreamingMultipartEncoder, \
+    get_disposition_param, iter_multipart
+
+# -------- HELPERS --------
+
+def encode(tmp_path, fields: list, contents: dict) -> tuple[bytes, str]:
+    files = []
+    for name, content in contents.items():
+        path = tmp_path / name
+        path.write_bytes(content)
+        files.append(("files", path, "application/octet-stream"))
+
+    with StreamingMultipartEncoder(fields, files, chunk_size=64, report_progress=False) as encoder:
+        return encoder.read(), encoder.content_type
+
+def decode(chunks, content_type: str) -> list:
+    # Returns (name, filename, body) for every part, bodies put back together from their data events
+    parts = []
+    for event, value in iter_multipart(chunks, content_type):
+        if event == PART_HEADERS:
+            parts.append([get_disposition_param(value, "name"), get_disposition_param(value, "filename"), bytearray()])
+        elif event == PART_DATA:
+            parts[-1][2] += value
+        else:
+            assert value is None and event == PART_END
+
+    return [(name, filename, bytes(body)) for name, filename, body in parts]
+
+def split(body: bytes, cuts: list) -> list:
+    bounds = [0] + sorted(cuts) + [len(body)]
+    return [body[start:end] for start, end in zip(bounds, bounds[1:])]
+
+# -------- TESTS --------
+
+@pytest.fixture
+def encoded(tmp_path):
+    # Bodies that look like delimiters or headers must come back untouched, as must an empty file
+    contents = {
+        "albedo.png": os.urandom(700),
+        "tricky.png": b"\r\n--not-the-boundary\r\n\r\nContent-Disposition: nope\r\n--",
+        "empty.png": b""
+    }
+    body, content_type = encode(tmp_path, [("repositoryName", "repository_0"), ("comment", "")], contents)
+
+    expected = [("repositoryName", None, b"repository_0"), ("comment", None, b"")]
+    expected += [("files", name, content) for name, content in contents.items()]
+    return body, content_type, expected
+
+def test_decodes_every_single_split_point(encoded):
+    body, content_type, expected = encoded
+
+    for cut in range(len(body) + 1):
+        assert decode(split(body, [cut]), content_type) == expected
+
+def test_decodes_byte_by_byte(encoded):
+    body, content_type, expected = encoded
+
+    assert decode((body[i:i + 1] for i in range(len(body))), content_type) == expected
+
+def test_decodes_random_chunk_boundaries(encoded):
+    body, content_type, expected = encoded
+    generator = random.Random(1234)
+
+    for _ in range(200):
+        cuts = generator.sample(range(1, len(body)), generator.randint(1, 40))
+        assert decode(split(body, cuts), content_type) == expected
+
+def test_truncated_body_is_an_error(encoded):
+    body, content_type, _ = encoded
+
+    with pytest.raises(MultipartError):
+        decode([body[:len(body) // 2]], content_type)
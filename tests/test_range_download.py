@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import pytest
+from subsystems.local import job_manager
+from subsystems.network import range_download
+
+OBJECTS_PATH = "/versions/objects"
+
+RANGE_SIZE = 1000
+
+# -------- HELPERS --------
+
+def store_object(server, content: bytes) -> dict:
+    file_hash = hashlib.sha256(content).hexdigest()
+    server.objects[file_hash] = content
+    return {"hash": file_hash, "size": len(content)}
+
+def record_ranges(intercept, failing_start: int | None = None) -> list:
+    # Records the Range header of every object download, the range starting at failing_start is refused
+    requested_ranges = []
+    def hook(handler, file_hash):
+        requested_range = handler.headers.get("Range")
+        if handler.command == "GET":
+            requested_ranges.append(requested_range)
+
+        if failing_start is not None and requested_range == f"bytes={failing_start}-{failing_start + RANGE_SIZE - 1}":
+            return {"error": "Object not found"}, 404
+        return None
+
+    intercept("handle_object_download", hook)
+    return requested_ranges
+
+# -------- TESTS --------
+
+def test_interrupted_pull_resumes_missing_ranges(server, intercept, monkeypatch, tmp_path):
+    monkeypatch.setenv("DDDIT_PULL_RANGE_SIZE", str(RANGE_SIZE))
+    content = os.urandom(5 * RANGE_SIZE + 500)
+    files = {"mesh.fbx": store_object(server, content)}
+
+    record_ranges(intercept, failing_start=3 * RANGE_SIZE)
+    received_files, error = range_download.download_files(OBJECTS_PATH, {}, files, tmp_path)
+
+    assert received_files == {}
+    assert "HTTP 404" in error
+    assert not (tmp_path / "mesh.fbx").exists()
+
+    # The range after the refused one may already be running when the pull gives up
+    state = json.loads((tmp_path / ".mesh.fbx.part.json").read_text(encoding="utf-8"))
+    assert {0, RANGE_SIZE, 2 * RANGE_SIZE} <= set(state["completed"])
+    assert 3 * RANGE_SIZE not in state["completed"]
+    assert (tmp_path / ".mesh.fbx.part").stat().st_size == len(content)
+
+    requested_ranges = record_ranges(intercept)
+    received_files, error = range_download.download_files(OBJECTS_PATH, {}, files, tmp_path)
+
+    assert error is None
+    assert received_files["mesh.fbx"]["hash"] == files["mesh.fbx"]["hash"]
+    assert requested_ranges == [f"bytes={start}-{min(start + RANGE_SIZE, len(content)) - 1}"
+                                for start in range(3 * RANGE_SIZE, len(content), RANGE_SIZE)
+                                if start not in state["completed"]]
+    assert (tmp_path / "mesh.fbx").read_bytes() == content
+    assert not (tmp_path / ".mesh.fbx.part").exists()
+    assert not (tmp_path / ".mesh.fbx.part.json").exists()
+
+def test_resume_starts_over_when_the_file_changed(server, intercept, monkeypatch, tmp_path):
+    monkeypatch.setenv("DDDIT_PULL_RANGE_SIZE", str(RANGE_SIZE))
+    old_content = os.urandom(3 * RANGE_SIZE)
+    record_ranges(intercept, failing_start=2 * RANGE_SIZE)
+    range_download.download_files(OBJECTS_PATH, {}, {"mesh.fbx": store_object(server, old_content)}, tmp_path)
+
+    new_content = os.urandom(3 * RANGE_SIZE)
+    requested_ranges = record_ranges(intercept)
+    received_files, error = range_download.download_files(OBJECTS_PATH, {}, {"mesh.fbx": store_object(server, new_content)},
+                                                          tmp_path)
+
+    assert error is None
+    assert len(requested_ranges) == 3
+    assert (tmp_path / "mesh.fbx").read_bytes() == new_content
+
+def test_ignored_ranges_fall_back_to_one_stream(server, intercept, monkeypatch, tmp_path):
+    monkeypatch.setenv("DDDIT_PULL_RANGE_SIZE", str(RANGE_SIZE))
+    monkeypatch.setenv("DDDIT_DOWNLOAD_WORKERS", "4")
+    content = os.urandom(8 * RANGE_SIZE)
+    files = {"mesh.fbx": store_object(server, content)}
+
+    requested_ranges = []
+
+    def ignore_range(handler, file_hash):
+        if handler.command == "GET":
+            requested_ranges.append(handler.headers.get("Range"))
+        del handler.headers["Range"]
+
+    intercept("handle_object_download", ignore_range)
+    received_files, error = range_download.download_files(OBJECTS_PATH, {}, files, tmp_path)
+
+    assert error is None
+    assert requested_ranges.count(None) == 1
+    assert (tmp_path / "mesh.fbx").read_bytes() == content
+
+def test_cancel_stops_a_running_pull(server, intercept, monkeypatch, tmp_path):
+    monkeypatch.setenv("DDDIT_PULL_RANGE_SIZE", str(RANGE_SIZE))
+    content = os.urandom(6 * RANGE_SIZE)
+    files = {"mesh.fbx": store_object(server, content)}
+
+    requested_ranges = []
+
+    with job_manager.foreground_job("pull") as job:
+        # The job is cancelled while the third range is served, its retry pause must end the pull at once
+        def cancel_at_third_range(handler, file_hash):
+            if handler.command != "GET":
+                return None
+
+            requested_ranges.append(handler.headers.get("Range"))
+            if len(requested_ranges) < 3:
+                return None
+
+            job.cancel_event.set()
+            return {"error": "Service unavailable"}, 503
+
+        intercept("handle_object_download", cancel_at_third_range)
+        with pytest.raises(job_manager.JobCancelledError):
+            range_download.download_files(OBJECTS_PATH, {}, files, tmp_path)
+
+    assert len(requested_ranges) == 3
+    assert not (tmp_path / "mesh.fbx").exists()
+
+    state = json.loads((tmp_path / ".mesh.fbx.part.json").read_text(encoding="utf-8"))
+    assert set(state["completed"]) == {0, RANGE_SIZE}